@@ -8,25 +8,259 @@ Secciones principales:
 3. Rutas:
    - `/`: Ruta de prueba para verificar que el servidor está funcionando.
    - `/health`: Ruta para verificar el estado del servidor.
-   - `/compile`: Recibe código fuente, lo procesa a través de las fases del compilador y devuelve los resultados.
+   - `/compile`: Recibe código fuente, lo procesa a través de las fases del compilador y devuelve los resultados
+     (solo las fases pedidas en "include", ver encoding.py).
+   - `/compile/batch`: Compila una lista de programas (con variante NDJSON en `/compile/batch/stream`).
+   - `/compile/stream`: Compila y ejecuta un programa transmitiendo su salida
+     como Server-Sent Events.
+   - `/metrics`: Métricas agregadas por fase en formato Prometheus.
    - `/analyze/lexical`: Realiza análisis léxico del código fuente.
    - `/analyze/syntax`: Realiza análisis sintáctico del código fuente.
+   - `/analyze/incremental`: Análisis léxico y sintáctico incremental de un
+     documento abierto en el editor (ver incremental.py).
+4. Compresión: las respuestas JSON grandes van con gzip si el cliente lo acepta.
 """
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import threading
 import time
 
 # Importar módulos del compilador
-from lexer import analyze as lexer_analyze
+from lexer import BACKENDS as LEXER_BACKENDS
 from parser import parse as parser_parse
-from semantic import analyze_semantics
-from intermediate import generate_intermediate_code
-from optimizer import optimize_code
-from codegen import generate_code, execute_code
+from pipeline import compile_source
+from pipeline import EXECUTION_TIERS, STREAM_TIERS
+from encoding import ENCODINGS, SECTIONS, accepts_gzip, gzip_body, shape_response, upto_phase
+from profiler import profile_execution
+from cache import LRUCache, source_key, compiled_size, execution_size
+from incremental import DocumentStore
+from workers import CompilerPool, WorkerError
+from metrics import Registry, SIZE_BUCKETS
+import ast_nodes
+
+
+class CompilerJSONProvider(DefaultJSONProvider):
+    """JSON de Flask que además serializa los nodos del AST (ver ast_nodes.dumps)."""
+
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return ast_nodes.dumps(obj, **kwargs)
+
 
 app = Flask(__name__)
+app.json = CompilerJSONProvider(app)
 CORS(app)  # Permitir peticiones del frontend
 
+# Límites de ejecución de la VM. Son el valor por defecto y a la vez el máximo:
+# una petición puede pedir límites menores en "limits", nunca mayores.
+app.config['EXECUTION_MAX_STEPS'] = int(os.environ.get('EXECUTION_MAX_STEPS', 5_000_000))
+app.config['EXECUTION_TIMEOUT_MS'] = int(os.environ.get('EXECUTION_TIMEOUT_MS', 2000))
+# tope de caracteres de la salida de un programa (lo que pasa se recorta)
+app.config['EXECUTION_MAX_OUTPUT'] = int(os.environ.get('EXECUTION_MAX_OUTPUT', 1_000_000))
+
+# Caché de compilación (fases 1-6) y de ejecución, por hash del código fuente
+app.config['CACHE_MAX_ENTRIES'] = int(os.environ.get('CACHE_MAX_ENTRIES', 512))
+app.config['CACHE_MAX_BYTES'] = int(os.environ.get('CACHE_MAX_BYTES', 64 * 1024 * 1024))
+compilation_cache = LRUCache(app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_MAX_BYTES'])
+execution_cache = LRUCache(app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_MAX_BYTES'] // 4)
+
+# Modo de compilación: 'inline' (en el hilo de la petición) o 'process'
+# (pool de procesos precalentados, ver workers.py)
+app.config['COMPILE_MODE'] = os.environ.get('COMPILE_MODE', 'inline')
+app.config['WORKER_POOL_SIZE'] = int(os.environ.get('WORKER_POOL_SIZE', os.cpu_count() or 2))
+app.config['WORKER_JOB_TIMEOUT_MS'] = int(os.environ.get('WORKER_JOB_TIMEOUT_MS', 10000))
+app.config['WORKER_MAX_JOBS'] = int(os.environ.get('WORKER_MAX_JOBS', 1000))
+
+# Compresión gzip de las respuestas JSON (si el cliente manda Accept-Encoding: gzip);
+# las más chicas que GZIP_MIN_BYTES no ganan nada y van sin comprimir
+app.config['GZIP_MIN_BYTES'] = int(os.environ.get('GZIP_MIN_BYTES', 1024))
+app.config['GZIP_LEVEL'] = int(os.environ.get('GZIP_LEVEL', 6))
+
+# Métricas agregadas para /metrics (formato Prometheus)
+registry = Registry()
+phase_duration = registry.histogram(
+    'compiler_phase_duration_seconds', 'Duración de cada fase del compilador', ('phase',))
+compile_duration = registry.histogram(
+    'compiler_compile_duration_seconds', 'Duración total de compile_program (fases 1-7)')
+program_size = registry.histogram(
+    'compiler_program_size', 'Tamaño del programa por unidad: tokens, nodos del AST, cuádruplos, etc.',
+    ('unit',), buckets=SIZE_BUCKETS)
+vm_instructions = registry.histogram(
+    'compiler_vm_instructions', 'Instrucciones ejecutadas por la VM', buckets=SIZE_BUCKETS)
+compile_requests = registry.counter(
+    'compiler_requests_total', 'Compilaciones por código de estado y fase con error', ('status', 'phase_error'))
+cache_lookups = registry.counter(
+    'compiler_cache_lookups_total', 'Consultas a la caché por nivel y resultado', ('cache', 'result'))
+
+
+def record_metrics(body, status, stats, execution_ns, total_ns):
+    """Agrega una compilación a los histogramas y arma el bloque de contadores."""
+    compile_requests.inc(status=status, phase_error=body.get('phase_error', ''))
+    compile_duration.observe(total_ns / 1e9)
+    times = dict(stats.get('phase_times_ns', {}))
+    if execution_ns is not None:
+        times['execution'] = execution_ns
+    for phase, ns in times.items():
+        phase_duration.observe(ns / 1e9, phase=phase)
+
+    phases = body.get('phases', {})
+    counters = {}
+    if 'lexical' in phases:
+        counters['tokens'] = phases['lexical']['count']
+    if 'syntax' in phases:
+        counters['ast_nodes'] = phases['syntax']['node_count']
+    if 'optimization' in phases:
+        counters['quadruples_per_pass'] = phases['optimization']['passes']
+        counters['quadruples'] = len(phases['intermediate']['quadruples'])
+        counters['quadruples_optimized'] = len(phases['optimization']['optimized'])
+    if 'codegen' in phases:
+        program = phases['codegen']['code']
+        counters['peak_variables'] = program['register_count'] - len(program['constants'])
+    execution = phases.get('execution')
+    if execution and execution.get('success'):
+        counters['vm_instructions'] = execution['steps_executed']
+        vm_instructions.observe(execution['steps_executed'])
+    for unit in ('tokens', 'ast_nodes', 'quadruples', 'quadruples_optimized', 'peak_variables'):
+        if unit in counters:
+            program_size.observe(counters[unit], unit=unit)
+    return times, counters
+
+
+# Máximo de programas por petición en /compile/batch
+app.config['BATCH_MAX_PROGRAMS'] = int(os.environ.get('BATCH_MAX_PROGRAMS', 1000))
+
+# Documentos abiertos en el editor para /analyze/incremental
+app.config['INCREMENTAL_MAX_DOCUMENTS'] = int(os.environ.get('INCREMENTAL_MAX_DOCUMENTS', 256))
+documents = DocumentStore(app.config['INCREMENTAL_MAX_DOCUMENTS'])
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def compiler_pool():
+    """Pool de procesos, creado al primer uso (nunca al importar: spawn reimporta app)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = CompilerPool(
+                    app.config['WORKER_POOL_SIZE'],
+                    job_timeout=app.config['WORKER_JOB_TIMEOUT_MS'] / 1000.0,
+                    max_jobs_per_worker=app.config['WORKER_MAX_JOBS'],
+                )
+    return _pool
+
+
+def run_job(fn, *args):
+    """Ejecuta fn en el hilo actual o en el pool, según COMPILE_MODE."""
+    if app.config['COMPILE_MODE'] == 'process':
+        return compiler_pool().run(fn, *args)
+    return fn(*args)
+
+
+def execution_limits(data):
+    """
+    Calcula (max_steps, timeout en segundos, max_output) para una petición.
+
+    Acepta {"limits": {"max_steps": N, "timeout_ms": T, "max_output": C}} y
+    acota cada valor al máximo configurado en el servidor. max_output son
+    caracteres de salida. Lanza ValueError si son inválidos.
+    """
+    max_steps = app.config['EXECUTION_MAX_STEPS']
+    timeout_ms = app.config['EXECUTION_TIMEOUT_MS']
+    max_output = app.config['EXECUTION_MAX_OUTPUT']
+    limits = data.get('limits') or {}
+    if not isinstance(limits, dict):
+        raise ValueError("'limits' debe ser un objeto")
+
+    requested = limits.get('max_steps')
+    if requested is not None:
+        if not isinstance(requested, int) or isinstance(requested, bool) or requested < 0:
+            raise ValueError("'limits.max_steps' debe ser un entero no negativo")
+        max_steps = min(requested, max_steps)
+
+    requested = limits.get('timeout_ms')
+    if requested is not None:
+        if not isinstance(requested, (int, float)) or isinstance(requested, bool) or requested < 0:
+            raise ValueError("'limits.timeout_ms' debe ser un número no negativo")
+        timeout_ms = min(requested, timeout_ms)
+
+    requested = limits.get('max_output')
+    if requested is not None:
+        if not isinstance(requested, int) or isinstance(requested, bool) or requested < 0:
+            raise ValueError("'limits.max_output' debe ser un entero no negativo")
+        max_output = min(requested, max_output)
+
+    return max_steps, timeout_ms / 1000.0, max_output
+
+
+def execution_tier(data):
+    """
+    Nivel de ejecución pedido en {"tier": ...}: 'vm' (por defecto, la VM de
+    bytecode) o 'jit' (el programa traducido a una función de Python, ver
+    jit.py). Ambos dan el mismo resultado. Lanza ValueError si es inválido.
+    """
+    tier = data.get('tier', 'vm')
+    if tier not in EXECUTION_TIERS:
+        raise ValueError(f"'tier' debe ser uno de {sorted(EXECUTION_TIERS)}")
+    return tier
+
+
+def execution_profile(data, tier):
+    """
+    Si la petición pide el perfil de la ejecución con {"profile": true} (ver
+    profiler.py). El perfil sale de la VM, así que no se combina con el JIT.
+    Lanza ValueError si es inválido.
+    """
+    profile = data.get('profile', False)
+    if not isinstance(profile, bool):
+        raise ValueError("'profile' debe ser true o false")
+    if profile and tier != 'vm':
+        raise ValueError("'profile' solo está disponible con 'tier': 'vm'")
+    return profile
+
+
+def response_options(data):
+    """
+    Forma de la respuesta pedida: {"include": [...], "encoding": ...}.
+
+    include son las fases y secciones a devolver (ver encoding.SECTIONS; por
+    defecto todas): las fases que no se piden ni hacen falta para una
+    posterior no corren. encoding es 'rows' (por defecto) o 'columnar'
+    (tokens y cuádruplos como columnas, ver encoding.shape_response).
+    Retorna (include, encoding). Lanza ValueError si son inválidos.
+    """
+    include = data.get('include', SECTIONS)
+    if (not isinstance(include, (list, tuple)) or not include
+            or any(not isinstance(s, str) or s not in SECTIONS for s in include)):
+        raise ValueError(f"'include' debe ser una lista no vacía con elementos de {list(SECTIONS)}")
+    encoding = data.get('encoding', 'rows')
+    if encoding not in ENCODINGS:
+        raise ValueError(f"'encoding' debe ser uno de {list(ENCODINGS)}")
+    return tuple(include), encoding
+
+
+@app.after_request
+def compress_response(response):
+    """Comprime con gzip las respuestas JSON de al menos GZIP_MIN_BYTES."""
+    if response.mimetype != 'application/json' or response.is_streamed or response.direct_passthrough:
+        return response
+    response.vary.add('Accept-Encoding')
+    if ('Content-Encoding' in response.headers
+            or not accepts_gzip(request.headers.get('Accept-Encoding'))):
+        return response
+    data = response.get_data()
+    if len(data) < app.config['GZIP_MIN_BYTES']:
+        return response
+    response.set_data(gzip_body(data, app.config['GZIP_LEVEL']))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 
 # ==========================
 #     RUTA HOME (NUEVA)
@@ -39,8 +273,13 @@ def home():
         'status': 'ok',
         'endpoints': [
             '/compile',
+            '/compile/batch',
+            '/compile/batch/stream',
+            '/compile/stream',
+            '/metrics',
             '/analyze/lexical',
             '/analyze/syntax',
+            '/analyze/incremental',
             '/examples',
             '/health'
         ]
@@ -59,115 +298,348 @@ def health():
 # ==========================
 #     /compile
 # ==========================
-@app.route('/compile', methods=['POST'])
-def compile_code():
+def compiled_source(source_code, stats, upto='codegen'):
     """
-    Endpoint principal: compila todo el código
+    Fases 1-6 del programa, de la caché de compilación o corriendo
+    compile_source (en el pool si COMPILE_MODE es 'process').
 
-    Se procesa el código fuente a través de las siguientes fases:
-    1. Análisis Léxico: Se obtienen los tokens del código fuente.
-    2. Análisis Sintáctico: Se genera el árbol de sintaxis abstracta (AST).
-    3. Análisis Semántico: Se verifican errores semánticos y se genera la tabla de símbolos.
-    4. Generación de Código Intermedio: Se traduce el AST a un código intermedio.
-    5. Optimización: Se optimiza el código intermedio.
-    6. Generación de Código: Se genera el código final a partir del código optimizado.
-    7. Ejecución: Se ejecuta el código generado.
+    Con upto solo hacen falta las fases hasta esa (ver pipeline.COMPILE_PHASES):
+    una entrada de la caché las tiene todas, pero en un fallo se corren solo
+    esas y el resultado parcial no se guarda.
 
-    Retorna:
-    - Resultado de cada fase del compilador.
-    - Métricas del proceso de compilación.
+    Retorna (resultado cacheado, acierto, ms de la consulta, llave de la
+    caché). El resultado es compartido: no se modifica.
+    """
+    key = source_key(source_code)
+    lookup_start = time.perf_counter()
+    cached = compilation_cache.get(key)
+    lookup_time = (time.perf_counter() - lookup_start) * 1000
+    compile_hit = cached is not None
+    cache_lookups.inc(cache='compilation', result='hit' if compile_hit else 'miss')
+    if compile_hit:
+        stats['lexing_time'] = 0.0
+    else:
+        cached, run_stats = run_job(compile_source, source_code, 'regex', upto)
+        stats.update(run_stats)
+        if upto == 'codegen':
+            compilation_cache.put(key, cached, compiled_size(source_code, cached))
+    return cached, compile_hit, lookup_time, key
+
+
+def _compile_program(source_code, max_steps, timeout, max_output, tier, stats, profile=False,
+                     upto='execution'):
+    """
+    Compila y ejecuta un programa (fases 1-7), o solo hasta la fase upto; sin
+    la ejecución la respuesta no trae 'metrics'.
+
+    Las fases 1-6 se guardan en una caché LRU por hash del código fuente, y
+    también las ejecuciones completas (los programas no leen entradas). tier
+    elige quién ejecuta la fase 7; como 'vm' y 'jit' dan el mismo resultado,
+    la caché de ejecución es compartida. Con profile la ejecución corre
+    siempre (el perfil es de esta corrida) y trae 'profile'.
+
+    Retorna (cuerpo de la respuesta, código HTTP). Deja en stats los tiempos
+    de las fases que sí corrieron (en un acierto de caché no corre ninguna).
     """
     try:
-        data = request.get_json()
-        source_code = data.get('code', '')
-        
-        if not source_code.strip():
-            return jsonify({
+        if not isinstance(source_code, str) or not source_code.strip():
+            return {
                 'success': False,
                 'error': 'No se proporcionó código fuente'
-            }), 400
-        
+            }, 400
+
         start_time = time.time()
-        result = {'success': True, 'phases': {}}
-        
-        # ---- FASE 1: LÉXICO ----
-        tokens = lexer_analyze(source_code)
-        result['phases']['lexical'] = {
-            'success': True,
-            'tokens': tokens,
-            'count': len(tokens)
-        }
-        
-        # ---- FASE 2: SINTÁCTICO ----
-        parse_result = parser_parse(source_code)
-        if not parse_result['success']:
-            result['success'] = False
-            result['error'] = parse_result['error']
-            result['phase_error'] = 'syntax'
-            return jsonify(result), 200
-        
-        result['phases']['syntax'] = {
-            'success': True,
-            'ast': parse_result['ast']
-        }
-        
-        # ---- FASE 3: SEMÁNTICO ----
-        semantic_result = analyze_semantics(parse_result['ast'])
-        if not semantic_result['success']:
-            result['success'] = False
-            result['error'] = '; '.join(semantic_result['errors'])
-            result['phase_error'] = 'semantic'
-            result['phases']['semantic'] = semantic_result
-            return jsonify(result), 200
-        
-        result['phases']['semantic'] = semantic_result
-        
-        # ---- FASE 4: INTERMEDIO ----
-        intermediate_result = generate_intermediate_code(parse_result['ast'])
-        if not intermediate_result['success']:
-            result['success'] = False
-            result['error'] = intermediate_result.get('error')
-            result['phase_error'] = 'intermediate'
-            return jsonify(result), 200
-        
-        result['phases']['intermediate'] = intermediate_result
-        
-        # ---- FASE 5: OPTIMIZACIÓN ----
-        optimization_result = optimize_code(intermediate_result['quadruples'])
-        result['phases']['optimization'] = optimization_result
-        
-        # ---- FASE 6: CODEGEN ----
-        codegen_result = generate_code(optimization_result['optimized'])
-        if not codegen_result['success']:
-            result['success'] = False
-            result['error'] = codegen_result.get('error')
-            result['phase_error'] = 'codegen'
-            return jsonify(result), 200
-        
-        result['phases']['codegen'] = codegen_result
-        
+
+        # ---- FASES 1-6 (con caché) ----
+        cached, compile_hit, lookup_time, key = compiled_source(
+            source_code, stats, 'codegen' if upto == 'execution' else upto)
+
+        # la entrada cacheada no se modifica: se copian los niveles que se tocan
+        result = dict(cached)
+        result['phases'] = dict(cached['phases'])
+        if not result['success'] or upto != 'execution':
+            return result, 200
+
         # ---- FASE 7: EJECUCIÓN ----
-        execution_result = execute_code(codegen_result['code'])
+        # los programas no tienen entradas: una ejecución completa es reutilizable
+        # mientras quepa en el presupuesto de pasos y el tope de salida de esta petición
+        execution_result = None if profile else execution_cache.get(key)
+        execution_hit = (execution_result is not None
+                         and execution_result['steps_executed'] <= max_steps
+                         and (max_output is None or len(execution_result['output']) <= max_output))
+        if not profile:
+            cache_lookups.inc(cache='execution', result='hit' if execution_hit else 'miss')
+        if not execution_hit:
+            program = cached['phases']['codegen']['code']
+            run = profile_execution if profile else EXECUTION_TIERS[tier]
+            exec_start = time.perf_counter_ns()
+            execution_result = run_job(run, program, max_steps, timeout, max_output)
+            stats['execution_ns'] = time.perf_counter_ns() - exec_start
+            if execution_result['success'] and not execution_result['truncated']:
+                # el perfil no se guarda: otra petición no lo pidió
+                cached_result = dict(execution_result)
+                cached_result.pop('profile', None)
+                execution_cache.put(key, cached_result, execution_size(cached_result))
         result['phases']['execution'] = execution_result
-        
+
+        phases = result['phases']
+        tokens_count = phases['lexical']['count']
+        optimization_result = phases['optimization']
+
         # ---- MÉTRICAS ----
         end_time = time.time()
         result['metrics'] = {
             'compilation_time': round((end_time - start_time) * 1000, 2),
-            'tokens_count': len(tokens),
-            'quadruples_original': len(intermediate_result['quadruples']),
+            'tokens_count': tokens_count,
+            'lexing_time': round(stats['lexing_time'], 3),
+            'quadruples_original': len(phases['intermediate']['quadruples']),
             'quadruples_optimized': len(optimization_result['optimized']),
             'code_reduction': optimization_result['reduction'],
-            'lines_of_code': len(source_code.split('\n'))
+            'steps_executed': execution_result.get('steps_executed', 0),
+            'lines_of_code': len(source_code.split('\n')),
+            'execution_tier': tier,
+            'cache': {
+                'compile_hit': compile_hit,
+                'execution_hit': execution_hit,
+                'lookup_time': round(lookup_time, 4),
+                'compilation': compilation_cache.stats(),
+                'execution': execution_cache.stats(),
+            },
         }
-        
-        return jsonify(result), 200
-        
+
+        return result, 200
+
+    except WorkerError as e:
+        # el proceso trabajador murió o se colgó; el pool ya fue reconstruido
+        return {'success': False, 'error': str(e), 'phase_error': 'worker'}, 503
     except Exception as e:
-        return jsonify({
+        return {
             'success': False,
             'error': f'Error interno del servidor: {str(e)}'
-        }), 500
+        }, 500
+
+
+def compile_program(source_code, max_steps, timeout, max_output=None, tier='vm', profile=False,
+                    include=SECTIONS, encoding='rows'):
+    """
+    Compila y ejecuta un programa (fases 1-7) y registra sus métricas.
+
+    include y encoding dan la forma de la respuesta (ver response_options):
+    solo corren las fases necesarias para lo pedido.
+
+    Retorna (cuerpo de la respuesta, código HTTP). En una compilación exitosa
+    metrics incluye 'phase_times_ns' (perf_counter_ns por fase que corrió) y
+    'counters' (tokens, nodos del AST, cuádruplos por pase, instrucciones de
+    la VM y pico de variables).
+    """
+    start = time.perf_counter_ns()
+    stats = {}
+    body, status = _compile_program(source_code, max_steps, timeout, max_output, tier, stats, profile,
+                                    upto_phase(include))
+    times, counters = record_metrics(body, status, stats, stats.get('execution_ns'),
+                                     time.perf_counter_ns() - start)
+    if 'metrics' in body:
+        body['metrics']['phase_times_ns'] = times
+        body['metrics']['counters'] = counters
+    return shape_response(body, include, encoding), status
+
+
+@app.route('/compile', methods=['POST'])
+def compile_code():
+    """
+    Endpoint principal: compila todo el código
+
+    Se procesa el código fuente a través de las siguientes fases:
+    1. Análisis Léxico: Se obtienen los tokens del código fuente.
+    2. Análisis Sintáctico: Se genera el árbol de sintaxis abstracta (AST).
+    3. Análisis Semántico: Se verifican errores semánticos y se genera la tabla de símbolos.
+    4. Generación de Código Intermedio: Se traduce el AST a un código intermedio.
+    5. Optimización: Se optimiza el código intermedio.
+    6. Generación de Código: Se genera el código final a partir del código optimizado.
+    7. Ejecución: Se ejecuta el código generado, con límite de pasos, de tiempo
+       y de caracteres de salida (opcionalmente reducidos por la petición en "limits"), en la VM o con
+       el JIT según "tier" (ver execution_tier). Con "profile": true la
+       ejecución trae su perfil (ver execution_profile).
+
+    Con "include" la respuesta trae solo las fases y secciones pedidas, y con
+    "encoding": "columnar" los tokens y cuádruplos van por columnas (ver
+    response_options).
+
+    Retorna:
+    - Resultado de cada fase del compilador.
+    - Métricas del proceso de compilación, incluidos los contadores de caché.
+    """
+    try:
+        data = request.get_json()
+        source_code = data.get('code', '')
+        max_steps, timeout, max_output = execution_limits(data)
+        tier = execution_tier(data)
+        profile = execution_profile(data, tier)
+        include, encoding = response_options(data)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
+
+    body, status = compile_program(source_code, max_steps, timeout, max_output, tier, profile,
+                                   include, encoding)
+    return jsonify(body), status
+
+
+# ==========================
+#     /compile/stream
+# ==========================
+def sse_event(event, data):
+    """Un evento de Server-Sent Events; data va en JSON, en una sola línea."""
+    return f"event: {event}\ndata: {app.json.dumps(data)}\n\n"
+
+
+@app.route('/compile/stream', methods=['POST'])
+def compile_stream():
+    """
+    Compila y ejecuta un programa y transmite su salida como Server-Sent
+    Events mientras corre. Recibe lo mismo que /compile ("code", "limits",
+    "tier") y responde text/event-stream con:
+    - event: compile  {"success": ...}; si la compilación falla trae
+      "error" y "phase_error" y el flujo termina.
+    - event: output   {"text": "..."}: un trozo de la salida (ver codegen.stream).
+    - event: result   Resultado de la ejecución sin "output" (variables,
+      steps_executed, truncated, reason).
+
+    La ejecución corre en el hilo de la petición (también en COMPILE_MODE
+    'process') y avanza al ritmo en que el cliente lee; la salida retenida
+    nunca pasa de un trozo, y en total se corta en limits.max_output.
+    """
+    try:
+        data = request.get_json()
+        source_code = data.get('code', '')
+        if not isinstance(source_code, str) or not source_code.strip():
+            raise ValueError('No se proporcionó código fuente')
+        max_steps, timeout, max_output = execution_limits(data)
+        tier = execution_tier(data)
+        compiled = compiled_source(source_code, {})[0]
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except WorkerError as e:
+        return jsonify({'success': False, 'error': str(e), 'phase_error': 'worker'}), 503
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
+
+    def generate():
+        if not compiled['success']:
+            yield sse_event('compile', {'success': False, 'error': compiled.get('error'),
+                                        'phase_error': compiled.get('phase_error')})
+            return
+        yield sse_event('compile', {'success': True})
+        run = STREAM_TIERS[tier](compiled['phases']['codegen']['code'], max_steps, timeout, max_output)
+        while True:
+            try:
+                text = next(run)
+            except StopIteration as stop:
+                yield sse_event('result', stop.value)
+                return
+            yield sse_event('output', {'text': text})
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+# ==========================
+#     /compile/batch
+# ==========================
+def _batch_request():
+    """
+    Lee {"programs": [...], "limits": {...}, "tier": ...} y la forma de las
+    respuestas ("include", "encoding"; ver response_options), que vale para
+    todos los programas. Cada programa es un string o {"code": ...}.
+    """
+    data = request.get_json()
+    programs = data.get('programs') if isinstance(data, dict) else None
+    if not isinstance(programs, list) or not programs:
+        raise ValueError("'programs' debe ser una lista no vacía")
+    if len(programs) > app.config['BATCH_MAX_PROGRAMS']:
+        raise ValueError(f"Máximo {app.config['BATCH_MAX_PROGRAMS']} programas por lote")
+    sources = [p.get('code', '') if isinstance(p, dict) else p for p in programs]
+    max_steps, timeout, max_output = execution_limits(data)
+    return sources, max_steps, timeout, max_output, execution_tier(data), response_options(data)
+
+
+def _batch_item(index, source_code, max_steps, timeout, max_output, tier, options):
+    include, encoding = options
+    body, status = compile_program(source_code, max_steps, timeout, max_output, tier,
+                                   include=include, encoding=encoding)
+    return {'index': index, 'status': status, 'result': body}
+
+
+def _run_batch(sources, max_steps, timeout, max_output, tier, options):
+    """Genera los resultados del lote a medida que terminan (en cualquier orden)."""
+    # en modo 'process' el paralelismo real está en el pool; estos hilos solo
+    # esperan sus trabajos. En modo 'inline' el GIL lo serializaría igual.
+    threads = app.config['WORKER_POOL_SIZE'] if app.config['COMPILE_MODE'] == 'process' else 1
+    if threads <= 1:
+        for i, src in enumerate(sources):
+            yield _batch_item(i, src, max_steps, timeout, max_output, tier, options)
+        return
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(_batch_item, i, src, max_steps, timeout, max_output, tier, options)
+                   for i, src in enumerate(sources)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+@app.route('/compile/batch', methods=['POST'])
+def compile_batch():
+    """
+    Compila muchos programas en una sola petición.
+
+    Recibe {"programs": [...], "limits": {...}} y retorna los resultados en el
+    mismo orden de entrada, cada uno con su índice, código de estado y el
+    cuerpo que habría devuelto /compile.
+    """
+    try:
+        sources, max_steps, timeout, max_output, tier, options = _batch_request()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
+
+    start_time = time.time()
+    results = sorted(_run_batch(sources, max_steps, timeout, max_output, tier, options), key=lambda r: r['index'])
+    return jsonify({
+        'success': all(r['status'] == 200 and r['result']['success'] for r in results),
+        'count': len(results),
+        'results': results,
+        'batch_time': round((time.time() - start_time) * 1000, 2),
+    }), 200
+
+
+@app.route('/compile/batch/stream', methods=['POST'])
+def compile_batch_stream():
+    """
+    Igual que /compile/batch pero responde NDJSON: una línea por programa,
+    enviada en cuanto termina (el orden de llegada puede variar; usar 'index').
+    """
+    try:
+        sources, max_steps, timeout, max_output, tier, options = _batch_request()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
+
+    def generate():
+        for item in _run_batch(sources, max_steps, timeout, max_output, tier, options):
+            yield app.json.dumps(item) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
+# ==========================
+#      /metrics
+# ==========================
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Histogramas y contadores agregados en formato de texto de Prometheus."""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
 
 
 # ==========================
@@ -178,20 +650,32 @@ def analyze_lexical():
     """
     Realiza análisis léxico del código fuente.
 
+    Parámetros opcionales:
+    - lexer: 'regex' (por defecto) o 'ply'.
+
     Retorna:
     - Tokens generados.
     - Cantidad de tokens.
+    - Errores léxicos (caracteres ilegales).
     """
     try:
         data = request.get_json()
         source_code = data.get('code', '')
+        backend = data.get('lexer', 'regex')
+        if backend not in LEXER_BACKENDS:
+            return jsonify({
+                'success': False,
+                'error': f"lexer debe ser uno de {sorted(LEXER_BACKENDS)}"
+            }), 400
 
-        tokens = lexer_analyze(source_code)
+        lexed = LEXER_BACKENDS[backend](source_code)
+        tokens = lexed.dicts()
 
         return jsonify({
             'success': True,
             'tokens': tokens,
-            'count': len(tokens)
+            'count': len(tokens),
+            'errors': lexed.errors
         }), 200
 
     except Exception as e:
@@ -221,51 +705,98 @@ def analyze_syntax():
 
 
 # ==========================
-#      /examples
+#   /analyze/incremental
 # ==========================
-@app.route('/examples', methods=['GET'])
-def get_examples():
+@app.route('/analyze/incremental', methods=['POST'])
+def analyze_incremental():
     """
-    Proporciona ejemplos de código para pruebas.
+    Análisis léxico y sintáctico incremental para el editor.
 
-    Retorna:
-    - Lista de ejemplos de código.
+    - {"document": id, "code": "..."}: abre (o reinicia) el documento y
+      retorna todos sus tokens, sentencias de nivel superior y errores.
+    - {"document": id, "version": n, "edit": {"offset": o, "deleted": d,
+      "inserted": "..."}}: aplica la edición y retorna solo lo que cambió
+      (ver incremental.Document.apply). version es opcional; si no coincide
+      con la del servidor se responde 409 y el cliente debe reabrir.
+
+    Un documento desconocido (nunca abierto o expulsado) responde 404.
     """
-    examples = [
-        {
-            'name': 'Hola Mundo',
-            'code': '''int x = 42;
+    try:
+        data = request.get_json()
+        doc_id = data.get('document') if isinstance(data, dict) else None
+        if not isinstance(doc_id, str) or not doc_id:
+            raise ValueError("'document' debe ser un string no vacío")
+
+        if 'code' in data:
+            code = data['code']
+            if not isinstance(code, str):
+                raise ValueError("'code' debe ser un string")
+            doc = documents.open(doc_id, code)
+            with doc.lock:
+                body = doc.snapshot()
+            body['document'] = doc_id
+            return jsonify(body), 200
+
+        edit = data.get('edit')
+        if not isinstance(edit, dict):
+            raise ValueError("Se requiere 'code' o 'edit'")
+        doc = documents.get(doc_id)
+        if doc is None:
+            return jsonify({'success': False, 'error': f"Documento '{doc_id}' no abierto; enviar 'code'"}), 404
+        with doc.lock:
+            version = data.get('version')
+            if version is not None and version != doc.version:
+                return jsonify({'success': False, 'error': 'Versión desactualizada; enviar \'code\'',
+                                'version': doc.version}), 409
+            body = doc.apply(edit.get('offset'), edit.get('deleted', 0), edit.get('inserted', ''))
+        body['document'] = doc_id
+        return jsonify(body), 200
+
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
+
+
+# ==========================
+#      /examples
+# ==========================
+# Programas de ejemplo (también los usa benchmark.py)
+EXAMPLES = [
+    {
+        'name': 'Hola Mundo',
+        'code': '''int x = 42;
 print(x);'''
-        },
-        {
-            'name': 'Operaciones Aritméticas',
-            'code': '''int a = 10;
+    },
+    {
+        'name': 'Operaciones Aritméticas',
+        'code': '''int a = 10;
 int b = 5;
 int suma = a + b;
 int producto = a * b;
 print(suma);
 print(producto);'''
-        },
-        {
-            'name': 'Condicional If-Else',
-            'code': '''int edad = 18;
+    },
+    {
+        'name': 'Condicional If-Else',
+        'code': '''int edad = 18;
 if (edad >= 18) {
     print(1);
 } else {
     print(0);
 }'''
-        },
-        {
-            'name': 'Ciclo While',
-            'code': '''int contador = 0;
+    },
+    {
+        'name': 'Ciclo While',
+        'code': '''int contador = 0;
 while (contador < 5) {
     print(contador);
     contador = contador + 1;
 }'''
-        },
-        {
-            'name': 'Ejemplo Completo',
-            'code': '''int x = 10;
+    },
+    {
+        'name': 'Ejemplo Completo',
+        'code': '''int x = 10;
 int y = 20;
 int resultado = 0;
 
@@ -280,10 +811,19 @@ while (contador < resultado) {
     print(contador);
     contador = contador + 1;
 }'''
-        }
-    ]
+    }
+]
+
 
-    return jsonify({'examples': examples}), 200
+@app.route('/examples', methods=['GET'])
+def get_examples():
+    """
+    Proporciona ejemplos de código para pruebas.
+
+    Retorna:
+    - Lista de ejemplos de código.
+    """
+    return jsonify({'examples': EXAMPLES}), 200
 
 
 # ==========================
@@ -294,9 +834,18 @@ if __name__ == '__main__':
     print("Servidor iniciando en http://localhost:5000")
     print("Endpoints disponibles:")
     print("  - POST /compile")
+    print("  - POST /compile/batch")
+    print("  - POST /compile/batch/stream")
+    print("  - POST /compile/stream")
+    print("  - GET  /metrics")
     print("  - POST /analyze/lexical")
+    print("  - POST /analyze/incremental")
     print("  - POST /analyze/syntax")
     print("  - GET  /examples")
     print("  - GET  /health")
     print("  - GET  /")
-    app.run(debug=True, port=5000)
+    if app.config['COMPILE_MODE'] == 'process':
+        print(f"  Pool de {app.config['WORKER_POOL_SIZE']} procesos de compilación")
+        compiler_pool().prestart()
+    # el pipeline no tiene estado global: se pueden atender peticiones en hilos
+    app.run(debug=True, port=5000, threaded=True)
@@ -0,0 +1,352 @@
+# ast_nodes.py
+"""
+Nodos del AST.
+
+Secciones principales:
+1. Clases de nodos:
+   - Una clase con __slots__ por tipo de nodo (Program, Decl, Assign, ...).
+   - Cada clase tiene `kind` (entero para despachar en las fases siguientes),
+     `tag` (el nombre que usa el JSON de la API) y `_fields` (sus campos en
+     orden).
+   - Las sentencias (Decl, Assign, Print, If, While) llevan `line`, la línea
+     del código fuente donde empiezan (None si el nodo no viene del parser).
+
+2. Serialización:
+   - Node.to_dict(): Diccionario de un nivel con la forma JSON de siempre
+     ({'node': 'binop', 'op': '+', 'left': ..., 'right': ...}); los hijos
+     siguen siendo nodos.
+   - json_default(o): Hook para json.dumps; así los diccionarios se arman solo
+     cuando una respuesta realmente incluye el AST.
+   - encode(node): JSON del AST con una pila explícita (sin recursión).
+   - dumps(obj): json.dumps que codifica los nodos con encode(); el AST de
+     `a + a + ... + a` con miles de términos no choca con el límite de
+     recursión.
+   - Pickle: un nodo se serializa como una lista plana en postorden, por la
+     misma razón (modo 'process' de app.py).
+
+3. Compatibilidad:
+   - from_dict(d): Convierte un AST en forma de diccionarios a nodos.
+"""
+import json
+import secrets
+
+# --------------------------
+# Tipos de nodo
+# --------------------------
+PROGRAM = 0
+DECL = 1
+ASSIGN = 2
+PRINT = 3
+IF = 4
+WHILE = 5
+BINOP = 6
+UNOP = 7
+NUMBER = 8
+FNUMBER = 9
+BOOL = 10
+ID = 11
+
+
+class Node:
+    __slots__ = ()
+    kind = None
+    tag = None
+    _fields = ()
+
+    def to_dict(self):
+        d = {'node': self.tag}
+        for f in self._fields:
+            d[f] = getattr(self, f)
+        return d
+
+    def children(self):
+        """Hijos directos (nodos), en orden."""
+        for f in self._fields:
+            v = getattr(self, f)
+            if isinstance(v, Node):
+                yield v
+            elif isinstance(v, list):
+                yield from v
+
+    def __reduce__(self):
+        return (_unflatten, (_flatten(self),))
+
+    def __repr__(self):
+        args = ', '.join(f'{f}={getattr(self, f)!r}' for f in self._fields)
+        return f'{type(self).__name__}({args})'
+
+
+class Program(Node):
+    __slots__ = ('stmts',)
+    kind, tag, _fields = PROGRAM, 'program', ('stmts',)
+
+    def __init__(self, stmts):
+        self.stmts = stmts
+
+
+class Decl(Node):
+    __slots__ = ('type', 'id', 'expr', 'line')
+    kind, tag, _fields = DECL, 'decl', ('type', 'id', 'expr', 'line')
+
+    def __init__(self, type, id, expr, line=None):
+        self.type = type
+        self.id = id
+        self.expr = expr
+        self.line = line
+
+
+class Assign(Node):
+    __slots__ = ('id', 'expr', 'line')
+    kind, tag, _fields = ASSIGN, 'assign', ('id', 'expr', 'line')
+
+    def __init__(self, id, expr, line=None):
+        self.id = id
+        self.expr = expr
+        self.line = line
+
+
+class Print(Node):
+    __slots__ = ('expr', 'line')
+    kind, tag, _fields = PRINT, 'print', ('expr', 'line')
+
+    def __init__(self, expr, line=None):
+        self.expr = expr
+        self.line = line
+
+
+class If(Node):
+    __slots__ = ('cond', 'then', 'otherwise', 'line')
+    kind, tag, _fields = IF, 'if', ('cond', 'then', 'otherwise', 'line')
+
+    def __init__(self, cond, then, otherwise, line=None):
+        self.cond = cond
+        self.then = then
+        self.otherwise = otherwise
+        self.line = line
+
+
+class While(Node):
+    __slots__ = ('cond', 'body', 'line')
+    kind, tag, _fields = WHILE, 'while', ('cond', 'body', 'line')
+
+    def __init__(self, cond, body, line=None):
+        self.cond = cond
+        self.body = body
+        self.line = line
+
+
+class BinOp(Node):
+    __slots__ = ('op', 'left', 'right')
+    kind, tag, _fields = BINOP, 'binop', ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+
+class UnOp(Node):
+    __slots__ = ('op', 'expr')
+    kind, tag, _fields = UNOP, 'unop', ('op', 'expr')
+
+    def __init__(self, op, expr):
+        self.op = op
+        self.expr = expr
+
+
+class Number(Node):
+    __slots__ = ('value',)
+    kind, tag, _fields = NUMBER, 'number', ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class FNumber(Node):
+    __slots__ = ('value',)
+    kind, tag, _fields = FNUMBER, 'fnumber', ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Bool(Node):
+    __slots__ = ('value',)
+    kind, tag, _fields = BOOL, 'bool', ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Id(Node):
+    __slots__ = ('name',)
+    kind, tag, _fields = ID, 'id', ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+
+# --------------------------
+# Serialización
+# --------------------------
+def json_default(o):
+    """default= para json.dumps: serializa nodos a su forma de diccionario."""
+    if isinstance(o, Node):
+        return o.to_dict()
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+def encode(node, sort_keys=False, separators=(', ', ': ')):
+    """JSON de un nodo y sus descendientes, sin recursión."""
+    item_sep, key_sep = separators
+    out = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if type(item) is tuple:          # texto ya listo: ('{',), (', ',), ...
+            out.append(item[0])
+        elif isinstance(item, Node):
+            d = item.to_dict()
+            keys = sorted(d) if sort_keys else list(d)
+            parts = [('{',)]
+            for i, k in enumerate(keys):
+                if i:
+                    parts.append((item_sep,))
+                parts.append((json.dumps(k) + key_sep,))
+                parts.append(d[k])
+            parts.append(('}',))
+            stack.extend(reversed(parts))
+        elif isinstance(item, list):
+            parts = [('[',)]
+            for i, x in enumerate(item):
+                if i:
+                    parts.append((item_sep,))
+                parts.append(x)
+            parts.append((']',))
+            stack.extend(reversed(parts))
+        else:
+            out.append(json.dumps(item))
+    return ''.join(out)
+
+
+def dumps(obj, **kwargs):
+    """
+    json.dumps donde cada nodo se codifica con encode(). El resto del objeto
+    (la respuesta de la API, poco profunda) lo sigue codificando json.
+    """
+    if kwargs.get('indent') is not None:
+        # salida indentada (solo para depurar): json arma todo, con recursión
+        return json.dumps(obj, default=json_default, **kwargs)
+    nodes = []
+    user_default = kwargs.pop('default', None)
+    nonce = secrets.token_hex(8)   # que ningún texto del usuario coincida
+
+    def default(o):
+        if isinstance(o, Node):
+            nodes.append(o)
+            return f'\0{nonce}:{len(nodes) - 1}\0'
+        if user_default is None:
+            raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+        return user_default(o)
+
+    text = json.dumps(obj, default=default, **kwargs)
+    if not nodes:
+        return text
+    separators = kwargs.get('separators') or (', ', ': ')
+    sort_keys = kwargs.get('sort_keys', False)
+    for i, n in enumerate(nodes):
+        text = text.replace(f'"\\u0000{nonce}:{i}\\u0000"',
+                            encode(n, sort_keys, separators), 1)
+    return text
+
+
+_CLASSES = (Program, Decl, Assign, Print, If, While,
+            BinOp, UnOp, Number, FNumber, Bool, Id)
+_BY_TAG = {cls.tag: cls for cls in _CLASSES}
+_INDEX = {cls: i for i, cls in enumerate(_CLASSES)}
+
+
+def _flatten(node):
+    """
+    Registros en postorden: (índice de clase, campos). Cada campo es
+    ('v', valor), ('n',) para un hijo o ('l', k) para una lista de k hijos.
+    """
+    flat = []
+    stack = [(node, False)]
+    while stack:
+        item, ready = stack.pop()
+        if ready:
+            spec = []
+            for f in item._fields:
+                v = getattr(item, f)
+                if isinstance(v, Node):
+                    spec.append(('n',))
+                elif isinstance(v, list):
+                    spec.append(('l', len(v)))
+                else:
+                    spec.append(('v', v))
+            flat.append((_INDEX[type(item)], tuple(spec)))
+            continue
+        stack.append((item, True))
+        children = list(item.children())
+        stack.extend((c, False) for c in reversed(children))
+    return flat
+
+
+def _unflatten(flat):
+    built = []
+    for index, spec in flat:
+        count = sum(1 if s[0] == 'n' else s[1] if s[0] == 'l' else 0 for s in spec)
+        children = built[len(built) - count:]
+        del built[len(built) - count:]
+        args = []
+        pos = 0
+        for s in spec:
+            if s[0] == 'n':
+                args.append(children[pos])
+                pos += 1
+            elif s[0] == 'l':
+                args.append(children[pos:pos + s[1]])
+                pos += s[1]
+            else:
+                args.append(s[1])
+        built.append(_CLASSES[index](*args))
+    return built[0]
+
+
+_LIST_FIELDS = ('stmts', 'then', 'otherwise', 'body')
+
+
+def from_dict(d):
+    """
+    Convierte un AST de diccionarios (forma JSON) en nodos. Con una pila
+    explícita en postorden: los valores convertidos se apilan en built y
+    cada dict o lista toma los de sus hijos al cerrarse.
+    """
+    built = []
+    stack = [(d, False)]
+    while stack:
+        item, ready = stack.pop()
+        if isinstance(item, list):
+            if ready:
+                start = len(built) - len(item)
+                values = built[start:]
+                del built[start:]
+                built.append(values)
+            else:
+                stack.append((item, True))
+                stack.extend((x, False) for x in reversed(item))
+        elif isinstance(item, dict):
+            cls = _BY_TAG[item.get('node')]
+            if ready:
+                start = len(built) - len(cls._fields)
+                args = built[start:]
+                del built[start:]
+                built.append(cls(*args))
+            else:
+                stack.append((item, True))
+                stack.extend((item.get(f, [] if f in _LIST_FIELDS else None), False)
+                             for f in reversed(cls._fields))
+        else:
+            built.append(item)
+    return built[0]
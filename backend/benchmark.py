@@ -0,0 +1,957 @@
+# benchmark.py
+"""
+Benchmarks del Mini-Compilador.
+
+Uso:
+    python benchmark.py            # corre todos
+    python benchmark.py vm         # solo uno
+
+Secciones principales:
+1. Utilidades:
+   - compile_quads(src): Corre léxico → optimización y devuelve los cuádruplos.
+   - unoptimized_quads(src): Igual, pero sin optimizar.
+   - value_condition_quads(src): Sin optimizar y con las condiciones de
+     if/while evaluadas enteras a un temporal (como antes de gen_cond).
+   - timeit(fn): Mejor tiempo de varias repeticiones (ms).
+   - random_program(seed), same_value, same_execution: también los usan las
+     pruebas de tests/, que comparan cada optimización y nivel de ejecución
+     contra su forma de referencia. Aquí quedan solo los tiempos.
+
+2. Benchmarks:
+   - bench_vm(): Intérprete de tuplas original vs VM de bytecode (codegen).
+   - bench_registers(): Tamaño del banco de registros con miles de temporales.
+   - bench_concurrency(): Compila en muchos hilos vs una corrida serial (la
+     comparación de resultados está en tests/test_concurrency.py).
+   - bench_startup(): Latencia de import y del primer /compile con y sin las
+     tablas de PLY pregeneradas (gen_tables.py).
+   - bench_parser_scaling(): Tiempo de parseo con 1k/10k/100k sentencias;
+     verifica que crezca de forma aproximadamente lineal.
+   - bench_ast(): Memoria por nodo y costo de semántico + intermedio con el AST
+     de nodos con __slots__ vs el AST de diccionarios anterior.
+   - bench_deep(): Expresiones larguísimas y anidamiento profundo de if/while;
+     verifica que compilen y se serialicen sin llegar al límite de recursión.
+   - bench_optimizer(): Cuádruplos e instrucciones ejecutadas sin y con
+     optimizar, también en total sobre programas aleatorios (random_program).
+   - bench_loops(): Instrucciones ejecutadas por vuelta de ciclo sin y con los
+     pases de ciclos (código invariante y reducción de fuerza).
+   - bench_branches(): Instrucciones y tiempo con las condiciones como
+     cadenas de saltos (cortocircuito, comparar-y-saltar) vs un temporal y
+     jfalse.
+   - bench_peephole(): Instrucciones ejecutadas en los programas de /examples
+     (y algunos con if sin else) sin y con la mirilla de saltos.
+   - bench_lexer(): Tokens por segundo del lexer de PLY vs el escáner de
+     regex maestra (lexer.scan), con código válido y con caracteres ilegales.
+   - bench_incremental(): Latencia por tecla de /analyze/incremental vs
+     relexear y reparsear todo, con documentos de cientos a miles de líneas.
+   - bench_jit(): Tiempo de ejecución en la VM vs el JIT (jit.py), costo de
+     la primera traducción y aciertos de su caché.
+   - bench_profiler(): Costo de ejecutar con y sin el perfilador.
+   - bench_superinstructions(): Tiempo de la VM sin y con superinstrucciones
+     y cuántas veces se dispara cada una en un corpus (ejemplos, programas de
+     ciclos y programas aleatorios).
+   - bench_streaming(): Memoria pico y tiempo hasta la primera salida de un
+     programa que imprime cientos de miles de líneas, todo junto vs
+     transmitido con tope de salida.
+   - bench_limits(): Programas que no terminan (ciclo vacío, enteros que
+     crecen al multiplicar o sumar, salida sin fin) con un deadline corto en
+     la VM y el JIT; verifica que cada uno se corte a tiempo y con su razón.
+   - bench_responses(): Bytes y tiempo de /compile con programas grandes según
+     la forma de la respuesta (todas las fases, "include", "encoding":
+     "columnar", gzip).
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from app import EXAMPLES
+import app as server
+from parser import parse as parser_parse
+from lexer import tokenize, token_dicts, scan, ply_scan
+from incremental import Document
+import intermediate
+from intermediate import generate_intermediate_code, gen_expr
+from optimizer import optimize_code, PASSES
+from codegen import (generate_code, execute_code, JUMP_OPS, branch_taken, constant_key,
+                     assemble, superinstruction_counts, SUPERINSTRUCTIONS)
+from pipeline import STREAM_TIERS
+import jit
+from jit import execute_jit
+from pipeline import compile_source, run_program
+from profiler import profile_execution
+from parser import count_nodes
+from semantic import analyze_semantics
+from ast_nodes import json_default, dumps as ast_dumps
+
+
+# --------------------------
+# Utilidades
+# --------------------------
+def example(name):
+    for e in EXAMPLES:
+        if e['name'] == name:
+            return e['code']
+    raise KeyError(name)
+
+
+def compile_quads(src):
+    """Cuádruplos optimizados de src, o None si no compila."""
+    parsed = parser_parse(src)
+    if not parsed['success']:
+        return None
+    ast = parsed['ast']
+    quads = generate_intermediate_code(ast)['quadruples']
+    return optimize_code(quads)['optimized']
+
+
+def unoptimized_quads(src):
+    """Cuádruplos de src tal como salen de la fase intermedia, o None si no compila."""
+    parsed = parser_parse(src)
+    if not parsed['success']:
+        return None
+    return generate_intermediate_code(parsed['ast'])['quadruples']
+
+
+def _value_condition(node, on_true, on_false, quads, names):
+    """Condición como antes de gen_cond: el valor completo en un temporal y jfalse."""
+    quads.append(('jfalse', gen_expr(node, quads, names), None, on_false))
+
+
+def value_condition_quads(src):
+    """Cuádruplos de src (sin optimizar) evaluando cada condición completa, sin cortocircuito."""
+    original = intermediate.gen_cond
+    intermediate.gen_cond = _value_condition
+    try:
+        return unoptimized_quads(src)
+    finally:
+        intermediate.gen_cond = original
+
+
+def timeit(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def report(rows, headers):
+    widths = [max(len(str(x)) for x in col) for col in zip(headers, *rows)]
+    fmt = '  '.join(f'{{:>{w}}}' for w in widths)
+    print(fmt.format(*headers))
+    for row in rows:
+        print(fmt.format(*row))
+
+
+# --------------------------
+# VM: tuplas vs bytecode
+# --------------------------
+COMPARISONS = {
+    '<': lambda l, r: l < r, '<=': lambda l, r: l <= r,
+    '>': lambda l, r: l > r, '>=': lambda l, r: l >= r,
+    '==': lambda l, r: l == r, '!=': lambda l, r: l != r,
+    'and': lambda l, r: bool(l) and bool(r), 'or': lambda l, r: bool(l) or bool(r),
+}
+
+
+def legacy_execute(quads):
+    """Intérprete de tuplas original (con comparaciones, lógicos y saltos para poder comparar)."""
+    labels = {}
+    for i, q in enumerate(quads):
+        if q[0] == 'label':
+            labels[q[1]] = i
+    pc = 0
+    vars_ = {}
+    out = []
+
+    def val(x):
+        if isinstance(x, (int, float, bool)):
+            return x
+        if isinstance(x, str):
+            if x.isdigit():
+                return int(x)
+            try:
+                return float(x)
+            except ValueError:
+                pass
+        return vars_.get(x, 0)
+
+    while pc < len(quads):
+        op, a1, a2, res = quads[pc]
+        if op == 'label':
+            pc += 1
+            continue
+        if op == 'assign':
+            vars_[res] = val(a1)
+            pc += 1
+            continue
+        if op in ('+', '-', '*', '/'):
+            l = val(a1)
+            r = val(a2)
+            if op == '+': vars_[res] = l + r
+            elif op == '-': vars_[res] = l - r
+            elif op == '*': vars_[res] = l * r
+            elif op == '/':
+                try:
+                    vars_[res] = l // r if isinstance(l, int) and isinstance(r, int) else l / r
+                except Exception:
+                    vars_[res] = 0
+            pc += 1
+            continue
+        if op in COMPARISONS:
+            vars_[res] = COMPARISONS[op](val(a1), val(a2))
+            pc += 1
+            continue
+        if op == 'not':
+            vars_[res] = not bool(val(a1))
+            pc += 1
+            continue
+        if op in JUMP_OPS:
+            if branch_taken(op, val(a1), val(a2)):
+                if res not in labels:
+                    break
+                pc = labels[res] + 1
+            else:
+                pc += 1
+            continue
+        if op == 'print':
+            out.append(str(val(a1)) + "\n")
+        pc += 1
+    return ''.join(out)
+
+
+def bench_vm():
+    print("== VM: intérprete de tuplas vs bytecode ==")
+    loop = example('Ciclo While')
+    programs = [(e['name'], e['code']) for e in EXAMPLES]
+    for n in (1000, 100000):
+        programs.append((f'Ciclo While (n={n})', loop.replace('< 5', f'< {n}')))
+
+    rows = []
+    for name, src in programs:
+        quads = compile_quads(src)
+        if quads is None:
+            rows.append((name, '-', '-', 'no compila'))
+            continue
+        program = generate_code(quads)['code']
+        expected = legacy_execute(quads)
+        got = execute_code(program)
+        assert got['success'] and got['output'] == expected, name
+
+        t_old = timeit(lambda: legacy_execute(quads))
+        t_new = timeit(lambda: execute_code(program))
+        rows.append((name, f'{t_old:.3f}', f'{t_new:.3f}', f'{t_old / t_new:.2f}x'))
+    report(rows, ('programa', 'tuplas ms', 'bytecode ms', 'aceleración'))
+    print()
+
+
+def bench_registers():
+    print("== Registros: un slot por nombre vs linear scan de temporales ==")
+    rows = []
+    for n in (100, 1000, 10000):
+        src = "int a = 1;\n" + "".join(f"a = a + {i % 7} * 2 - (a / 3);\n" for i in range(n)) + "print(a);"
+        # sin optimizar: el optimizador pliega todo el programa a una constante
+        quads = unoptimized_quads(src)
+        program = generate_code(quads)['code']
+        names = {x for q in quads for x in (q[1], q[2], q[3]) if isinstance(x, str)}
+        t = timeit(lambda: execute_code(program))
+        rows.append((n, len(quads), len(names), program['register_count'], f'{t:.3f}'))
+    report(rows, ('sentencias', 'cuádruplos', 'nombres', 'registros', 'ejecución ms'))
+    print()
+
+
+def full_run(src):
+    """Fases 1-7 sin caché, serializadas para comparar resultados."""
+    result, _ = compile_source(src)
+    if result['success']:
+        result['phases']['execution'] = run_program(result)
+    return json.dumps(result, sort_keys=True, default=json_default)
+
+
+def concurrency_programs(sizes=(10, 50, 200)):
+    """Los ejemplos más ciclos y cadenas de asignaciones de cada tamaño."""
+    programs = [e['code'] for e in EXAMPLES]
+    for n in sizes:
+        programs.append("int a = 0;\nint i = 0;\nwhile (i < %d) {\n"
+                        "    a = a + i * 2 - (a / 3);\n    i = i + 1;\n}\nprint(a);" % n)
+        programs.append("int x = 1;\n" + "".join(f"x = x * 3 - {k};\nprint(x);\n" for k in range(n)))
+    return programs
+
+
+def bench_concurrency(threads=16, rounds=20):
+    print(f"== Concurrencia: {threads} hilos vs corrida serial ==")
+    programs = concurrency_programs()
+
+    t0 = time.perf_counter()
+    for src in programs:
+        full_run(src)
+    t_serial = (time.perf_counter() - t0) * 1000
+
+    jobs = programs * rounds
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(full_run, jobs))
+    t_threads = (time.perf_counter() - t0) * 1000
+
+    report([(len(jobs), f'{t_serial * rounds:.1f}', f'{t_threads:.1f}')],
+           ('compilaciones', 'serial ms (est.)', 'hilos ms'))
+    print()
+
+
+_STARTUP_PROBE = """
+import sys, time, json
+if {disable}:
+    # simula no tener tablas pregeneradas: PLY las construye al importar
+    sys.modules['lextab'] = None
+    sys.modules['parsetab'] = None
+t0 = time.perf_counter()
+import lexer, parser
+t1 = time.perf_counter()
+import app
+t2 = time.perf_counter()
+r = app.app.test_client().post('/compile', json={{'code': 'int x = 1;\\nprint(x);'}})
+t3 = time.perf_counter()
+assert r.get_json()['success']
+print(json.dumps([(t1 - t0) * 1000, (t2 - t0) * 1000, (t3 - t2) * 1000]))
+"""
+
+
+def bench_startup(runs=5):
+    print("== Arranque en frío: tablas PLY construidas vs pregeneradas ==")
+    here = os.path.dirname(os.path.abspath(__file__))
+    rows = []
+    for label, disable in (('construidas al importar', True), ('pregeneradas', False)):
+        samples = []
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, '-c', _STARTUP_PROBE.format(disable=disable)],
+                                 cwd=here, capture_output=True, text=True, check=True)
+            samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        lexparse, imp, first = (min(s[i] for s in samples) for i in range(3))
+        rows.append((label, f'{lexparse:.1f}', f'{imp:.1f}', f'{first:.1f}', f'{imp + first:.1f}'))
+    report(rows, ('tablas', 'import lexer+parser ms', 'import app ms', 'primer /compile ms', 'total ms'))
+    print()
+
+
+def synthetic_program(n):
+    """n sentencias: la mitad al nivel superior, la otra mitad en el cuerpo de un while."""
+    half = n // 2
+    top = "int x = 0;\n" + "x = x + 1;\n" * (half - 1)
+    body = "    x = x - 1;\n" * (n - half - 1)
+    return top + "while (x > 0) {\n" + body + "}\n"
+
+
+def bench_parser_scaling(sizes=(1000, 10000, 100000)):
+    print("== Parser: escalamiento con el número de sentencias ==")
+    rows = []
+    per_stmt = []
+    for n in sizes:
+        lexed = tokenize(synthetic_program(n))
+        t = timeit(lambda: parser_parse(None, lexed=lexed), repeat=3)
+        per_stmt.append(t / n)
+        rows.append((n, len(lexed), f'{t:.1f}', f'{t * 1000 / n:.2f}'))
+    report(rows, ('sentencias', 'tokens', 'parse ms', 'µs/sentencia'))
+    # crecimiento aproximadamente lineal: el costo por sentencia no se dispara
+    growth = per_stmt[-1] / per_stmt[0]
+    print(f"costo por sentencia {sizes[-1]} vs {sizes[0]}: {growth:.2f}x")
+    assert growth < 3, 'el parser no escala linealmente'
+    print()
+
+
+def _allocated(build):
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def bench_ast(n=20000):
+    print("== AST: nodos con __slots__ vs diccionarios ==")
+    lexed = tokenize(synthetic_program(n))
+    ast, slotted = _allocated(lambda: parser_parse(None, lexed=lexed)['ast'])
+    text = json.dumps(ast, default=json_default)
+    as_dicts, dicts = _allocated(lambda: json.loads(text))
+    nodes = count_nodes(ast)
+
+    def phases(tree):
+        return lambda: (analyze_semantics(tree), generate_intermediate_code(tree))
+
+    rows = [
+        ('diccionarios', f'{dicts / nodes:.0f}', f'{timeit(phases(as_dicts), repeat=3):.1f}'),
+        ('__slots__', f'{slotted / nodes:.0f}', f'{timeit(phases(ast), repeat=3):.1f}'),
+    ]
+    report(rows, ('AST', 'bytes/nodo', 'semántico+intermedio ms'))
+    print(f"{nodes} nodos; con diccionarios el tiempo incluye convertirlos a nodos")
+    print()
+
+
+def long_chain(n):
+    """Una expresión `a + a + ... + a` de n términos."""
+    return "int a = 1;\nint b = " + " + ".join(['a'] * n) + ";\nprint(b);\n"
+
+
+def nested_ifs(n):
+    return "int x = 1;\n" + "if (x > 0) {\n" * n + "print(x);\n" + "}\n" * n
+
+
+def nested_whiles(n):
+    return "int x = 1;\n" + "while (x < 2) {\n" * n + "x = x + 1;\n" + "}\n" * n + "print(x);\n"
+
+
+def bench_deep(sizes=(1000, 5000, 20000)):
+    print("== Programas profundos: cadenas largas y anidamiento ==")
+    print(f"(límite de recursión de Python: {sys.getrecursionlimit()})")
+    rows = []
+    for label, make in (('a + a + ... + a', long_chain),
+                        ('if anidados', nested_ifs),
+                        ('while anidados', nested_whiles)):
+        for n in sizes:
+            result, stats = compile_source(make(n))
+            assert result['success'], (label, n, result.get('error'))
+            times = stats['phase_times_ns']
+            start = time.perf_counter()
+            size = len(ast_dumps(result, separators=(',', ':')))
+            dump_ms = (time.perf_counter() - start) * 1000
+            output = run_program(result)['output'].strip()
+            rows.append((label, n, f"{times['semantic'] / 1e6:.1f}",
+                         f"{times['intermediate'] / 1e6:.1f}", f'{dump_ms:.1f}',
+                         f'{size // 1024}', output))
+    report(rows, ('programa', 'n', 'semántico ms', 'intermedio ms', 'JSON ms', 'JSON KB', 'salida'))
+    print()
+
+
+RANDOM_VARS = ('a', 'b', 'c', 'd', 'e')
+RANDOM_OPS = ('+', '-', '*', '/', '<', '>', '<=', '>=', '==', '!=', '&&', '||')
+
+
+def _random_expr(r, depth=0, names=RANDOM_VARS):
+    if depth > 3 or r.random() < 0.3:
+        c = r.random()
+        if c < 0.45:
+            return r.choice(names)
+        if c < 0.8:
+            return str(r.randint(0, 5))
+        if c < 0.9:
+            return r.choice(('true', 'false'))
+        return f"{r.randint(0, 5)}.{r.randint(0, 9)}"
+    if r.random() < 0.1:
+        return f"!({_random_expr(r, depth + 1, names)})"
+    if r.random() < 0.1:
+        # pocas combinaciones: se repiten y ejercitan las subexpresiones comunes
+        pair = names[:2] + names[len(RANDOM_VARS):]
+        return f"({r.choice(pair)} {r.choice(('+', '*', '<'))} {r.choice(pair)})"
+    return (f"({_random_expr(r, depth + 1, names)} {r.choice(RANDOM_OPS)} "
+            f"{_random_expr(r, depth + 1, names)})")
+
+
+def _random_stmts(r, n, depth, counters, names=RANDOM_VARS):
+    out = []
+    for _ in range(n):
+        c = r.random()
+        if c < 0.5 or depth > 2:
+            out.append(f"{r.choice(RANDOM_VARS)} = {_random_expr(r, 0, names)};")
+        elif c < 0.65:
+            out.append(f"print({_random_expr(r, 0, names)});")
+        elif c < 0.82:
+            body = _random_stmts(r, r.randint(1, 3), depth + 1, counters, names)
+            out.append(f"if ({_random_expr(r, 0, names)}) {{\n" + "\n".join(body) + "\n}")
+        else:
+            # ciclo acotado por un contador que el cuerpo lee pero no escribe
+            k = f"k{len(counters)}"
+            counters.append(k)
+            body = _random_stmts(r, r.randint(1, 3), depth + 1, counters, names + (k,))
+            out.append(f"{k} = {r.randint(0, 4)};\nwhile ({k} > 0) {{\n"
+                       + "\n".join(body) + f"\n{k} = {k} - 1;\n}}")
+    return out
+
+
+def random_program(seed):
+    """Programa válido y que termina, generado a partir de seed."""
+    r = random.Random(seed)
+    counters = []
+    body = _random_stmts(r, r.randint(1, 8), 0, counters)
+    decls = [f"int {v} = {r.randint(0, 4)};" for v in RANDOM_VARS]
+    decls += [f"int {k} = 0;" for k in counters]
+    return "\n".join(decls + body + [f"print({v});" for v in RANDOM_VARS])
+
+
+def same_value(x, y):
+    """Igualdad que distingue 1, 1.0 y True (la salida de la VM también lo hace)."""
+    if isinstance(x, dict):
+        return x.keys() == y.keys() and all(same_value(x[k], y[k]) for k in x)
+    return type(x) is type(y) and x == y
+
+
+CSE_PROGRAM = '''int a = 3; int b = 4; int i = 0;
+while (i < 100) {
+    a = a + i;
+    int suma = a + b;
+    int producto = a * b;
+    print(suma * (a + b));
+    print(b * a + (b + a));
+    i = i + 1;
+}
+int z = a + b;
+print(z * (a + b));'''
+
+
+def bench_optimizer(programs=500):
+    print("== Optimizador: cuádruplos e instrucciones ejecutadas ==")
+    loop = example('Ciclo While')
+    cases = [(e['name'], e['code']) for e in EXAMPLES]
+    cases.append(('Ciclo While (n=1000)', loop.replace('< 5', '< 1000')))
+    cases.append(('sintético 1000', synthetic_program(1000)))
+    cases.append(('subexpresiones comunes', CSE_PROGRAM))
+    rows = []
+    for name, src in cases:
+        quads = unoptimized_quads(src)
+        if quads is None:
+            rows.append((name, '-', '-', '-', '-', 'no compila'))
+            continue
+        optimized = optimize_code(quads)['optimized']
+        before = execute_code(generate_code(quads)['code'])
+        after = execute_code(generate_code(optimized)['code'])
+        assert before['output'] == after['output'], name
+        rows.append((name, len(quads), len(optimized), before['steps_executed'],
+                     after['steps_executed'],
+                     f"{1 - after['steps_executed'] / max(before['steps_executed'], 1):.0%}"))
+    report(rows, ('programa', 'cuádruplos', 'optimizados', 'pasos', 'pasos opt.', 'menos pasos'))
+
+    removed = {}
+    for p in optimize_code(unoptimized_quads(CSE_PROGRAM))['passes']:
+        removed[p['name']] = removed.get(p['name'], 0) + p['removed']
+    print('subexpresiones comunes, cuádruplos quitados por pase:',
+          ', '.join(f'{name} {n}' for name, n in removed.items() if n))
+
+    steps = [0, 0]
+    for seed in range(programs):
+        quads = unoptimized_quads(random_program(seed))
+        steps[0] += execute_code(generate_code(quads)['code'])['steps_executed']
+        steps[1] += execute_code(generate_code(optimize_code(quads)['optimized'])['code'])['steps_executed']
+    print(f"{programs} programas aleatorios: pasos {steps[0]} -> {steps[1]}")
+    print()
+
+
+LOOP_PROGRAMS = (
+    # (nombre, fuente con {n}, vueltas del ciclo medido en función de n)
+    ('Ciclo While', None, lambda n: n),
+    ('invariante del ciclo externo',
+     "int i = 0; int j = 0; int m = 7; int s = 0;\n"
+     "while (i < 10) {{\n  j = 0;\n  while (j < {n}) {{\n"
+     "    s = s + i * m + j;\n    j = j + 1;\n  }}\n  i = i + 1;\n}}\nprint(s);",
+     lambda n: 10 * n),
+    ('inducción (v * k)',
+     "int i = 0; int s = 0;\nwhile (i < {n}) {{\n"
+     "  s = s + i * 3 + i * 3;\n  print(i * 5);\n  i = i + 1;\n}}\nprint(s);",
+     lambda n: n),
+    ('multiplicación por 2',
+     "int i = 0; int x = 0.5;\nwhile (i < {n}) {{\n"
+     "  x = x * 2;\n  i = i + 1;\n}}\nprint(x);",
+     lambda n: n),
+)
+
+
+def bench_loops(n=2000):
+    print("== Ciclos: instrucciones por vuelta ==")
+    loop_passes = ('loop_invariant_motion', 'strength_reduction')
+    without = [name for name, _ in PASSES if name not in loop_passes]
+    rows = []
+    for name, template, laps in LOOP_PROGRAMS:
+        if template is None:
+            template = example(name).replace('{', '{{').replace('}', '}}').replace('< 5', '< {n}')
+        runs = []
+        for selected in (without, None):
+            steps = []
+            outputs = []
+            for size in (n, 2 * n):
+                quads = optimize_code(unoptimized_quads(template.format(n=size)), selected)['optimized']
+                code = generate_code(quads)['code']
+                result = execute_code(code)
+                steps.append(result['steps_executed'])
+                outputs.append(result['output'])
+            per_lap = (steps[1] - steps[0]) / (laps(2 * n) - laps(n))
+            runs.append((per_lap, timeit(lambda: execute_code(code)), outputs))
+        assert runs[0][2] == runs[1][2], name
+        (before, ms_before, _), (after, ms_after, _) = runs
+        rows.append((name, f'{before:.2f}', f'{after:.2f}', f'{1 - after / before:.0%}',
+                     f'{ms_before:.2f}', f'{ms_after:.2f}'))
+    report(rows, ('programa', 'instr./vuelta', 'con pases de ciclos', 'menos',
+                  'ms', 'ms con pases'))
+    print()
+
+
+BRANCH_PROGRAMS = (
+    ('Ciclo While', None),
+    ('condición con &&',
+     "int i = 0; int s = 0;\nwhile (i < {n} && s >= 0) {{\n  s = s + i;\n  i = i + 1;\n}}\nprint(s);"),
+    ('condición con || y !',
+     "int i = 0; int s = 0;\nwhile (!(i >= {n}) && (s < 0 || i != 7 || s > 3)) {{\n"
+     "  if (i > 3 || s == 0) {{\n    s = s + 1;\n  }}\n  i = i + 1;\n}}\nprint(s);"),
+)
+
+
+def bench_branches(n=20000):
+    print("== Condiciones: valor + jfalse vs cortocircuito y comparar-y-saltar ==")
+    rows = []
+    for name, template in BRANCH_PROGRAMS:
+        if template is None:
+            template = example(name).replace('{', '{{').replace('}', '}}').replace('< 5', '< {n}')
+        src = template.format(n=n)
+        runs = []
+        for quads in (value_condition_quads(src), unoptimized_quads(src)):
+            code = generate_code(optimize_code(quads)['optimized'])['code']
+            result = execute_code(code)
+            runs.append((result, timeit(lambda: execute_code(code))))
+        (old, t_old), (new, t_new) = runs
+        assert old['output'] == new['output'], name
+        rows.append((name, old['steps_executed'], new['steps_executed'],
+                     f"{1 - new['steps_executed'] / old['steps_executed']:.0%}",
+                     f'{t_old:.2f}', f'{t_new:.2f}'))
+    report(rows, ('programa', 'instrucciones', 'con saltos', 'menos', 'ms', 'ms con saltos'))
+
+    print()
+
+
+PEEPHOLE_PROGRAMS = (
+    ('if sin else en un ciclo',
+     "int i = 0; int pares = 0;\nwhile (i < 1000) {\n  if (i / 2 * 2 == i) {\n"
+     "    pares = pares + 1;\n  }\n  if (i > 500) {\n    print(i);\n  }\n  i = i + 1;\n}\nprint(pares);"),
+    ('ifs anidados', "int x = 7;\nint i = 0;\nwhile (i < 1000) {\n"
+     "  if (x > 1) {\n    if (x > 2) {\n      if (x > 3) {\n        i = i + 1;\n      }\n    }\n  }\n}\n"
+     "print(i);"),
+)
+
+
+def bench_peephole():
+    print("== Mirilla de saltos: instrucciones ejecutadas en /examples ==")
+    without = [name for name, _ in PASSES if name != 'peephole']
+    cases = [(e['name'], e['code']) for e in EXAMPLES] + list(PEEPHOLE_PROGRAMS)
+    rows = []
+    for name, src in cases:
+        quads = unoptimized_quads(src)
+        if quads is None:
+            rows.append((name, '-', '-', '-', '-', 'no compila'))
+            continue
+        runs = []
+        for selected in (without, None):
+            optimized = optimize_code(quads, selected)['optimized']
+            runs.append((len(optimized), execute_code(generate_code(optimized)['code'])))
+        (n_old, old), (n_new, new) = runs
+        assert old['output'] == new['output'], name
+        rows.append((name, n_old, n_new, old['steps_executed'], new['steps_executed'],
+                     f"{1 - new['steps_executed'] / max(old['steps_executed'], 1):.0%}"))
+    report(rows, ('programa', 'cuádruplos', 'con mirilla', 'pasos', 'pasos con mirilla', 'menos'))
+    print()
+
+
+LEXER_ALPHABET = ('int', 'float', 'while', 'print', 'true', 'x', 'y1', '_z', '0', '42', '3.14', '7.',
+                  '.5', '+', '-', '*', '/', '//', '=', '==', '!', '!=', '<', '<=', '>', '>=', '&',
+                  '&&', '|', '||', '(', ')', '{', '}', ';', ',', ' ', '\t', '\n', '\r', '@', '$', 'ñ')
+
+
+def lexer_noise(r, n):
+    """n piezas al azar de LEXER_ALPHABET: comentarios, números cortados, ilegales..."""
+    return ''.join(r.choice(LEXER_ALPHABET) for _ in range(n))
+
+
+def bench_lexer(n=20000):
+    print("== Lexer: PLY vs regex maestra (tokens/s) ==")
+    r = random.Random(0)
+    cases = (
+        ('sintético', synthetic_program(n)),
+        ('/examples', '\n'.join(e['code'] for e in EXAMPLES) * (n // 100)),
+        ('con errores', lexer_noise(r, n * 5)),
+    )
+    rows = []
+    for name, src in cases:
+        expected = ply_scan(src)
+        assert scan(src) == expected, name
+        count = len(expected)
+        # el camino anterior de analyze: LexToken de PLY y luego diccionarios
+        # (los errores se recolectan para no imprimir miles de líneas)
+        t_ply = timeit(lambda: token_dicts(tokenize(src, [])), repeat=3)
+        t_regex = timeit(lambda: scan(src).dicts(), repeat=3)
+        t_scan = timeit(lambda: scan(src), repeat=3)
+        rows.append((name, count, len(expected.errors),
+                     f'{count / t_ply * 1000:,.0f}', f'{count / t_regex * 1000:,.0f}',
+                     f'{count / t_scan * 1000:,.0f}', f'{t_ply / t_regex:.1f}x'))
+    report(rows, ('entrada', 'tokens', 'errores', 'PLY tok/s', 'regex tok/s',
+                  'solo scan tok/s', 'speedup'))
+
+    print()
+
+
+def editor_document(lines):
+    """Unas `lines` líneas de sentencias cortas y ciclos chicos, como las de un editor."""
+    out = []
+    i = 0
+    while len(out) < lines:
+        out += [f"int v{i} = {i};", f"while (v{i} > 0) {{", f"    v{i} = v{i} - 1;", "}",
+                f"print(v{i} * 2); // v{i}"]
+        i += 1
+    return '\n'.join(out[:lines]) + '\n'
+
+
+def bench_incremental(sizes=(100, 1000, 10000)):
+    print("== Análisis incremental: latencia por tecla ==")
+    typed = 'x = x + 1;\n'
+    rows = []
+    for lines in sizes:
+        src = editor_document(lines)
+        doc = Document(src)
+        middle = src.index('\n', len(src) // 2) + 1
+
+        def keystrokes():
+            # escribir una sentencia letra por letra a la mitad y borrarla
+            for i, ch in enumerate(typed):
+                doc.apply(middle + i, 0, ch)
+            for i in reversed(range(len(typed))):
+                doc.apply(middle + i, 1, '')
+
+        def full_keystrokes():
+            text = src
+            for i, ch in enumerate(typed):
+                text = text[:middle + i] + ch + text[middle + i:]
+                parser_parse(None, lexed=scan(text))
+            for i in reversed(range(len(typed))):
+                text = text[:middle + i] + text[middle + i + 1:]
+                parser_parse(None, lexed=scan(text))
+
+        keys = 2 * len(typed)
+        t_inc = timeit(keystrokes, repeat=3) / keys
+        t_full = timeit(full_keystrokes, repeat=1) / keys
+        assert doc.text() == src
+        rows.append((lines, len(doc.chunks), f'{t_full:.2f}', f'{t_inc:.3f}', f'{t_full / t_inc:.0f}x'))
+    report(rows, ('líneas', 'sentencias', 'completo ms/tecla', 'incremental ms/tecla', 'speedup'))
+
+    print()
+
+
+JIT_PROGRAMS = (
+    ('Ciclo While (n=100000)', example('Ciclo While').replace('< 5', '< 100000')),
+) + tuple((name, src.format(n=20000)) for name, src, _ in LOOP_PROGRAMS if src) + PEEPHOLE_PROGRAMS
+
+
+def same_execution(x, y):
+    """Mismo resultado de ejecución; los valores se comparan con constant_key (NaN, -0.0)."""
+    if x['success'] != y['success']:
+        return False
+    if not x['success']:
+        return x['error'] == y['error']
+    keys = ('output', 'steps_executed', 'truncated', 'reason')
+    return (all(x.get(k) == y.get(k) for k in keys)
+            and list(x['variables']) == list(y['variables'])
+            and all(constant_key(v) == constant_key(y['variables'][k]) for k, v in x['variables'].items()))
+
+
+def bench_jit():
+    print("== JIT: VM de bytecode vs función de Python ==")
+    rows = []
+    for name, src in JIT_PROGRAMS:
+        program = generate_code(compile_quads(src))['code']
+        expected = execute_code(program)
+        jit._cache.clear()
+        t0 = time.perf_counter()
+        got = execute_jit(program)
+        t_first = (time.perf_counter() - t0) * 1000
+        assert same_execution(expected, got), name
+        t_vm = timeit(lambda: execute_code(program), repeat=3)
+        t_jit = timeit(lambda: execute_jit(program), repeat=3)
+        rows.append((name, expected['steps_executed'], f'{t_vm:.2f}', f'{t_first:.2f}', f'{t_jit:.2f}',
+                     f'{t_vm / t_jit:.1f}x'))
+    report(rows, ('programa', 'pasos', 'VM ms', 'JIT 1a vez ms', 'JIT ms', 'aceleración'))
+    print(f"caché del JIT: {jit.jit_cache_stats()}")
+
+    print()
+
+
+def bench_profiler():
+    print("== Perfilador: costo y conteos ==")
+    rows = []
+    for name, src in JIT_PROGRAMS:
+        program = compile_source(src)[0]['phases']['codegen']['code']
+        t_off = timeit(lambda: execute_code(program), repeat=3)
+        t_on = timeit(lambda: profile_execution(program), repeat=3)
+        profile = profile_execution(program)['profile']
+        rows.append((name, profile['instructions'], len(profile['blocks']), f'{t_off:.2f}',
+                     f'{t_on:.2f}', f'{t_on / t_off:.1f}x'))
+    report(rows, ('programa', 'pasos', 'bloques', 'sin perfil ms', 'con perfil ms', 'costo'))
+
+    print()
+
+
+def bench_superinstructions(programs=500):
+    print("== Superinstrucciones: pares de instrucciones en un despacho ==")
+    rows = []
+    for name, src in JIT_PROGRAMS:
+        quads = compile_quads(src)
+        fused = assemble(quads)
+        plain = assemble(quads, superinstructions=False)
+        assert same_execution(execute_code(fused), execute_code(plain)), name
+        t_plain = timeit(lambda: execute_code(plain), repeat=5)
+        t_fused = timeit(lambda: execute_code(fused), repeat=5)
+        rows.append((name, sum(superinstruction_counts(fused).values()), f'{t_plain:.2f}',
+                     f'{t_fused:.2f}', f'{t_plain / t_fused:.2f}x'))
+    report(rows, ('programa', 'superinstr.', 'sin ms', 'con ms', 'aceleración'))
+
+    # cuántas veces se dispara cada una en el corpus
+    corpus = [src for _, src in JIT_PROGRAMS] + [e['code'] for e in EXAMPLES]
+    corpus += [random_program(seed) for seed in range(programs)]
+    static = {name: 0 for name, _, _ in SUPERINSTRUCTIONS.values()}
+    fired = dict(static)
+    steps = 0
+    for src in corpus:
+        compiled = compile_source(src)[0]
+        if not compiled['success']:
+            continue
+        program = compiled['phases']['codegen']['code']
+        for name, count in superinstruction_counts(program).items():
+            static[name] += count
+        result = profile_execution(program, max_steps=1_000_000)
+        steps += result['steps_executed']
+        for name, count in result['profile']['superinstructions'].items():
+            fired[name] += count
+    rows = [(name, static[name], fired[name], f'{200 * fired[name] / steps:.1f}%')
+            for name in sorted(fired, key=fired.get, reverse=True)]
+    report(rows, ('superinstrucción', 'en el código', 'disparos', '% de los pasos'))
+    saved = sum(fired.values())
+    print(f"corpus de {len(corpus)} programas: {steps} pasos, {saved} despachos ahorrados "
+          f"({100 * saved / steps:.1f}%)")
+
+    print()
+
+
+def _drain(run, keep=True):
+    """Consume un generador de stream_code/stream_jit: (trozos, resultado)."""
+    parts = []
+    while True:
+        try:
+            text = next(run)
+        except StopIteration as stop:
+            return parts, stop.value
+        if keep:
+            parts.append(text)
+
+
+def bench_streaming(lines=(100_000, 500_000)):
+    print("== Salida transmitida: memoria y primera salida ==")
+    rows = []
+    for n in lines:
+        src = f"int i = 0;\nwhile (i < {n}) {{\n  print(i * 1000003);\n  i = i + 1;\n}}"
+        program = compile_source(src)[0]['phases']['codegen']['code']
+        for label, streamed, max_output in (('todo junto', False, None), ('transmitido', True, None),
+                                            ('transmitido, tope 64 KB', True, 65536)):
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            if streamed:
+                run = STREAM_TIERS['vm'](program, max_output=max_output)
+                next(run)
+                first = time.perf_counter() - t0
+                # como un cliente: cada trozo se envía y se suelta
+                result = _drain(run, keep=False)[1]
+            else:
+                result = execute_code(program, max_output=max_output)
+                first = time.perf_counter() - t0
+            total = time.perf_counter() - t0
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rows.append((n, label, f'{first * 1000:.1f}', f'{total * 1000:.1f}', f'{peak / 1e6:.1f}',
+                         result.get('reason', '-')))
+    report(rows, ('líneas', 'modo', 'primera salida ms', 'total ms', 'memoria pico MB', 'corte'))
+
+    print()
+
+
+RUNAWAY_PROGRAMS = (
+    ('ciclo vacío', "int x = 0;\nwhile (1 < 2) {\n  x = x + 1;\n}\n"),
+    ('x = x * x', "int x = 3;\nwhile (1 < 2) {\n  x = x * x;\n}\n"),
+    ('x = x * 3', "int x = 3;\nwhile (1 < 2) {\n  x = x * 3;\n}\n"),
+    ('x = x + x', "int x = 3;\nwhile (1 < 2) {\n  x = x + x;\n}\n"),
+    ('print sin fin', "int x = 0;\nwhile (1 < 2) {\n  print(x);\n  x = x + 1;\n}\n"),
+)
+
+
+def bench_limits(timeout=0.2):
+    print(f"== Límites de ejecución: programas que no terminan, deadline {timeout * 1000:.0f} ms ==")
+    rows = []
+    for name, src in RUNAWAY_PROGRAMS:
+        program = compile_source(src)[0]['phases']['codegen']['code']
+        for tier, run in (('vm', execute_code), ('jit', execute_jit)):
+            t0 = time.perf_counter()
+            result = run(program, 5_000_000, timeout, 1_000_000)
+            elapsed = time.perf_counter() - t0
+            rows.append((name, tier, f'{elapsed * 1000:.1f}', result['steps_executed'], result.get('reason')))
+            assert result['success'] and result['truncated'], f'{name} ({tier}) no se cortó'
+            # un intervalo entre puntos de control no puede llevarse mucho más que el deadline
+            assert elapsed < timeout + 0.5, f'{name} ({tier}) tardó {elapsed:.2f} s'
+    report(rows, ('programa', 'nivel', 'ms', 'pasos', 'razón'))
+    print()
+
+
+RESPONSE_SHAPES = (
+    ('todo', {}, None),
+    ('todo, gzip', {}, 'gzip'),
+    ('include execution+metrics', {'include': ['execution', 'metrics']}, None),
+    ('include lexical', {'include': ['lexical']}, None),
+    ('columnar', {'encoding': 'columnar'}, None),
+    ('columnar, gzip', {'encoding': 'columnar'}, 'gzip'),
+)
+
+
+def bench_responses(sizes=(1000, 10000)):
+    print("== Respuestas de /compile: fases pedidas, columnas y gzip ==")
+    client = server.app.test_client()
+
+    def cold():
+        server.compilation_cache.clear()
+        server.execution_cache.clear()
+
+    rows = []
+    for n in sizes:
+        src = synthetic_program(n) + "print(x);\n"
+        for label, options, accept in RESPONSE_SHAPES:
+            payload = dict(options, code=src)
+            headers = {'Accept-Encoding': accept} if accept else {}
+            post = lambda: client.post('/compile', json=payload, headers=headers)
+            response = post()
+            assert response.status_code == 200
+            warm = timeit(post)
+            fresh = timeit(lambda: (cold(), post()), repeat=3)
+            rows.append((n, label, f'{len(response.data) / 1000:.1f}', f'{warm:.1f}', f'{fresh:.1f}'))
+    report(rows, ('sentencias', 'forma', 'KB', 'con caché ms', 'sin caché ms'))
+
+    print()
+
+
+BENCHMARKS = {
+    'vm': bench_vm,
+    'registers': bench_registers,
+    'concurrency': bench_concurrency,
+    'startup': bench_startup,
+    'parser_scaling': bench_parser_scaling,
+    'ast': bench_ast,
+    'deep': bench_deep,
+    'optimizer': bench_optimizer,
+    'loops': bench_loops,
+    'branches': bench_branches,
+    'peephole': bench_peephole,
+    'lexer': bench_lexer,
+    'incremental': bench_incremental,
+    'jit': bench_jit,
+    'profiler': bench_profiler,
+    'superinstructions': bench_superinstructions,
+    'streaming': bench_streaming,
+    'limits': bench_limits,
+    'responses': bench_responses,
+}
+
+
+if __name__ == '__main__':
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
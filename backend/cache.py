@@ -0,0 +1,138 @@
+# cache.py
+"""
+Caché de compilación direccionada por contenido.
+
+Secciones principales:
+1. COMPILER_VERSION:
+   - Hash del código fuente de los módulos del compilador. Cambia solo cuando
+     cambia el compilador, así una entrada vieja nunca se reutiliza.
+
+2. source_key(source_code):
+   - Llave de caché: sha256 de la versión del compilador más el código
+     fuente exacto. Sin normalizar: hasta un \f al final cambia los errores
+     del léxico.
+
+3. compiled_size(source_code, result) / execution_size(result):
+   - Tamaño estimado en bytes de la forma JSON de una entrada, a partir de
+     conteos que ya están en el resultado (tokens, nodos, cuádruplos,
+     instrucciones). Serializar la entrada para medirla costaba casi lo mismo
+     que la respuesta que la caché ahorra.
+
+4. LRUCache:
+   - Diccionario con expulsión LRU acotado por número de entradas y por bytes
+     (el tamaño que da quien guarda). Seguro entre hilos.
+   - Lleva contadores de aciertos, fallos y latencia de los aciertos.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_COMPILER_MODULES = ('lexer', 'ast_nodes', 'parser', 'semantic', 'intermediate',
+                     'optimizer', 'codegen', 'jit', 'pipeline')
+
+
+def _compiler_version():
+    h = hashlib.sha256()
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in _COMPILER_MODULES:
+        with open(os.path.join(base, name + '.py'), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+COMPILER_VERSION = _compiler_version()
+
+
+def source_key(source_code):
+    h = hashlib.sha256(COMPILER_VERSION.encode())
+    h.update(b'\0')
+    h.update(source_code.encode('utf-8'))
+    return h.hexdigest()
+
+
+# bytes aproximados de cada elemento en JSON (medidos sobre programas de ejemplo)
+ENTRY_BYTES = 512
+TOKEN_BYTES = 60
+NODE_BYTES = 40
+QUAD_BYTES = 32
+INSTRUCTION_BYTES = 8
+VARIABLE_BYTES = 32
+
+
+def compiled_size(source_code, result):
+    """Tamaño estimado de un resultado de pipeline.compile_source."""
+    phases = result['phases']
+    size = ENTRY_BYTES + len(source_code) + len(result.get('error') or '')
+    if 'lexical' in phases:
+        size += TOKEN_BYTES * phases['lexical']['count']
+    if 'syntax' in phases:
+        size += NODE_BYTES * phases['syntax']['node_count']
+    if 'intermediate' in phases:
+        size += QUAD_BYTES * len(phases['intermediate']['quadruples'])
+    if 'optimization' in phases:
+        size += QUAD_BYTES * len(phases['optimization']['optimized'])
+    if 'codegen' in phases:
+        size += INSTRUCTION_BYTES * len(phases['codegen']['code']['instructions'])
+    return size
+
+
+def execution_size(result):
+    """Tamaño estimado de un resultado de la fase de ejecución."""
+    return ENTRY_BYTES + len(result['output']) + VARIABLE_BYTES * len(result['variables'])
+
+
+class LRUCache:
+    """Caché LRU acotada por entradas y por bytes."""
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()   # llave -> (valor, tamaño)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._hit_time = 0.0
+
+    def get(self, key):
+        """Devuelve el valor o None. El valor no debe modificarse."""
+        start = time.perf_counter()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            self._hit_time += time.perf_counter() - start
+            return item[0]
+
+    def put(self, key, value, size):
+        with self._lock:
+            if size > self.max_bytes or self.max_entries <= 0:
+                return
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'avg_hit_latency': round(self._hit_time * 1000 / self.hits, 4) if self.hits else 0.0,
+            }
@@ -3,130 +3,893 @@
 Generación de "código objeto" y ejecución simple.
 
 Funciones principales:
-1. generate_code(optimized_quadruples):
+1. generate_code(optimized_quadruples, lines=None):
    - Entrada: Lista de cuádruplos optimizados.
-   - Salida: Diccionario con éxito y los cuádruplos encapsulados.
-   - Propósito: Preparar los cuádruplos para su ejecución.
-
-2. execute_code(code):
-   - Entrada: Lista de cuádruplos.
-   - Salida: Diccionario con éxito y salida de la ejecución.
-   - Propósito: Ejecutar los cuádruplos en una máquina virtual (VM) simulada.
-   - Detalles: Implementa un ciclo que interpreta cada cuádruplo y mantiene el estado de la VM.
+   - Salida: Diccionario con éxito y el programa en bytecode.
+   - Propósito: Traducir los cuádruplos a un bytecode compacto (ver assemble).
+
+2. assemble(quadruples):
+   - Baja los cuádruplos a un arreglo denso de enteros: cada instrucción ocupa
+     4 casillas (opcode, a, b, c).
+   - Los operandos son índices de registro. Las constantes viven en un pool
+     que se precarga al inicio del banco de registros, así la VM nunca
+     distingue entre literal y variable.
+   - Las etiquetas desaparecen: los saltos apuntan directamente al índice de
+     instrucción destino.
+   - fuse(instructions): Los pares frecuentes de instrucciones consecutivas
+     (SUPERINSTRUCTIONS, p. ej. suma + goto al cerrar un ciclo) se marcan
+     como una superinstrucción que la VM despacha una sola vez.
+
+3. Semántica de los cuádruplos (compartida con optimizer.py):
+   - literal_value(x): Operando → literal, o None si es un nombre.
+   - constant_key(lit): Llave de un literal que no confunde 1, 1.0 y True, ni
+     0.0 con -0.0.
+   - quad_operands(quad): Nombres que lee y nombre que escribe un cuádruplo.
+   - evaluate(op, a, b): Valor que la VM calcula para un operador.
+   - branch_taken(op, a, b): Si la VM toma un salto; JUMP_OPS son los
+     cuádruplos de salto (goto, jfalse/jtrue y los de comparar y saltar).
+
+4. allocate_registers(quadruples):
+   - Asigna un slot fijo a cada variable y reutiliza los slots de temporales
+     cuyos rangos de vida no se solapan (linear scan).
+
+5. execute_code(code, max_steps=None, timeout=None, max_output=None, profile=None):
+   - Entrada: Programa generado por assemble (o lista de cuádruplos) y
+     límites opcionales de pasos, de tiempo y de caracteres de salida.
+   - Salida: Diccionario con éxito, salida de la ejecución y valores finales
+     de las variables.
+   - Propósito: Ejecutar el bytecode en una máquina virtual (VM) de registros.
+   - Detalles: Ciclo de despacho sobre opcodes enteros, sin búsquedas por nombre.
+     Si se agota un límite la ejecución se corta y se marca como truncada.
+     Con profile registra cada tramo ejecutado (ver profiler.py).
+   - La VM es un generador (run_vm) que cede en los puntos de control;
+     stream_code(...) lo usa para entregar la salida por partes mientras el
+     programa corre, con memoria acotada (ver Output y stream).
 """
 
-import io
-import sys
+import operator
+import time
+
+from intermediate import is_temp
+
+# --------------------------
+# Opcodes
+# --------------------------
+OP_MOV = 0      # r[c] = r[a]
+OP_ADD = 1      # r[c] = r[a] + r[b]
+OP_SUB = 2      # r[c] = r[a] - r[b]
+OP_MUL = 3      # r[c] = r[a] * r[b]
+OP_DIV = 4      # r[c] = r[a] / r[b]  (entera si ambos son int)
+OP_LT = 5       # r[c] = r[a] < r[b]
+OP_LE = 6       # r[c] = r[a] <= r[b]
+OP_GT = 7       # r[c] = r[a] > r[b]
+OP_GE = 8       # r[c] = r[a] >= r[b]
+OP_EQ = 9       # r[c] = r[a] == r[b]
+OP_NE = 10      # r[c] = r[a] != r[b]
+OP_AND = 11     # r[c] = bool(r[a]) and bool(r[b])
+OP_OR = 12      # r[c] = bool(r[a]) or bool(r[b])
+OP_NOT = 13     # r[c] = not r[a]
+OP_JFALSE = 14  # si not r[a]: pc = c
+OP_GOTO = 15    # pc = c
+OP_PRINT = 16   # imprime r[a]
+OP_JTRUE = 17   # si r[a]: pc = c
+# comparación y salto en una sola instrucción (condiciones de if/while)
+OP_JLT = 18     # si r[a] < r[b]: pc = c
+OP_JLE = 19     # si r[a] <= r[b]: pc = c
+OP_JGT = 20     # si r[a] > r[b]: pc = c
+OP_JGE = 21     # si r[a] >= r[b]: pc = c
+OP_JEQ = 22     # si r[a] == r[b]: pc = c
+OP_JNE = 23     # si r[a] != r[b]: pc = c
+# "si no": con NaN `not (a < b)` no es lo mismo que `a >= b`
+OP_JNLT = 24    # si not r[a] < r[b]: pc = c
+OP_JNLE = 25    # si not r[a] <= r[b]: pc = c
+OP_JNGT = 26    # si not r[a] > r[b]: pc = c
+OP_JNGE = 27    # si not r[a] >= r[b]: pc = c
+
+# Superinstrucciones: la instrucción en pc y la de pc + 1 en un solo
+# despacho. Los operandos de la segunda se leen de pc + 1, que queda intacta
+# (un salto puede caer en ella), así que los destinos y los pasos no cambian.
+OP_ADD_GOTO = 28   # r[c] = r[a] + r[b]; goto
+OP_SUB_GOTO = 29   # r[c] = r[a] - r[b]; goto
+OP_ADD_ADD = 30    # dos sumas
+OP_MOV_MOV = 31    # dos copias
+OP_MOV_ADD = 32    # copia (p. ej. cargar una constante) y suma
+OP_ADD_MOV = 33    # suma y copia a una variable
+OP_JNLT_ADD = 34   # jnlt; si no salta, suma
+OP_PRINT_ADD = 35  # print y suma
+
+# cuádruplo -> opcode
+OPCODES = {
+    'assign': OP_MOV,
+    '+': OP_ADD, '-': OP_SUB, '*': OP_MUL, '/': OP_DIV,
+    '<': OP_LT, '<=': OP_LE, '>': OP_GT, '>=': OP_GE,
+    '==': OP_EQ, '!=': OP_NE,
+    'and': OP_AND, 'or': OP_OR, 'not': OP_NOT,
+    'jfalse': OP_JFALSE, 'goto': OP_GOTO, 'print': OP_PRINT,
+    'jtrue': OP_JTRUE,
+    'jlt': OP_JLT, 'jle': OP_JLE, 'jgt': OP_JGT, 'jge': OP_JGE,
+    'jeq': OP_JEQ, 'jne': OP_JNE,
+    'jnlt': OP_JNLT, 'jnle': OP_JNLE, 'jngt': OP_JNGT, 'jnge': OP_JNGE,
+}
+
+OPNAMES = {v: k for k, v in OPCODES.items()}
+
+# superinstrucción -> (nombre, primer opcode, segundo opcode)
+SUPERINSTRUCTIONS = {
+    OP_ADD_GOTO: ('add_goto', OP_ADD, OP_GOTO),
+    OP_SUB_GOTO: ('sub_goto', OP_SUB, OP_GOTO),
+    OP_ADD_ADD: ('add_add', OP_ADD, OP_ADD),
+    OP_MOV_MOV: ('mov_mov', OP_MOV, OP_MOV),
+    OP_MOV_ADD: ('mov_add', OP_MOV, OP_ADD),
+    OP_ADD_MOV: ('add_mov', OP_ADD, OP_MOV),
+    OP_JNLT_ADD: ('jnlt_add', OP_JNLT, OP_ADD),
+    OP_PRINT_ADD: ('print_add', OP_PRINT, OP_ADD),
+}
+_FUSE = {(first, second): op for op, (_, first, second) in SUPERINSTRUCTIONS.items()}
+
+# cada cuántos pasos la VM revisa presupuesto y deadline
+CHECK_INTERVAL = 4096
+
+# tamaño de los enteros: el costo de una multiplicación crece con sus bits, y
+# un ciclo que eleva al cuadrado los duplica en cada vuelta. Un producto de
+# más de BIG_INT_BITS adelanta el punto de control al siguiente salto; uno de
+# más de MAX_INT_BITS corta la ejecución ('int_limit'). Suma y resta crecen a
+# lo más un bit por paso, así que max_steps ya acota su costo; lo que pase el
+# tope así se descarta al final (ver bounded_ints). MAX_INT_BITS queda bajo el
+# máximo de dígitos que Python convierte a texto (4300), para print y el JSON.
+BIG_INT_BITS = 1 << 12
+MAX_INT_BITS = 14_000
+
+# al transmitir la salida: segundos entre trozos y caracteres que fuerzan uno
+STREAM_INTERVAL = 0.05
+STREAM_CHUNK = 64 * 1024
+
+# operandos que cada cuádruplo lee (posiciones 1 y 2)
+_READS = {
+    OP_MOV: (True, False), OP_NOT: (True, False),
+    OP_JFALSE: (True, False), OP_JTRUE: (True, False), OP_GOTO: (False, False),
+    OP_PRINT: (True, False),
+}
+_JUMPS = (OP_JFALSE, OP_GOTO, OP_JTRUE, OP_JLT, OP_JLE, OP_JGT, OP_JGE, OP_JEQ, OP_JNE,
+          OP_JNLT, OP_JNLE, OP_JNGT, OP_JNGE)
+_NO_RESULT = _JUMPS + (OP_PRINT,)
+
+# cuádruplos de salto (etiqueta destino en la posición 3)
+JUMP_OPS = frozenset(OPNAMES[op] for op in _JUMPS)
 
-def generate_code(optimized):
-    # Solo encapsulamos la lista y retornamos success
-    return {'success': True, 'code': optimized}
 
-def execute_code(code):
-    # code es la lista de cuádruplos
+# --------------------------
+# Superinstrucciones
+# --------------------------
+def base_opcode(op):
+    """Opcode de la primera instrucción de una superinstrucción (o el mismo op)."""
+    fused = SUPERINSTRUCTIONS.get(op)
+    return op if fused is None else fused[1]
+
+
+def opcode_name(op):
+    fused = SUPERINSTRUCTIONS.get(op)
+    return OPNAMES[op] if fused is None else fused[0]
+
+
+def fuse(instructions):
+    """
+    Reemplaza en su lugar el opcode de cada instrucción que forma una
+    superinstrucción con la siguiente. Los pares pueden solaparse: la
+    segunda instrucción conserva su propio opcode para cuando se salta a ella.
+    """
+    ops = instructions[0::4]
+    for i in range(len(ops) - 1):
+        fused = _FUSE.get((ops[i], ops[i + 1]))
+        if fused is not None:
+            instructions[4 * i] = fused
+    return instructions
+
+
+def superinstruction_counts(program):
+    """Cuántas superinstrucciones de cada tipo tiene el programa."""
+    counts = {}
+    for op in program['instructions'][0::4]:
+        if op in SUPERINSTRUCTIONS:
+            name = SUPERINSTRUCTIONS[op][0]
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+# --------------------------
+# Ensamblador
+# --------------------------
+def literal_value(x):
+    """Resuelve un operando a literal igual que la VM original; None si es un nombre."""
+    if isinstance(x, (int, float, bool)):
+        return x
+    if x is None:
+        return 0
+    if isinstance(x, str):
+        head = x[:1]
+        if head.isalpha() or head == '_' or head == '$':
+            # identificador o temporal, aunque se llame inf o nan: los
+            # literales del programa llegan como int/float
+            return None
+        if x.isdigit():
+            return int(x)
+        try:
+            return float(x)
+        except ValueError:
+            return None
+    return None
+
+
+def constant_key(lit):
+    """
+    Llave de un literal para el pool de constantes. Como llaves de un dict
+    1, 1.0 y True coinciden, y también 0.0 y -0.0; estas no.
+    """
+    return (type(lit), repr(lit))
+
+
+def quad_operands(quad):
+    """(nombres leídos, nombre escrito o None) de un cuádruplo ejecutable."""
+    op, a1, a2, res = quad
+    opcode = OPCODES[op]
+    reads_a, reads_b = _READS.get(opcode, (True, True))
+    reads = []
+    if reads_a and literal_value(a1) is None:
+        reads.append(a1)
+    if reads_b and literal_value(a2) is None:
+        reads.append(a2)
+    return reads, (None if opcode in _NO_RESULT else res)
+
+
+def _div(a, b):
     try:
-        quads = code
-        # primer pase: construir mapa de labels -> índice
-        labels = {}
-        for i, q in enumerate(quads):
-            op, a1, a2, res = q
-            if op == 'label':
-                labels[a1] = i
-
-        # VM state
-        pc = 0
-        vars_ = {}   # variables y temporales
-        output_buf = io.StringIO()
-
-        # ayuda para obtener valor real (resolver literales y variables)
-        def val(x):
-            if isinstance(x, (int, float, bool)):
-                return x
-            # si x es string que representa número?
-            try:
-                if isinstance(x, str):
-                    # try int
-                    if x.isdigit(): return int(x)
-                    # float?
-                    try:
-                        return float(x)
-                    except:
-                        pass
-                # otherwise variable lookup
-                return vars_.get(x, 0)
-            except Exception:
-                return vars_.get(x, 0)
-
-        while pc < len(quads):
-            op, a1, a2, res = quads[pc]
-
-            if op == 'label':
-                pc += 1
-                continue
+        # división entera si ambos son int
+        if isinstance(a, int) and isinstance(b, int):
+            return a // b
+        return a / b
+    except Exception:
+        return 0
 
-            if op == 'assign':
-                # a1 could be temp name or literal
-                v = val(a1)
-                vars_[res] = v
-                pc += 1
-                continue
 
-            if op in ('+', '-', '*', '/'):
-                l = val(a1)
-                r = val(a2)
-                if op == '+': vars_[res] = l + r
-                elif op == '-': vars_[res] = l - r
-                elif op == '*': vars_[res] = l * r
-                elif op == '/':
-                    # integer division if both ints
-                    try:
-                        if isinstance(l, int) and isinstance(r, int):
-                            vars_[res] = l // r
-                        else:
-                            vars_[res] = l / r
-                    except Exception:
-                        vars_[res] = 0
-                pc += 1
-                continue
+_EVALUATORS = {
+    OP_MOV: lambda a, b: a,
+    OP_ADD: operator.add, OP_SUB: operator.sub, OP_MUL: operator.mul, OP_DIV: _div,
+    OP_LT: operator.lt, OP_LE: operator.le, OP_GT: operator.gt, OP_GE: operator.ge,
+    OP_EQ: operator.eq, OP_NE: operator.ne,
+    OP_AND: lambda a, b: bool(a) and bool(b),
+    OP_OR: lambda a, b: bool(a) or bool(b),
+    OP_NOT: lambda a, b: not a,
+}
+
+
+_BRANCH_TESTS = {
+    OP_GOTO: lambda a, b: True,
+    OP_JFALSE: lambda a, b: not a, OP_JTRUE: lambda a, b: bool(a),
+    OP_JLT: operator.lt, OP_JLE: operator.le, OP_JGT: operator.gt, OP_JGE: operator.ge,
+    OP_JEQ: operator.eq, OP_JNE: operator.ne,
+    OP_JNLT: lambda a, b: not a < b, OP_JNLE: lambda a, b: not a <= b,
+    OP_JNGT: lambda a, b: not a > b, OP_JNGE: lambda a, b: not a >= b,
+}
+
+
+def branch_taken(op, a, b=None):
+    """True si el salto `op` con operandos ya resueltos se toma en la VM."""
+    return bool(_BRANCH_TESTS[OPCODES[op]](a, b))
+
+
+def evaluate(op, a, b=None):
+    """
+    Valor que la VM calcula para el cuádruplo `op` con operandos ya resueltos
+    (mismas reglas que execute_code: división entera entre int y 0 si la
+    división falla). Si la operación falla, lanza la misma excepción que la VM.
+    """
+    fn = _EVALUATORS.get(OPCODES[op])
+    if fn is None:
+        raise ValueError(f"'{op}' no produce un valor")
+    return fn(a, b)
 
-            if op == 'not':
-                v = val(a1)
-                vars_[res] = not bool(v)
-                pc += 1
+
+def allocate_registers(quads):
+    """
+    Asigna un slot fijo a cada nombre de los cuádruplos.
+
+    Las variables del programa reciben un slot propio cada una. Los
+    temporales se asignan con linear scan: dos temporales comparten slot si
+    sus rangos de vida no se solapan. Un rango que cruza un ciclo (o que se
+    lee antes de escribirse dentro de él) se extiende a todo el ciclo.
+
+    Retorna (slots, count): slots es {nombre: índice}.
+    """
+    variables = {}
+    intervals = {}   # temporal -> [inicio, fin, empieza_con_escritura]
+    labels = {}
+    loops = []
+
+    for i, q in enumerate(quads):
+        op = q[0]
+        if op == 'label':
+            labels[q[1]] = i
+            continue
+        if op not in OPCODES:
+            continue
+        reads, write = quad_operands(q)
+        if op in JUMP_OPS and q[3] in labels:
+            # salto hacia atrás: [etiqueta, salto] forma un ciclo
+            loops.append((labels[q[3]], i))
+        for name, is_write in [(x, False) for x in reads] + [(write, True)]:
+            if name is None:
                 continue
+            if not is_temp(name):
+                variables.setdefault(name, len(variables))
+            elif name in intervals:
+                intervals[name][1] = i
+            else:
+                intervals[name] = [i, i, is_write]
+
+    # extender rangos que viven a través de un ciclo
+    changed = True
+    while changed:
+        changed = False
+        for lo, hi in loops:
+            for iv in intervals.values():
+                start, end, write_first = iv
+                if end < lo or start > hi:
+                    continue
+                inside = lo <= start and end <= hi
+                if inside and write_first:
+                    continue
+                if start > lo or end < hi:
+                    iv[0], iv[1], iv[2] = min(start, lo), max(end, hi), False
+                    changed = True
+
+    # linear scan sobre los temporales
+    slots = dict(variables)
+    count = len(variables)
+    free = []
+    active = []   # (fin, slot)
+    for name, (start, end, write_first) in sorted(intervals.items(), key=lambda kv: kv[1][0]):
+        still = []
+        for a_end, a_slot in active:
+            # en el mismo cuádruplo las lecturas ocurren antes que la escritura
+            if a_end < start or (a_end == start and write_first):
+                free.append(a_slot)
+            else:
+                still.append((a_end, a_slot))
+        active = still
+        if free:
+            slot = free.pop()
+        else:
+            slot = count
+            count += 1
+        slots[name] = slot
+        active.append((end, slot))
+
+    return slots, count
 
-            if op == 'jfalse':
-                cond = val(a1)
-                if not bool(cond):
-                    # jump to label res
-                    lbl = res
-                    if lbl in labels:
-                        pc = labels[lbl] + 1
+
+def assemble(quads, lines=None, superinstructions=True):
+    """
+    Traduce cuádruplos a bytecode.
+
+    Retorna {'instructions', 'constants', 'variables', 'register_count', 'temporaries'}.
+    Con superinstructions los pares frecuentes se fusionan (ver fuse).
+    Si se pasan lines (línea de código fuente de cada cuádruplo) agrega
+    'debug': {'quads', 'lines', 'labels'}, es decir, el cuádruplo y la línea
+    de cada instrucción y la instrucción a la que apunta cada etiqueta.
+    """
+    # primer pase: offsets de etiquetas y pool de constantes
+    labels = {}
+    const_index = {}
+    constants = []
+    pc = 0
+    executable = []
+    origin = []
+
+    for i, q in enumerate(quads):
+        op, a1, a2, _ = q
+        if op == 'label':
+            labels[a1] = pc
+            continue
+        opcode = OPCODES.get(op)
+        if opcode is None:
+            # op desconocido: la VM original lo saltaba
+            continue
+        reads_a, reads_b = _READS.get(opcode, (True, True))
+        for x, used in ((a1, reads_a), (a2, reads_b)):
+            lit = literal_value(x) if used else None
+            if lit is not None and constant_key(lit) not in const_index:
+                const_index[constant_key(lit)] = len(constants)
+                constants.append(lit)
+        executable.append(q)
+        origin.append(i)
+        pc += 1
+
+    nconst = len(constants)
+
+    slots, nslots = allocate_registers(quads)
+
+    def reg(x):
+        lit = literal_value(x)
+        if lit is None:
+            return nconst + slots[x]
+        return const_index[constant_key(lit)]
+
+    # segundo pase: emitir con índices de registro definitivos
+    end = pc
+    instructions = []
+    emit = instructions.extend
+    for op, a1, a2, res in executable:
+        opcode = OPCODES[op]
+        reads_a, reads_b = _READS.get(opcode, (True, True))
+        a = reg(a1) if reads_a else 0
+        b = reg(a2) if reads_b else 0
+        if opcode in _JUMPS:
+            # etiqueta inexistente -> saltar al final (detiene la VM)
+            c = labels.get(res, end)
+        elif opcode == OP_PRINT:
+            c = 0
+        else:
+            c = reg(res)
+        emit((opcode, a, b, c))
+    if superinstructions:
+        fuse(instructions)
+
+    program = {
+        'instructions': instructions,
+        'constants': constants,
+        'variables': {name: nconst + i for name, i in slots.items() if not is_temp(name)},
+        'register_count': nconst + nslots,
+        'temporaries': sum(1 for name in slots if is_temp(name)),
+    }
+    if lines is not None:
+        program['debug'] = {
+            'quads': origin,
+            'lines': [lines[i] for i in origin],
+            'labels': labels,
+        }
+    return program
+
+
+def disassemble(program):
+    """Listado legible del bytecode (útil para depurar)."""
+    code = program['instructions']
+    lines = []
+    for pc in range(0, len(code), 4):
+        op, a, b, c = code[pc:pc + 4]
+        lines.append(f"{pc // 4:4d}  {opcode_name(op):<9} {a} {b} {c}")
+    return '\n'.join(lines)
+
+
+def generate_code(optimized, lines=None):
+    try:
+        return {'success': True, 'code': assemble(optimized, lines)}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+# --------------------------
+# Máquina virtual
+# --------------------------
+class Output:
+    """
+    Salida de un programa en ejecución. La VM agrega cada print a parts; los
+    caracteres se cuentan en los puntos de control (full), no en cada print,
+    así que el tope limit (None: sin tope) puede pasarse por lo que se
+    imprima en CHECK_INTERVAL pasos. Lo que excede el tope nunca se entrega.
+    """
+
+    __slots__ = ('parts', 'write', 'limit', 'size', 'counted', 'sent')
+
+    def __init__(self, limit=None):
+        self.parts = []
+        self.write = self.parts.append
+        self.limit = limit
+        self.size = 0       # caracteres escritos hasta el último conteo
+        self.counted = 0    # partes ya sumadas a size
+        self.sent = 0       # caracteres ya entregados por take()
+
+    def full(self):
+        """Cuenta lo escrito desde la última vez; True si ya se pasó del tope."""
+        parts = self.parts
+        if len(parts) > self.counted:
+            self.size += sum(map(len, parts[self.counted:]))
+            self.counted = len(parts)
+        return self.limit is not None and self.size > self.limit
+
+    def pending(self):
+        """Caracteres escritos que take() todavía no entrega."""
+        self.full()
+        return self.size - self.sent
+
+    def take(self):
+        """Entrega lo escrito desde la última llamada (recortado al tope) y lo libera."""
+        self.full()
+        text = ''.join(self.parts)
+        self.parts.clear()
+        self.counted = 0
+        if self.limit is not None:
+            text = text[:max(0, self.limit - self.sent)]
+        self.sent += len(text)
+        return text
+
+
+def execution_result(output, variables, steps, reason):
+    result = {
+        'success': True,
+        'output': output,
+        'variables': variables,
+        'steps_executed': steps,
+        'truncated': reason is not None,
+    }
+    if reason is not None:
+        result['reason'] = reason
+    return result
+
+
+def bounded_ints(reason, variables):
+    """
+    Las variables finales que pasan de MAX_INT_BITS (solo pueden llegar ahí
+    sumando) quedan en None y la ejecución se marca 'int_limit' si no tenía
+    otra razón de corte. Retorna la razón.
+    """
+    for name, value in variables.items():
+        if value.__class__ is int and value.bit_length() > MAX_INT_BITS:
+            variables[name] = None
+            reason = reason or 'int_limit'
+    return reason
+
+
+def finish(run, out):
+    """
+    Corre hasta el final un generador de ejecución (run_vm o jit.run_jit) y
+    retorna su (reason, steps, variables). Una salida que pasa el tope corta
+    la ejecución en un punto de control; si pasa al final también cuenta.
+    """
+    while True:
+        try:
+            next(run)
+        except StopIteration as stop:
+            reason, steps, variables = stop.value
+            break
+    if reason is None and out.full():
+        reason = 'output_limit'
+    return bounded_ints(reason, variables), steps, variables
+
+
+def stream(run, out, interval=None):
+    """
+    Generador: corre run y va entregando la salida en trozos, a lo más uno
+    cada interval segundos (STREAM_INTERVAL) salvo que se junten
+    STREAM_CHUNK caracteres. Retorna el resultado de la ejecución sin 'output'.
+    """
+    interval = STREAM_INTERVAL if interval is None else interval
+    clock = time.perf_counter
+    last = clock()
+    while True:
+        try:
+            next(run)
+        except StopIteration as stop:
+            reason, steps, variables = stop.value
+            break
+        if clock() - last >= interval or out.pending() >= STREAM_CHUNK:
+            text = out.take()
+            if text:
+                yield text
+            last = clock()
+    if reason is None and out.full():
+        reason = 'output_limit'
+    reason = bounded_ints(reason, variables)
+    text = out.take()
+    if text:
+        yield text
+    result = execution_result(None, variables, steps, reason)
+    del result['output']
+    return result
+
+
+def run_vm(program, max_steps=None, timeout=None, out=None, profile=None):
+    """
+    La VM como generador: ejecuta program escribiendo en out (un Output) y
+    cede el control en cada punto de control con salida pendiente. Retorna
+    (reason, steps, variables); reason es None si el programa terminó.
+
+    max_steps limita las instrucciones ejecutadas y timeout (segundos) el
+    tiempo de pared; None es sin límite. Los pasos se acumulan por bloque en
+    cada salto tomado (entre saltos la ejecución es lineal), y los límites se
+    revisan cada CHECK_INTERVAL pasos, así el despacho no paga nada extra
+    (salvo con enteros grandes: ver MAX_INT_BITS).
+
+    profile es un colector opcional (ver profiler.Profile): con él el punto
+    de control corre en cada salto tomado y le pasa el tramo lineal recién
+    ejecutado, record(inicio, instrucciones, destino). Sin él la VM no cambia.
+    """
+    out = Output() if out is None else out
+    flat = program['instructions']
+    # agrupar en tuplas: desempaquetar es más barato que 4 indexaciones
+    insns = list(zip(*[iter(flat)] * 4))
+    n = len(insns)
+
+    # banco de registros: [constantes | variables | slots de temporales]
+    r = list(program['constants'])
+    r.extend([0] * (program['register_count'] - len(r)))
+
+    write = out.write
+    pending = out.parts
+    pc = 0
+
+    if max_steps is None:
+        max_steps = float('inf')
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    steps = 0
+    mark = 0        # inicio del bloque lineal en curso
+    # due: próximo punto de control de los límites; checkpoint: próxima
+    # salida del ciclo de despacho (la misma, salvo al perfilar)
+    due = checkpoint = min(CHECK_INTERVAL, max_steps)
+    if profile is not None:
+        # perfilando: cada salto tomado sale del despacho
+        checkpoint = min(1, max_steps)
+        seg_start = seg_steps = 0
+        profile.begin()
+    reason = None
+
+    while True:
+        while pc < n:
+            op, a, b, c = insns[pc]
+            pc += 1
+
+            if op >= OP_ADD_GOTO:
+                # superinstrucciones; la segunda instrucción está en pc
+                if op == OP_ADD_GOTO:
+                    r[c] = r[a] + r[b]
+                    steps += pc + 1 - mark
+                    pc = mark = insns[pc][3]
+                    if steps >= checkpoint:
+                        break
+                elif op == OP_JNLT_ADD:
+                    if not r[a] < r[b]:
+                        steps += pc - mark
+                        pc = mark = c
+                        if steps >= checkpoint:
+                            break
                     else:
-                        # label not found -> halt
+                        _, a, b, c = insns[pc]
+                        r[c] = r[a] + r[b]
+                        pc += 1
+                elif op == OP_ADD_ADD:
+                    r[c] = r[a] + r[b]
+                    _, a, b, c = insns[pc]
+                    r[c] = r[a] + r[b]
+                    pc += 1
+                elif op == OP_PRINT_ADD:
+                    write(f"{r[a]}\n")
+                    _, a, b, c = insns[pc]
+                    r[c] = r[a] + r[b]
+                    pc += 1
+                elif op == OP_MOV_MOV:
+                    r[c] = r[a]
+                    _, a, b, c = insns[pc]
+                    r[c] = r[a]
+                    pc += 1
+                elif op == OP_SUB_GOTO:
+                    r[c] = r[a] - r[b]
+                    steps += pc + 1 - mark
+                    pc = mark = insns[pc][3]
+                    if steps >= checkpoint:
                         break
-                else:
+                elif op == OP_MOV_ADD:
+                    r[c] = r[a]
+                    _, a, b, c = insns[pc]
+                    r[c] = r[a] + r[b]
                     pc += 1
-                continue
-
-            if op == 'goto':
-                lbl = res
-                if lbl in labels:
-                    pc = labels[lbl] + 1
-                else:
+                elif op == OP_ADD_MOV:
+                    r[c] = r[a] + r[b]
+                    _, a, b, c = insns[pc]
+                    r[c] = r[a]
+                    pc += 1
+            elif op == OP_MOV:
+                r[c] = r[a]
+            elif op == OP_ADD:
+                r[c] = r[a] + r[b]
+            elif op == OP_JFALSE:
+                if not r[a]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+            elif op == OP_GOTO:
+                steps += pc - mark
+                pc = mark = c
+                if steps >= checkpoint:
                     break
-                continue
+            elif op == OP_JNLT:
+                if not r[a] < r[b]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+            elif op == OP_SUB:
+                r[c] = r[a] - r[b]
+            elif op == OP_MUL:
+                v = r[a] * r[b]
+                if v.__class__ is int and v.bit_length() > BIG_INT_BITS:
+                    if v.bit_length() > MAX_INT_BITS:
+                        steps += pc - mark
+                        mark = pc
+                        reason = 'int_limit'
+                        break
+                    # entero grande: revisar los límites en el próximo salto
+                    due = checkpoint = steps
+                r[c] = v
+            elif op == OP_JNGT:
+                if not r[a] > r[b]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+            elif op == OP_JNLE:
+                if not r[a] <= r[b]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+            elif op == OP_JNGE:
+                if not r[a] >= r[b]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+            elif op == OP_JNE:
+                if r[a] != r[b]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+            elif op == OP_JEQ:
+                if r[a] == r[b]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+            elif op == OP_LT:
+                r[c] = r[a] < r[b]
+            elif op == OP_PRINT:
+                write(f"{r[a]}\n")
+            elif op == OP_DIV:
+                l = r[a]
+                rr = r[b]
+                try:
+                    # división entera si ambos son int
+                    if isinstance(l, int) and isinstance(rr, int):
+                        r[c] = l // rr
+                    else:
+                        r[c] = l / rr
+                except Exception:
+                    r[c] = 0
+            elif op == OP_LE:
+                r[c] = r[a] <= r[b]
+            elif op == OP_GT:
+                r[c] = r[a] > r[b]
+            elif op == OP_GE:
+                r[c] = r[a] >= r[b]
+            elif op == OP_EQ:
+                r[c] = r[a] == r[b]
+            elif op == OP_NE:
+                r[c] = r[a] != r[b]
+            elif op == OP_AND:
+                r[c] = bool(r[a]) and bool(r[b])
+            elif op == OP_OR:
+                r[c] = bool(r[a]) or bool(r[b])
+            elif op == OP_NOT:
+                r[c] = not r[a]
+            elif op == OP_JTRUE:
+                if r[a]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+            elif op == OP_JLT:
+                if r[a] < r[b]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+            elif op == OP_JLE:
+                if r[a] <= r[b]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+            elif op == OP_JGT:
+                if r[a] > r[b]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+            elif op == OP_JGE:
+                if r[a] >= r[b]:
+                    steps += pc - mark
+                    pc = mark = c
+                    if steps >= checkpoint:
+                        break
+        else:
+            # fin normal del programa
+            steps += pc - mark
+            break
+        if reason is not None:
+            break
 
-            if op == 'print':
-                v = val(a1)
-                output_buf.write(str(v) + "\n")
-                pc += 1
+        if profile is not None:
+            profile.record(seg_start, steps - seg_steps, pc)
+            seg_start, seg_steps = pc, steps
+            checkpoint = min(steps + 1, max_steps)
+            if steps < due:
+                # los límites se revisan en los mismos pasos que sin perfil
                 continue
 
-            # Unknown op: skip
-            pc += 1
+        # punto de control: presupuesto de pasos, deadline y tope de salida
+        if steps >= max_steps:
+            reason = 'step_limit'
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            reason = 'deadline'
+            break
+        if out.full():
+            reason = 'output_limit'
+            break
+        due = min(steps + CHECK_INTERVAL, max_steps)
+        checkpoint = due if profile is None else min(steps + 1, max_steps)
+        if pending:
+            # hay salida sin entregar: quien consume puede enviarla
+            yield
+
+    if profile is not None and steps > seg_steps:
+        # último tramo: termina al caer del final del programa
+        profile.record(seg_start, steps - seg_steps, None)
+
+    return reason, steps, {name: r[i] for name, i in program['variables'].items()}
+
+
+def execute_code(code, max_steps=None, timeout=None, max_output=None, profile=None):
+    """
+    Ejecuta el programa en la VM (ver run_vm) y retorna el resultado con
+    toda la salida; max_output es el tope de caracteres de la salida.
+    """
+    # code es el programa de assemble; se aceptan cuádruplos por compatibilidad
+    try:
+        program = assemble(code) if isinstance(code, list) else code
+        out = Output(max_output)
+        reason, steps, variables = finish(run_vm(program, max_steps, timeout, out, profile), out)
+        return execution_result(out.take(), variables, steps, reason)
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
 
-        output = output_buf.getvalue()
-        return {'success': True, 'output': output}
+def stream_code(code, max_steps=None, timeout=None, max_output=None):
+    """
+    Como execute_code, pero es un generador que entrega la salida por partes
+    mientras el programa corre (ver stream); retorna el resultado sin 'output'.
+    """
+    try:
+        program = assemble(code) if isinstance(code, list) else code
+        out = Output(max_output)
+        return (yield from stream(run_vm(program, max_steps, timeout, out), out))
     except Exception as e:
         return {'success': False, 'error': str(e)}
+
+
+# Prueba rápida
+if __name__ == "__main__":
+    test_quads = [
+        ('assign', 0, None, 'i'),
+        ('label', 'L0', None, None),
+        ('<', 'i', 3, '$t0'),
+        ('jfalse', '$t0', None, 'L1'),
+        ('print', 'i', None, None),
+        ('+', 'i', 1, '$t1'),
+        ('assign', '$t1', None, 'i'),
+        ('goto', None, None, 'L0'),
+        ('label', 'L1', None, None),
+    ]
+    prog = generate_code(test_quads)['code']
+    print(disassemble(prog))
+    print(execute_code(prog))
@@ -0,0 +1,113 @@
+# encoding.py
+"""
+Forma de las respuestas de /compile (sin Flask).
+
+Secciones principales:
+1. SECTIONS / upto_phase(include):
+   - Lo que una petición puede pedir en "include": cada fase de la tubería
+     (pipeline.PHASES) y 'metrics'.
+   - upto_phase da la última fase que hay que correr para producirlas: una
+     petición que solo quiere tokens no pasa del léxico. 'metrics' sola
+     implica todo el programa.
+
+2. shape_response(body, include, encoding):
+   - Deja en el cuerpo solo las fases y secciones pedidas. Con encoding
+     'columnar' los tokens y los cuádruplos van como columnas paralelas en
+     vez de una lista de filas, que en JSON pesa bastante menos (los nombres
+     de campo no se repiten). No modifica body: lo que cambia se copia.
+
+3. accepts_gzip(header) / gzip_body(data, level):
+   - Si el encabezado Accept-Encoding admite gzip, y la compresión.
+"""
+import gzip
+
+from pipeline import PHASES
+
+SECTIONS = PHASES + ('metrics',)
+ENCODINGS = ('rows', 'columnar')
+
+TOKEN_COLUMNS = ('type', 'value', 'line', 'position')
+QUAD_COLUMNS = ('op', 'arg1', 'arg2', 'result')
+
+
+def upto_phase(include):
+    """Última fase de la tubería que se necesita para las secciones include."""
+    wanted = [PHASES.index(s) for s in include if s in PHASES]
+    if 'metrics' in include or not wanted:
+        return PHASES[-1]
+    return PHASES[max(wanted)]
+
+
+def columnar_tokens(tokens):
+    """Tokens (dicts de TokenArrays.dicts()) como {'type': [...], 'value': [...], ...}."""
+    return {column: [t[column] for t in tokens] for column in TOKEN_COLUMNS}
+
+
+def columnar_quads(quads):
+    """Cuádruplos como {'op': [...], 'arg1': [...], 'arg2': [...], 'result': [...]}."""
+    columns = list(zip(*quads)) if quads else [(), (), (), ()]
+    return {name: list(column) for name, column in zip(QUAD_COLUMNS, columns)}
+
+
+def shape_response(body, include, encoding='rows'):
+    """Cuerpo con solo las secciones include, codificado según encoding."""
+    body = dict(body)
+    if 'metrics' not in include:
+        body.pop('metrics', None)
+    if 'phases' not in body:
+        return body
+    phases = {name: phase for name, phase in body['phases'].items() if name in include}
+    if encoding == 'columnar':
+        if 'lexical' in phases:
+            phases['lexical'] = dict(phases['lexical'], tokens=columnar_tokens(phases['lexical']['tokens']))
+        if 'intermediate' in phases:
+            intermediate = phases['intermediate']
+            phases['intermediate'] = dict(intermediate, quadruples=columnar_quads(intermediate['quadruples']))
+        if 'optimization' in phases:
+            optimization = phases['optimization']
+            phases['optimization'] = dict(optimization, optimized=columnar_quads(optimization['optimized']))
+    body['phases'] = phases
+    return body
+
+
+def accepts_gzip(header):
+    """
+    Si Accept-Encoding admite gzip: manda la entrada 'gzip' y si no hay, la
+    de '*'; q=0 o un q inválido cuenta como no aceptado.
+    """
+    weights = {}
+    for item in (header or '').split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        if name not in ('gzip', '*'):
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    q = weights.get('gzip', weights.get('*', 0.0))
+    return q > 0
+
+
+def gzip_body(data, level=6):
+    return gzip.compress(data, compresslevel=level)
+
+
+# Prueba rápida
+if __name__ == "__main__":
+    import json
+
+    from pipeline import compile_source
+
+    include = ('lexical', 'optimization')
+    compiled, _ = compile_source("int x = 2;\nprint(x * 3);", upto=upto_phase(include))
+    for encoding in ENCODINGS:
+        body = shape_response(compiled, include, encoding)
+        print(encoding, len(json.dumps(body)), body['phases']['optimization']['optimized'])
+    for header in ('gzip, deflate', 'gzip;q=0', 'br', 'gzip;q=abc', '*;q=0, gzip', 'gzip;q=0, *'):
+        print(repr(header), accepts_gzip(header))
@@ -0,0 +1,45 @@
+# gen_tables.py
+"""
+Genera las tablas de PLY por adelantado.
+
+Uso:
+    python gen_tables.py           # regenera lextab.py y parsetab.py
+    python gen_tables.py --check   # sale con código 1 si están desactualizadas
+
+Los módulos generados se versionan junto al código. lexer.py y parser.py los
+cargan al importar solo si su firma coincide con las reglas y la gramática
+actuales; si no, construyen las tablas en memoria (más lento, pero correcto).
+Hay que volver a correr este script después de tocar lexer.py o la gramática
+de parser.py.
+"""
+import os
+import sys
+
+import lexer
+import parser
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def check():
+    stale = [name for name, mod in (('lextab.py', lexer), ('parsetab.py', parser))
+             if not mod.tables_up_to_date()]
+    for name in stale:
+        print(f"{name} no corresponde a la gramática actual")
+    return not stale
+
+
+def main():
+    if '--check' in sys.argv[1:]:
+        ok = check()
+        print("Tablas al día" if ok else "Ejecute: python gen_tables.py")
+        return 0 if ok else 1
+
+    lexer.write_tables(HERE)
+    parser.write_tables(HERE)
+    print("Generados lextab.py y parsetab.py")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
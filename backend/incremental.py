@@ -0,0 +1,376 @@
+# incremental.py
+"""
+Análisis léxico y sintáctico incremental para el editor (sin Flask).
+
+Secciones principales:
+1. Trozos:
+   - El documento se parte en trozos, uno por sentencia de nivel superior: cada
+     trozo termina en el ';' o la '}' que cierra la sentencia con las llaves
+     balanceadas (lo que sigue a la última, si existe, es un trozo abierto).
+   - Ningún token cruza esos cortes, y ';' y '}' no se combinan con lo que les
+     sigue, así que el inicio de un trozo es un punto seguro para relexear.
+   - Cada trozo guarda sus tokens con posiciones y líneas relativas a su
+     inicio, y el resultado de parsear su sentencia. Un trozo que no cambia no
+     se vuelve a tocar aunque se mueva.
+
+2. Document:
+   - apply(offset, deleted, inserted): Relexea y reparsea solo los trozos que
+     toca la edición; si los cortes no coinciden con los viejos (p. ej. se
+     abrió una llave o un comentario se tragó un ';') sigue con el trozo
+     siguiente hasta que coinciden. Devuelve solo lo que cambió.
+   - snapshot(): Todos los tokens, sentencias y errores del documento.
+
+3. DocumentStore:
+   - Documentos abiertos por id, con expulsión LRU.
+
+Los tokens y errores tienen la misma forma que los de lexer.scan() y
+parser.parse() sobre el documento completo (ver bench_incremental).
+"""
+import threading
+from collections import OrderedDict
+
+from lexer import scan, lexical_error
+from ply.lex import LexToken
+from parser import parse as parser_parse
+from ast_nodes import Program
+
+_OPEN = 'LBRACE'
+_CLOSE = 'RBRACE'
+_END = 'SEMICOLON'
+
+
+# --------------------------
+# Trozos
+# --------------------------
+class Chunk:
+    """
+    Una sentencia de nivel superior con el texto que la precede. cols y
+    lines son relativas al inicio del trozo (lines empieza en 0); los errores
+    léxicos son (carácter, línea relativa, columna). base es la línea absoluta
+    con la que se parseó: la de la sentencia y el mensaje de error.
+    """
+
+    __slots__ = ('text', 'newlines', 'types', 'values', 'lines', 'cols',
+                 'lex_errors', 'stmt', 'error', 'base')
+
+    def __init__(self, text, types, values, lines, cols, lex_errors):
+        self.text = text
+        self.newlines = text.count('\n')
+        self.types = types
+        self.values = values
+        self.lines = lines
+        self.cols = cols
+        self.lex_errors = lex_errors
+        self.stmt = None
+        self.error = None
+        self.base = None
+
+    def parse(self, line):
+        """Parsea la sentencia del trozo; line es la línea absoluta de su inicio."""
+        self.stmt = self.error = None
+        self.base = line
+        if not self.types:
+            return
+        toks = []
+        for typ, value, rel, col in zip(self.types, self.values, self.lines, self.cols):
+            tok = LexToken()
+            tok.type = typ
+            tok.value = value
+            tok.lineno = line + rel
+            tok.lexpos = col
+            toks.append(tok)
+        result = parser_parse(None, lexed=toks)
+        if result['success']:
+            self.stmt = result['ast'].stmts[0]
+        else:
+            # el mensaje lleva la línea absoluta: se rehace si el trozo se mueve
+            self.error = result['error']
+
+    def move(self, line):
+        """Corre las líneas de la sentencia a un trozo que ahora empieza en line."""
+        if self.stmt is not None and line != self.base:
+            _move_lines(self.stmt, line - self.base)
+            self.base = line
+
+    def token_dicts(self, position, line):
+        """Tokens del trozo en la forma de TokenArrays.dicts(), con posiciones absolutas."""
+        return [{'type': typ, 'value': str(value), 'line': line + rel, 'position': position + col}
+                for typ, value, rel, col in zip(self.types, self.values, self.lines, self.cols)]
+
+
+def _move_lines(root, delta):
+    """Suma delta a la línea de root y de las sentencias que contiene."""
+    # pila explícita: un anidamiento profundo no llega al límite de recursión
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if 'line' in node._fields and node.line is not None:
+            node.line += delta
+        stack.extend(node.children())
+
+
+def split_chunks(text):
+    """
+    Lexea text y lo parte en trozos. Retorna (trozos, cerrado): cerrado es
+    True si el último trozo termina exactamente al final de text.
+    """
+    lexed = scan(text)
+    types, values, lines, positions = lexed.types, lexed.values, lexed.lines, lexed.positions
+    cuts = []          # (índice del token siguiente, posición del corte)
+    depth = 0
+    for i, typ in enumerate(types):
+        if typ == _OPEN:
+            depth += 1
+        elif typ == _CLOSE:
+            # una '}' de más también cierra (el parser reportará el error)
+            depth = max(depth - 1, 0)
+            if depth == 0:
+                cuts.append((i + 1, positions[i] + 1))
+        elif typ == _END and depth == 0:
+            cuts.append((i + 1, positions[i] + 1))
+    closed = bool(cuts) and cuts[-1][1] == len(text)
+    if not closed and len(text) > (cuts[-1][1] if cuts else 0):
+        cuts.append((len(types), len(text)))
+
+    chunks = []
+    errors = lexed.errors
+    e = 0
+    first = start = 0
+    start_line = 1
+    for last, end in cuts:
+        chunk_errors = []
+        while e < len(errors) and errors[e]['position'] < end:
+            err = errors[e]
+            chunk_errors.append((err['char'], err['line'] - start_line, err['position'] - start))
+            e += 1
+        chunks.append(Chunk(text[start:end], types[first:last], values[first:last],
+                            [l - start_line for l in lines[first:last]],
+                            [p - start for p in positions[first:last]], chunk_errors))
+        start_line += chunks[-1].newlines
+        first, start = last, end
+    return chunks, closed
+
+
+# --------------------------
+# Documento
+# --------------------------
+class Document:
+    """
+    Texto de un documento partido en trozos. lengths, newlines y tokens son
+    listas paralelas a chunks (largo del texto, saltos de línea y número de
+    tokens), y errored marca con 1 los trozos con errores léxicos o de
+    sintaxis (bytearray: find() los encuentra sin recorrer los trozos).
+
+    cursor es (trozo, posición, línea, índice del primer token) del inicio
+    de un trozo, el de la última edición: las ediciones de un editor caen
+    cerca unas de otras y las posiciones se sacan caminando desde ahí, sin
+    sumas sobre todo el documento.
+    """
+
+    def __init__(self, code):
+        self.lock = threading.Lock()
+        self.version = 0
+        self.chunks = []
+        self.lengths = []
+        self.newlines = []
+        self.tokens = []
+        self.errored = bytearray()
+        self.size = 0
+        self.token_count = 0
+        self.cursor = (0, 0, 1, 0)
+        chunks, _ = split_chunks(code)
+        self._replace(0, 0, chunks, 1)
+
+    def _replace(self, k0, k1, chunks, line):
+        """Reemplaza los trozos [k0, k1) por chunks (ya lexeados) y los parsea."""
+        for c in chunks:
+            c.parse(line)
+            line += c.newlines
+        self.size += sum(len(c.text) for c in chunks) - sum(self.lengths[k0:k1])
+        self.token_count += sum(len(c.types) for c in chunks) - sum(self.tokens[k0:k1])
+        self.chunks[k0:k1] = chunks
+        self.lengths[k0:k1] = [len(c.text) for c in chunks]
+        self.newlines[k0:k1] = [c.newlines for c in chunks]
+        self.tokens[k0:k1] = [len(c.types) for c in chunks]
+        self.errored[k0:k1] = bytes(c.error is not None or bool(c.lex_errors) for c in chunks)
+
+    def _seek(self, k):
+        """(posición, línea, índice del primer token) del inicio del trozo k."""
+        ck, position, line, token = self.cursor
+        if k >= ck:
+            return (position + sum(self.lengths[ck:k]), line + sum(self.newlines[ck:k]),
+                    token + sum(self.tokens[ck:k]))
+        return (position - sum(self.lengths[k:ck]), line - sum(self.newlines[k:ck]),
+                token - sum(self.tokens[k:ck]))
+
+    def _locate(self, offset, k=None):
+        """Trozo que contiene offset (el último si offset es el final), caminando desde k."""
+        lengths = self.lengths
+        if k is None:
+            k = self.cursor[0]
+        position = self._seek(k)[0]
+        while k > 0 and position > offset:
+            k -= 1
+            position -= lengths[k]
+        last = len(lengths) - 1
+        while k < last and position + lengths[k] <= offset:
+            position += lengths[k]
+            k += 1
+        return k, position
+
+    def text(self):
+        return ''.join(c.text for c in self.chunks)
+
+    def apply(self, offset, deleted, inserted):
+        """
+        Aplica la edición: borra deleted caracteres desde offset e inserta
+        inserted. Retorna los cambios (ver _changes).
+        """
+        if not (isinstance(offset, int) and isinstance(deleted, int) and isinstance(inserted, str)):
+            raise ValueError("'edit' debe tener offset y deleted enteros e inserted string")
+        if offset < 0 or deleted < 0 or offset + deleted > self.size:
+            raise ValueError(f"Edición fuera del documento (largo {self.size})")
+
+        n = len(self.chunks)
+        if n == 0:
+            k0, k1, text, start = 0, 0, inserted, 0
+        else:
+            # primer trozo: el que contiene offset. Último: el que contiene el
+            # primer carácter después de lo borrado, para que el corte final
+            # sea un ';' o '}' que la edición no tocó
+            k0, start = self._locate(offset)
+            k1 = self._locate(offset + deleted, k0)[0] + 1
+            old = ''.join(c.text for c in self.chunks[k0:k1])
+            rel = offset - start
+            text = old[:rel] + inserted + old[rel + deleted:]
+
+        while True:
+            chunks, closed = split_chunks(text)
+            if closed or k1 >= n:
+                break
+            # el último corte no coincide con uno viejo: seguir con el siguiente
+            text += self.chunks[k1].text
+            k1 += 1
+
+        _, line, token_start = self._seek(k0)
+        self.cursor = (k0, start, line, token_start)
+        old_newlines = sum(self.newlines[k0:k1])
+        removed_tokens = sum(self.tokens[k0:k1])
+        self._replace(k0, k1, chunks, line)
+        self.version += 1
+        return self._changes(k0, k1, chunks, start, line, token_start, removed_tokens,
+                             len(inserted) - deleted,
+                             sum(c.newlines for c in chunks) - old_newlines, len(text))
+
+    def _statement(self, chunk, position):
+        return {'start': position, 'end': position + len(chunk.text),
+                'tokens': len(chunk.types), 'ast': chunk.stmt, 'error': chunk.error}
+
+    def _changes(self, k0, k1, chunks, position, line, token_start, removed_tokens,
+                 shift, line_shift, relexed):
+        """
+        Lo que cambió: los tokens [start, start + removed) y las sentencias
+        [start, start + removed) se reemplazan por 'inserted'; todo lo que
+        sigue se corre 'shift' caracteres y 'line_shift' líneas.
+        """
+        tokens = []
+        statements = []
+        for c in chunks:
+            tokens += c.token_dicts(position, line)
+            statements.append(self._statement(c, position))
+            position += len(c.text)
+            line += c.newlines
+        errors = self.errors()
+        return {
+            'success': not errors,
+            'version': self.version,
+            'tokens': {'start': token_start, 'removed': removed_tokens, 'inserted': tokens},
+            'statements': {'start': k0, 'removed': k1 - k0, 'inserted': statements},
+            'shift': shift,
+            'line_shift': line_shift,
+            'errors': errors,
+            'relexed_chars': relexed,
+            'reparsed': sum(1 for c in chunks if c.types),
+        }
+
+    def errors(self):
+        """Errores léxicos y de sintaxis de todo el documento."""
+        errors = []
+        k = self.errored.find(1)
+        while k != -1:
+            position, line, _ = self._seek(k)
+            c = self.chunks[k]
+            for char, rel, col in c.lex_errors:
+                errors.append(lexical_error(char, line + rel, position + col))
+            if c.error is not None:
+                if c.base != line:
+                    c.parse(line)
+                # línea y posición del primer token de la sentencia
+                errors.append({'message': c.error, 'line': line + c.lines[0],
+                               'position': position + c.cols[0]})
+            k = self.errored.find(1, k + 1)
+        if not self.token_count:
+            errors.append({'message': 'Syntax error at EOF', 'line': 1 + sum(self.newlines),
+                           'position': self.size})
+        return errors
+
+    def snapshot(self):
+        """Estado completo: tokens, sentencias, errores y el AST si no hay errores."""
+        tokens = []
+        statements = []
+        position, line = 0, 1
+        for c in self.chunks:
+            c.move(line)
+            tokens += c.token_dicts(position, line)
+            statements.append(self._statement(c, position))
+            position += len(c.text)
+            line += c.newlines
+        errors = self.errors()
+        # los caracteres ilegales se saltan, como en parser.parse(): hay AST
+        # mientras no haya errores de sintaxis
+        parsed = all('char' in e for e in errors)
+        return {
+            'success': not errors,
+            'version': self.version,
+            'tokens': tokens,
+            'statements': statements,
+            'errors': errors,
+            'ast': Program([c.stmt for c in self.chunks if c.stmt is not None]) if parsed else None,
+        }
+
+
+# --------------------------
+# Documentos abiertos
+# --------------------------
+class DocumentStore:
+    """Documentos por id, a lo más max_documents (se expulsa el menos usado)."""
+
+    def __init__(self, max_documents=256):
+        self.max_documents = max_documents
+        self._docs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, doc_id, code):
+        doc = Document(code)
+        with self._lock:
+            self._docs[doc_id] = doc
+            self._docs.move_to_end(doc_id)
+            while len(self._docs) > self.max_documents:
+                self._docs.popitem(last=False)
+        return doc
+
+    def get(self, doc_id):
+        with self._lock:
+            doc = self._docs.get(doc_id)
+            if doc is not None:
+                self._docs.move_to_end(doc_id)
+            return doc
+
+    def __len__(self):
+        return len(self._docs)
+
+
+if __name__ == "__main__":
+    doc = Document("int x = 5;\nwhile (x > 0) {\n    x = x - 1;\n}\nprint(x);\n")
+    print(doc.snapshot()['statements'])
+    print(doc.apply(11, 0, 'int y = 1;\n'))
@@ -4,152 +4,282 @@ Generador simple de cuádruplos.
 
 Secciones principales:
 1. Generadores de nombres:
-   - new_temp(): Genera un nuevo nombre temporal único.
-   - new_label(): Genera un nuevo nombre de etiqueta único.
+   - NameGenerator: Contadores de una sola compilación (no hay estado global).
+     - new_temp(): Genera un nuevo nombre temporal único ($t0, $t1, ...); el
+       '$' no lo produce el lexer, así que nunca choca con una variable.
+     - new_label(): Genera un nuevo nombre de etiqueta único.
+   - is_temp(name): Indica si un nombre es un temporal.
 
 2. Generación de expresiones:
-   - gen_expr(node, quads): Convierte nodos del AST en cuádruplos.
+   - gen_expr(node, quads, names): Convierte nodos del AST en cuádruplos.
 
-3. Generación de sentencias:
-   - gen_stmt(s, quads): Convierte sentencias del AST en cuádruplos.
+3. Condiciones:
+   - gen_cond(node, on_true, on_false, quads, names): La condición de un if o
+     while como cadena de saltos: && y || no evalúan el lado derecho si el
+     izquierdo ya decide, y cada comparación es un solo salto (p. ej.
+     `jnlt a b L`: salta a L si no se cumple a < b).
 
-4. Entrada principal:
+4. Generación de sentencias:
+   - gen_stmt(s, quads, names): Convierte sentencias del AST en cuádruplos.
+
+5. Entrada principal:
    - generate_intermediate_code(ast): Punto de entrada para generar cuádruplos a partir del AST.
 
-Expone: generate_intermediate_code(ast) -> {'success': True, 'quadruples': [...]}
+Expone: generate_intermediate_code(ast) -> {'success': True, 'quadruples': [...], 'lines': [...]}
+lines[i] es la línea de código fuente del cuádruplo i (None si el AST no trae líneas).
 Cuádruplo: (op, arg1, arg2, result)
-op puede ser: '+','-','*','/','assign','print','jfalse','goto','label','and','or','not'
+Los nodos del AST son los de ast_nodes.py; se despacha por node.kind.
+op puede ser: '+','-','*','/','<','<=','>','>=','==','!=','assign','print',
+'goto','label','and','or','not', y los saltos condicionales 'jfalse', 'jtrue',
+'jlt','jle','jgt','jge','jeq','jne' (salta si se cumple) y 'jnlt','jnle',
+'jngt','jnge' (salta si no se cumple).
 """
 
-temp_counter = 0
-label_counter = 0
+from ast_nodes import (Node, PROGRAM, DECL, ASSIGN, PRINT, IF, WHILE, BINOP, UNOP,
+                       NUMBER, FNUMBER, BOOL, ID, from_dict)
 
 
 # --------------------------
 # Generadores de nombres
 # --------------------------
-def new_temp():
-    global temp_counter
-    t = f"t{temp_counter}"
-    temp_counter += 1
-    return t
-
-def new_label():
-    global label_counter
-    l = f"L{label_counter}"
-    label_counter += 1
-    return l
+TEMP_PREFIX = '$t'
 
 
-# --------------------------
-# Expresiones
-# --------------------------
-def gen_expr(node, quads):
-    """Convierte nodos de expresiones del AST en cuádruplos."""
-    if not isinstance(node, dict):
-        raise Exception(f"Nodo inválido en gen_expr: {node}")
+class NameGenerator:
+    """Contadores de temporales y etiquetas de una sola compilación."""
 
-    ntype = node.get('node')
+    def __init__(self):
+        self.temp_counter = 0
+        self.label_counter = 0
 
-    # --- LITERALES ---
-    if ntype in ('number', 'fnumber', 'bool'):
-        t = new_temp()
-        quads.append(('assign', node['value'], None, t))
+    def new_temp(self):
+        t = f"{TEMP_PREFIX}{self.temp_counter}"
+        self.temp_counter += 1
         return t
 
-    # --- IDENTIFICADORES ---
-    if ntype == 'id':
-        return node.get('name')
-
-    # --- BINARIOS ---
-    if ntype == 'binop':
-        op = node.get('op')
+    def new_label(self):
+        l = f"L{self.label_counter}"
+        self.label_counter += 1
+        return l
 
-        # normaliza operadores lógicos
-        if op == '&&':
-            op = 'and'
-        elif op == '||':
-            op = 'or'
 
-        left = gen_expr(node['left'], quads)
-        right = gen_expr(node['right'], quads)
-        t = new_temp()
-        quads.append((op, left, right, t))
-        return t
-
-    # --- UNARIOS ---
-    if ntype == 'unop':
-        op = node.get('op')
-        val = gen_expr(node['expr'], quads)
-        t = new_temp()
-        quads.append(('not', val, None, t))
-        return t
-
-    raise NotImplementedError(f"gen_expr no soporta nodo: {ntype}")
+def is_temp(name):
+    """True si name fue generado por NameGenerator.new_temp()."""
+    return isinstance(name, str) and name.startswith(TEMP_PREFIX) and name[len(TEMP_PREFIX):].isdigit()
 
 
 # --------------------------
-# Sentencias
+# Expresiones
 # --------------------------
-def gen_stmt(s, quads):
-    """Convierte sentencias del AST en cuádruplos."""
-    ntype = s.get('node')
-
-    # --- DECLARACIÓN ---
-    if ntype == 'decl':
-        t = gen_expr(s['expr'], quads)
-        quads.append(('assign', t, None, s['id']))
-
-    # --- ASIGNACIÓN ---
-    elif ntype == 'assign':
-        t = gen_expr(s['expr'], quads)
-        quads.append(('assign', t, None, s['id']))
-
-    # --- PRINT ---
-    elif ntype == 'print':
-        t = gen_expr(s['expr'], quads)
-        quads.append(('print', t, None, None))
+def gen_expr(node, quads, names):
+    """
+    Convierte nodos de expresiones del AST en cuádruplos.
+
+    Postorden con pila explícita: (nodo, operandos ya generados). Los
+    operandos de cada operador quedan en `values`; el orden de temporales y
+    cuádruplos es el mismo que el del recorrido recursivo.
+    """
+    values = []
+    stack = [(node, False)]
+    while stack:
+        node, ready = stack.pop()
+        if not isinstance(node, Node):
+            raise Exception(f"Nodo inválido en gen_expr: {node}")
+
+        kind = node.kind
+
+        # --- LITERALES ---
+        if kind in (NUMBER, FNUMBER, BOOL):
+            t = names.new_temp()
+            quads.append(('assign', node.value, None, t))
+            values.append(t)
+
+        # --- IDENTIFICADORES ---
+        elif kind == ID:
+            values.append(node.name)
+
+        # --- BINARIOS ---
+        elif kind == BINOP:
+            if not ready:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+
+            op = node.op
+
+            # normaliza operadores lógicos
+            if op == '&&':
+                op = 'and'
+            elif op == '||':
+                op = 'or'
+
+            right = values.pop()
+            left = values.pop()
+            t = names.new_temp()
+            quads.append((op, left, right, t))
+            values.append(t)
+
+        # --- UNARIOS ---
+        elif kind == UNOP:
+            if not ready:
+                stack.append((node, True))
+                stack.append((node.expr, False))
+                continue
+
+            val = values.pop()
+            t = names.new_temp()
+            quads.append(('not', val, None, t))
+            values.append(t)
+
+        else:
+            raise NotImplementedError(f"gen_expr no soporta nodo: {node.tag}")
+
+    return values[0]
 
-    # --- IF ---
-    elif ntype == 'if':
-        cond_temp = gen_expr(s['cond'], quads)
-        label_else = new_label()
-        label_end = new_label()
 
-        quads.append(('jfalse', cond_temp, None, label_else))
-
-        # bloque entonces
-        for st in s.get('then', []):
-            gen_stmt(st, quads)
-
-        quads.append(('goto', None, None, label_end))
-
-        # etiqueta ELSE
-        quads.append(('label', label_else, None, None))
-
-        # bloque else
-        for st in s.get('otherwise', []):
-            gen_stmt(st, quads)
-
-        quads.append(('label', label_end, None, None))
-
-    # --- WHILE ---
-    elif ntype == 'while':
-        lbl_start = new_label()
-        lbl_end = new_label()
-
-        quads.append(('label', lbl_start, None, None))
-        cond_temp = gen_expr(s['cond'], quads)
-        quads.append(('jfalse', cond_temp, None, lbl_end))
-
-        for st in s.get('body', []):
-            gen_stmt(st, quads)
+# --------------------------
+# Condiciones
+# --------------------------
+# comparación -> salto si se cumple / salto si no se cumple. == y != son
+# complementarios aun con NaN; los de orden no (por eso jnlt y no jge).
+_JUMP_IF = {'<': 'jlt', '<=': 'jle', '>': 'jgt', '>=': 'jge', '==': 'jeq', '!=': 'jne'}
+_JUMP_UNLESS = {'<': 'jnlt', '<=': 'jnle', '>': 'jngt', '>=': 'jnge', '==': 'jne', '!=': 'jeq'}
+
+
+def gen_cond(node, on_true, on_false, quads, names):
+    """
+    Emite saltos a on_true si la condición es verdadera y a on_false si es
+    falsa; exactamente uno de los dos es None, y en ese caso la ejecución
+    sigue con el cuádruplo siguiente. La pila mezcla condiciones pendientes
+    (nodo, on_true, on_false) y etiquetas ya armadas.
+    """
+    stack = [(node, on_true, on_false)]
+    while stack:
+        item = stack.pop()
+        if len(item) == 4:
+            quads.append(item)   # etiqueta
+            continue
+        node, on_true, on_false = item
+        kind = node.kind
+
+        if kind == BINOP and node.op == '&&':
+            if on_false is None:
+                # izquierda falsa: saltar la derecha y seguir
+                skip = names.new_label()
+                stack.append(('label', skip, None, None))
+                stack.append((node.right, on_true, None))
+                stack.append((node.left, None, skip))
+            else:
+                stack.append((node.right, None, on_false))
+                stack.append((node.left, None, on_false))
+
+        elif kind == BINOP and node.op == '||':
+            if on_true is None:
+                # izquierda verdadera: saltar la derecha y seguir
+                skip = names.new_label()
+                stack.append(('label', skip, None, None))
+                stack.append((node.right, None, on_false))
+                stack.append((node.left, skip, None))
+            else:
+                stack.append((node.right, on_true, None))
+                stack.append((node.left, on_true, None))
+
+        elif kind == UNOP:
+            stack.append((node.expr, on_false, on_true))
+
+        elif kind == BINOP and node.op in _JUMP_IF:
+            left = gen_expr(node.left, quads, names)
+            right = gen_expr(node.right, quads, names)
+            if on_false is not None:
+                quads.append((_JUMP_UNLESS[node.op], left, right, on_false))
+            else:
+                quads.append((_JUMP_IF[node.op], left, right, on_true))
+
+        else:
+            t = gen_expr(node, quads, names)
+            if on_false is not None:
+                quads.append(('jfalse', t, None, on_false))
+            else:
+                quads.append(('jtrue', t, None, on_true))
 
-        quads.append(('goto', None, None, lbl_start))
-        quads.append(('label', lbl_end, None, None))
 
-    else:
-        raise NotImplementedError(f"gen_stmt no soporta {ntype}")
+# --------------------------
+# Sentencias
+# --------------------------
+def gen_stmt(s, quads, names, lines=None):
+    """
+    Convierte sentencias del AST en cuádruplos.
+
+    La pila de trabajo mezcla sentencias pendientes y cuádruplos ya armados
+    (tuplas) que deben emitirse después de ellas, p. ej. el goto y la etiqueta
+    final de un while; así if/while anidados no usan recursión.
+
+    Si se pasa lines, se le agrega la línea de código fuente de cada
+    cuádruplo emitido (la de su sentencia; el goto y las etiquetas de un
+    if/while llevan la del if/while).
+    """
+    stack = [s]
+    while stack:
+        s = stack.pop()
+        if type(s) is tuple:
+            quad, line = s
+            quads.append(quad)
+            if lines is not None:
+                lines.append(line)
+            continue
+
+        kind = s.kind
+        line = s.line
+        start = len(quads)
+
+        # --- DECLARACIÓN ---
+        if kind == DECL:
+            t = gen_expr(s.expr, quads, names)
+            quads.append(('assign', t, None, s.id))
+
+        # --- ASIGNACIÓN ---
+        elif kind == ASSIGN:
+            t = gen_expr(s.expr, quads, names)
+            quads.append(('assign', t, None, s.id))
+
+        # --- PRINT ---
+        elif kind == PRINT:
+            t = gen_expr(s.expr, quads, names)
+            quads.append(('print', t, None, None))
+
+        # --- IF ---
+        elif kind == IF:
+            label_else = names.new_label()
+            label_end = names.new_label()
+
+            gen_cond(s.cond, None, label_else, quads, names)
+
+            # en orden inverso: bloque entonces, goto, etiqueta ELSE,
+            # bloque else, etiqueta final
+            stack.append((('label', label_end, None, None), line))
+            stack.extend(reversed(s.otherwise))
+            stack.append((('label', label_else, None, None), line))
+            stack.append((('goto', None, None, label_end), line))
+            stack.extend(reversed(s.then))
+
+        # --- WHILE ---
+        elif kind == WHILE:
+            lbl_start = names.new_label()
+            lbl_end = names.new_label()
+
+            quads.append(('label', lbl_start, None, None))
+            gen_cond(s.cond, None, lbl_end, quads, names)
+
+            stack.append((('label', lbl_end, None, None), line))
+            stack.append((('goto', None, None, lbl_start), line))
+            stack.extend(reversed(s.body))
+
+        else:
+            raise NotImplementedError(f"gen_stmt no soporta {s.tag}")
+
+        if lines is not None:
+            lines.extend([line] * (len(quads) - start))
 
 
 # --------------------------
@@ -157,19 +287,22 @@ def gen_stmt(s, quads):
 # --------------------------
 def generate_intermediate_code(ast):
     """Punto de entrada para generar cuádruplos a partir del AST."""
-    global temp_counter, label_counter
-    temp_counter = 0
-    label_counter = 0
+    # contadores locales: compilaciones concurrentes no se pisan los nombres
+    names = NameGenerator()
     quads = []
+    lines = []
+
+    if isinstance(ast, dict):
+        ast = from_dict(ast)   # AST en forma JSON
 
     try:
-        if ast.get('node') != 'program':
+        if not isinstance(ast, Node) or ast.kind != PROGRAM:
             return {'success': False, 'error': 'AST no es un programa'}
 
-        for s in ast.get('stmts', []):
-            gen_stmt(s, quads)
+        for s in ast.stmts:
+            gen_stmt(s, quads, names, lines)
 
-        return {'success': True, 'quadruples': quads}
+        return {'success': True, 'quadruples': quads, 'lines': lines}
 
     except Exception as e:
         return {'success': False, 'error': str(e)}
@@ -178,14 +311,10 @@ def generate_intermediate_code(ast):
 
 # Prueba rápida
 if __name__ == "__main__":
-    test_ast = {
-        'node': 'program',
-        'stmts': [
-            {'node': 'decl', 'id': 'x', 'expr': {'node': 'number', 'value': 5}},
-            {'node': 'assign', 'id': 'x',
-             'expr': {'node': 'binop', 'op': '+',
-                      'left': {'node':'id','name':'x'},
-                      'right': {'node':'number','value':3}}}
-        ]
-    }
+    from ast_nodes import Program, Decl, Assign, BinOp, Number, Id
+
+    test_ast = Program([
+        Decl('int', 'x', Number(5)),
+        Assign('x', BinOp('+', Id('x'), Number(3))),
+    ])
     print(generate_intermediate_code(test_ast))
@@ -0,0 +1,296 @@
+# jit.py
+"""
+Segundo nivel de ejecución: traduce el bytecode a una función de Python.
+
+Secciones principales:
+1. translate(program):
+   - Entrada: Programa de codegen.assemble.
+   - Salida: Código fuente de una función run(...) equivalente.
+   - Cada registro es una variable local (r0, r1, ...): sin indexar el banco
+     de registros ni despachar por opcode.
+   - El código se parte en tramos que empiezan en el inicio del programa o
+     en el destino de un salto; un tramo corre en línea recta y los saltos
+     no tomados siguen dentro de él. Los tramos son los estados de una
+     máquina de estados (b es el tramo en curso) y se eligen con un árbol
+     de comparaciones. Un tramo que salta a su propio inicio (el ciclo de un
+     while sin ifs) es un `while True` y no pasa por el despacho.
+
+2. compile_program(program):
+   - compile() de la fuente una sola vez por programa; la función queda en
+     una caché LRU (ver jit_cache_stats()).
+
+3. execute_jit(code, max_steps=None, timeout=None, max_output=None):
+   - Misma entrada y misma salida que codegen.execute_code, con las mismas
+     reglas: división entera entre int (0 si falla), pasos contados en cada
+     salto tomado, límites (pasos, tiempo y tope de salida) revisados cada
+     CHECK_INTERVAL pasos y tope de bits en las multiplicaciones
+     (codegen.MAX_INT_BITS), así que un programa truncado se corta en el
+     mismo punto que en la VM.
+   - stream_jit(...) es la variante que entrega la salida por partes, como
+     codegen.stream_code.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from codegen import (assemble, base_opcode, constant_key, CHECK_INTERVAL, BIG_INT_BITS, MAX_INT_BITS,
+                     Output, finish, stream,
+                     execution_result, OP_MOV, OP_ADD, OP_SUB, OP_MUL,
+                     OP_DIV, OP_LT, OP_LE, OP_GT, OP_GE, OP_EQ, OP_NE, OP_AND, OP_OR,
+                     OP_NOT, OP_JFALSE, OP_GOTO, OP_PRINT, OP_JTRUE, OP_JLT, OP_JLE,
+                     OP_JGT, OP_JGE, OP_JEQ, OP_JNE, OP_JNLT, OP_JNLE, OP_JNGT, OP_JNGE)
+
+# --------------------------
+# Traducción
+# --------------------------
+# plantillas de cada opcode: {a}, {b} y {c} son nombres de registro
+_STATEMENTS = {
+    OP_MOV: '{c} = {a}',
+    OP_ADD: '{c} = {a} + {b}',
+    OP_SUB: '{c} = {a} - {b}',
+    OP_LT: '{c} = {a} < {b}',
+    OP_LE: '{c} = {a} <= {b}',
+    OP_GT: '{c} = {a} > {b}',
+    OP_GE: '{c} = {a} >= {b}',
+    OP_EQ: '{c} = {a} == {b}',
+    OP_NE: '{c} = {a} != {b}',
+    OP_AND: '{c} = (not not {a}) and (not not {b})',
+    OP_OR: '{c} = (not not {a}) or (not not {b})',
+    OP_NOT: '{c} = not {a}',
+    OP_PRINT: 'write(f"{{{a}}}\\n")',
+}
+
+# condición con la que se toma cada salto
+_CONDITIONS = {
+    OP_JFALSE: 'not {a}', OP_JTRUE: '{a}',
+    OP_JLT: '{a} < {b}', OP_JLE: '{a} <= {b}', OP_JGT: '{a} > {b}', OP_JGE: '{a} >= {b}',
+    OP_JEQ: '{a} == {b}', OP_JNE: '{a} != {b}',
+    OP_JNLT: 'not {a} < {b}', OP_JNLE: 'not {a} <= {b}',
+    OP_JNGT: 'not {a} > {b}', OP_JNGE: 'not {a} >= {b}',
+}
+
+# tramos por encima de los cuales el despacho se parte en dos con un `if b <`
+_CHAIN = 4
+
+
+def translate(program):
+    """
+    Fuente del generador run(K, out, max_steps, deadline, clock, checkpoint):
+    como codegen.run_vm, cede en los puntos de control con salida pendiente.
+    """
+    flat = program['instructions']
+    # las superinstrucciones son de la VM: aquí cada instrucción va por separado
+    insns = [(base_opcode(op), a, b, c) for op, a, b, c in zip(*[iter(flat)] * 4)]
+    n = len(insns)
+    nconst = len(program['constants'])
+    nregs = program['register_count']
+    result = '(' + ''.join(f'r{i}, ' for i in program['variables'].values()) + ')'
+
+    lines = ['def run(K, out, max_steps, deadline, clock, checkpoint):',
+             '    write = out.write',
+             '    full = out.full',
+             '    pending = out.parts']
+    if nconst:
+        lines.append('    ' + ''.join(f'r{i}, ' for i in range(nconst)) + '= K')
+    for lo in range(nconst, nregs, 64):
+        lines.append('    ' + ' = '.join(f'r{i}' for i in range(lo, min(lo + 64, nregs))) + ' = 0')
+    lines.append('    steps = 0')
+    if n == 0:
+        lines.append(f'    return None, 0, {result}')
+        lines.append('    yield   # inalcanzable: hace de run un generador')
+        return '\n'.join(lines) + '\n'
+
+    starts = sorted({0} | {c for op, _, _, c in insns if op in _CONDITIONS or op == OP_GOTO
+                           if c < n})
+    ends = starts[1:] + [n]
+
+    def exit_to(out, indent, start, looped, target):
+        """Transferencia a target desde el tramo que empieza en start."""
+        pad = ' ' * indent
+        if target == n:
+            out.append(f'{pad}return None, steps, {result}')
+        elif looped and target == start:
+            out.append(f'{pad}continue')
+        else:
+            out.append(f'{pad}b = {target}')
+            out.append(f'{pad}{"break" if looped else "continue"}')
+
+    def emit_arm(out, indent, start, end):
+        looped = any(c == start for op, _, _, c in insns[start:end]
+                     if op in _CONDITIONS or op == OP_GOTO)
+        if looped:
+            out.append(' ' * indent + 'while True:')
+            indent += 4
+        pad = ' ' * indent
+        for j in range(start, end):
+            op, a, b, c = insns[j]
+            names = {'a': f'r{a}', 'b': f'r{b}', 'c': f'r{c}'}
+            if op in _STATEMENTS:
+                out.append(pad + _STATEMENTS[op].format(**names))
+            elif op == OP_MUL:
+                # enteros grandes: mismo tope y punto de control que la VM
+                out.append(f'{pad}v = r{a} * r{b}')
+                out.append(f'{pad}if v.__class__ is int and v.bit_length() > {BIG_INT_BITS}:')
+                out.append(f'{pad}    if v.bit_length() > {MAX_INT_BITS}:')
+                out.append(f'{pad}        steps += {j - start + 1}')
+                out.append(f"{pad}        return 'int_limit', steps, {result}")
+                out.append(f'{pad}    checkpoint = steps')
+                out.append(f'{pad}r{c} = v')
+            elif op == OP_DIV:
+                out.append(f'{pad}try:')
+                out.append(f'{pad}    # división entera si ambos son int')
+                out.append(f'{pad}    if isinstance(r{a}, int) and isinstance(r{b}, int):')
+                out.append(f'{pad}        r{c} = r{a} // r{b}')
+                out.append(f'{pad}    else:')
+                out.append(f'{pad}        r{c} = r{a} / r{b}')
+                out.append(f'{pad}except Exception:')
+                out.append(f'{pad}    r{c} = 0')
+            else:
+                # salto tomado: pasos del tramo hasta aquí y punto de control
+                inner = pad
+                if op != OP_GOTO:
+                    out.append(f'{pad}if {_CONDITIONS[op].format(**names)}:')
+                    inner = pad + '    '
+                out.append(f'{inner}steps += {j - start + 1}')
+                out.append(f'{inner}if steps >= checkpoint:')
+                out.append(f'{inner}    if steps >= max_steps:')
+                out.append(f"{inner}        return 'step_limit', steps, {result}")
+                out.append(f'{inner}    if deadline is not None and clock() >= deadline:')
+                out.append(f"{inner}        return 'deadline', steps, {result}")
+                out.append(f"{inner}    if full():")
+                out.append(f"{inner}        return 'output_limit', steps, {result}")
+                out.append(f'{inner}    checkpoint = min(steps + {CHECK_INTERVAL}, max_steps)')
+                out.append(f'{inner}    if pending:')
+                out.append(f'{inner}        yield')
+                exit_to(out, len(inner), start, looped, c)
+                if op == OP_GOTO:
+                    return   # lo que sigue en el tramo es inalcanzable
+        # cae al tramo siguiente (sin punto de control, como en la VM)
+        out.append(f'{pad}steps += {end - start}')
+        exit_to(out, indent, start, looped, end)
+
+    def emit_dispatch(out, indent, arms):
+        pad = ' ' * indent
+        if len(arms) == 1:
+            emit_arm(out, indent, *arms[0])
+        elif len(arms) <= _CHAIN:
+            for k, (start, end) in enumerate(arms):
+                if k == 0:
+                    out.append(f'{pad}if b == {start}:')
+                elif k < len(arms) - 1:
+                    out.append(f'{pad}elif b == {start}:')
+                else:
+                    out.append(f'{pad}else:')
+                emit_arm(out, indent + 4, start, end)
+        else:
+            mid = len(arms) // 2
+            out.append(f'{pad}if b < {arms[mid][0]}:')
+            emit_dispatch(out, indent + 4, arms[:mid])
+            out.append(f'{pad}else:')
+            emit_dispatch(out, indent + 4, arms[mid:])
+
+    lines.append('    b = 0')
+    lines.append('    while True:')
+    emit_dispatch(lines, 8, list(zip(starts, ends)))
+    lines.append('    yield   # inalcanzable: hace de run un generador')
+    return '\n'.join(lines) + '\n'
+
+
+# --------------------------
+# Caché de funciones compiladas
+# --------------------------
+JIT_CACHE_SIZE = 128
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def _program_key(program):
+    # llave exacta: 1, 1.0 y True (o 0.0 y -0.0) no son la misma constante
+    return (tuple(program['instructions']),
+            tuple(constant_key(k) for k in program['constants']),
+            tuple(program['variables'].items()),
+            program['register_count'])
+
+
+def compile_program(program):
+    """Función run del programa, compilada una vez y guardada en la caché."""
+    key = _program_key(program)
+    with _cache_lock:
+        fn = _cache.get(key)
+        if fn is not None:
+            _cache.move_to_end(key)
+            _cache_stats['hits'] += 1
+            return fn
+        _cache_stats['misses'] += 1
+    namespace = {}
+    exec(compile(translate(program), '<jit>', 'exec'), namespace)
+    fn = namespace['run']
+    with _cache_lock:
+        _cache[key] = fn
+        while len(_cache) > JIT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return fn
+
+
+def jit_cache_stats():
+    with _cache_lock:
+        return {'entries': len(_cache), **_cache_stats}
+
+
+# --------------------------
+# Ejecución
+# --------------------------
+def run_jit(program, max_steps=None, timeout=None, out=None):
+    """Generador con la misma interfaz que codegen.run_vm, sobre la función compilada."""
+    run = compile_program(program)
+    out = Output() if out is None else out
+    if max_steps is None:
+        max_steps = float('inf')
+    clock = time.perf_counter
+    deadline = None if timeout is None else clock() + timeout
+    reason, steps, values = yield from run(tuple(program['constants']), out, max_steps,
+                                           deadline, clock, min(CHECK_INTERVAL, max_steps))
+    return reason, steps, dict(zip(program['variables'], values))
+
+
+def execute_jit(code, max_steps=None, timeout=None, max_output=None):
+    """Como codegen.execute_code, pero corre la función compilada del programa."""
+    try:
+        program = assemble(code) if isinstance(code, list) else code
+        out = Output(max_output)
+        reason, steps, variables = finish(run_jit(program, max_steps, timeout, out), out)
+        return execution_result(out.take(), variables, steps, reason)
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def stream_jit(code, max_steps=None, timeout=None, max_output=None):
+    """Como codegen.stream_code, con el JIT."""
+    try:
+        program = assemble(code) if isinstance(code, list) else code
+        out = Output(max_output)
+        return (yield from stream(run_jit(program, max_steps, timeout, out), out))
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+# Prueba rápida
+if __name__ == "__main__":
+    from codegen import generate_code, execute_code
+
+    test_quads = [
+        ('assign', 0, None, 'i'),
+        ('label', 'L0', None, None),
+        ('jnlt', 'i', 3, 'L1'),
+        ('print', 'i', None, None),
+        ('+', 'i', 1, '$t1'),
+        ('assign', '$t1', None, 'i'),
+        ('goto', None, None, 'L0'),
+        ('label', 'L1', None, None),
+    ]
+    prog = generate_code(test_quads)['code']
+    print(translate(prog))
+    print(execute_jit(prog))
+    print(execute_code(prog))
@@ -8,8 +8,31 @@ Secciones principales:
 2. Tokens:
    - Lista de tokens reconocidos por el analizador léxico.
    - Incluye operadores, delimitadores y literales.
+
+3. Construcción:
+   - build_lexer(): Carga la tabla pregenerada lextab.py si su firma coincide
+     con las reglas; si no, construye el lexer desde las reglas.
+   - write_tables(dir): Regenera lextab.py (ver gen_tables.py).
+
+4. API:
+   - tokenize(code, errors): Tokens de PLY en un solo pase.
+   - analyze(code, backend): Tokens como diccionarios serializables.
+   - TokenStream(toks): Permite al parser consumir tokens ya leídos.
+
+5. Escáner rápido:
+   - scan(code): Las mismas reglas en una sola regex maestra recorrida con
+     finditer; devuelve un TokenArrays (tipos, valores, líneas y posiciones
+     en listas paralelas) con los errores léxicos recolectados.
+   - ply_scan(code): El lexer de PLY con la misma forma de resultado.
+   - BACKENDS: Nombre del backend -> función de escaneo.
 """
+import hashlib
+import importlib
+import os
+import re
+
 import ply.lex as lex
+from ply.lex import LexToken
 
 # Palabras reservadas
 reserved = {
@@ -104,46 +127,243 @@ def t_COMMENT(t):
     r'//.*'
     pass
 
-# Error léxico
+# Error léxico: se recolecta si el lexer trae una lista de errores
 def t_error(t):
-    print(f"Carácter ilegal '{t.value[0]}' en línea {t.lineno}")
+    errors = getattr(t.lexer, 'errors', None)
+    if errors is None:
+        print(f"Carácter ilegal '{t.value[0]}' en línea {t.lineno}")
+    else:
+        errors.append(lexical_error(t.value[0], t.lineno, t.lexpos))
     t.lexer.skip(1)
 
+def lexical_error(char, line, position):
+    return {
+        'message': f"Carácter ilegal '{char}' en línea {line}",
+        'char': char,
+        'line': line,
+        'position': position
+    }
+
 # ============================
 # Construcción del Lexer
 # ============================
 
+# La expresión maestra del lexer se genera por adelantado en lextab.py
+# (python gen_tables.py). Como PLY no valida lextab contra las reglas, se
+# guarda junto con una firma de las reglas y solo se usa si coincide.
+LEXTAB = 'lextab'
+
+def rules_signature():
+    """Firma de las reglas léxicas: tokens, palabras reservadas y regex en orden."""
+    g = globals()
+    parts = [repr(tokens), repr(sorted(reserved.items())), repr(t_ignore)]
+    funcs = sorted((v.__code__.co_firstlineno, k, v.__doc__) for k, v in g.items()
+                   if k.startswith('t_') and callable(v))
+    parts += [f'{k}:{doc}' for _, k, doc in funcs]
+    parts += [f'{k}:{v}' for k, v in sorted(g.items())
+              if k.startswith('t_') and isinstance(v, str)]
+    return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+def tables_up_to_date():
+    try:
+        tab = importlib.import_module(LEXTAB)
+    except ImportError:
+        return False
+    return getattr(tab, '_signature', None) == rules_signature()
+
 def build_lexer():
-    """Construye el lexer global (para el parser)."""
+    """Construye el lexer global (desde lextab si está al día)."""
     global lexer
-    lexer = lex.lex()
+    if tables_up_to_date():
+        lexer = lex.lex(optimize=1, lextab=LEXTAB)
+    else:
+        lexer = lex.lex()
     return lexer
 
 def build():
     """Interfaz estándar para el parser."""
     return build_lexer()
 
+def write_tables(outputdir):
+    """Regenera lextab.py con la firma de las reglas actuales."""
+    lex.lex().writetab(LEXTAB, outputdir)
+    with open(os.path.join(outputdir, LEXTAB + '.py'), 'a') as f:
+        f.write(f"_signature = {rules_signature()!r}\n")
+
 # Construir automáticamente el lexer al importar
-lexer = lex.lex()
+lexer = build_lexer()
 
 # ============================
 # Función pública de análisis
 # ============================
 
-def analyze(code):
-    lexer.input(code)
-    tokens_list = []
-    while True:
-        tok = lexer.token()
-        if not tok:
-            break
-        tokens_list.append({
-            'type': tok.type,
-            'value': str(tok.value),
-            'line': tok.lineno,
-            'position': tok.lexpos
-        })
-    return tokens_list
+def tokenize(code, errors=None):
+    """
+    Lee todos los tokens de code en un solo pase (objetos LexToken de PLY).
+    Si se pasa la lista errors, los caracteres ilegales se agregan ahí en vez
+    de imprimirse.
+    """
+    # clon por llamada: el lexer global no se muta y es seguro entre hilos
+    lx = lexer.clone()
+    lx.errors = errors
+    lx.input(code)
+    lx.lineno = 1
+    return list(iter(lx.token, None))
+
+def token_dicts(toks):
+    """Convierte LexToken a la forma serializable que devuelve la API."""
+    return [{
+        'type': tok.type,
+        'value': str(tok.value),
+        'line': tok.lineno,
+        'position': tok.lexpos
+    } for tok in toks]
+
+def analyze(code, backend='regex'):
+    """Tokens de code como diccionarios; backend es una clave de BACKENDS."""
+    return BACKENDS[backend](code).dicts()
+
+
+class TokenStream:
+    """
+    Reproduce tokens ya leídos con la interfaz de lexer que espera PLY,
+    para que el parser no vuelva a lexear el código fuente.
+    """
+
+    def __init__(self, toks):
+        self._next = iter(toks).__next__
+
+    def input(self, data):
+        pass
+
+    def token(self):
+        try:
+            return self._next()
+        except StopIteration:
+            return None
+
+# ============================
+# Escáner rápido
+# ============================
+
+# Una sola regex maestra con las mismas alternativas y en el mismo orden que
+# arma PLY: primero las reglas-función en orden de definición, luego las
+# reglas-cadena de la más larga a la más corta. t_ignore va como una
+# alternativa más (ninguna regla empieza con espacio o tab). Cada alternativa
+# es un grupo; m.lastindex dice cuál casó.
+_STRING_RULES = sorted(((k[2:], v) for k, v in globals().items()
+                        if k.startswith('t_') and k != 't_ignore' and isinstance(v, str)),
+                       key=lambda rule: len(rule[1]), reverse=True)
+
+# acción de cada grupo: tipo del token, o una de las acciones especiales
+_SKIP, _NEWLINE, _INT, _FLOAT, _NAME = range(5)
+_ACTIONS = ((_SKIP, f'[{re.escape(t_ignore)}]+'),
+            (_FLOAT, t_FNUMBER.__doc__),
+            (_INT, t_NUMBER.__doc__),
+            (_NAME, t_ID.__doc__),
+            (_NEWLINE, t_newline.__doc__),
+            (_SKIP, t_COMMENT.__doc__)) + tuple(_STRING_RULES)
+_GROUP_ACTION = (None,) + tuple(action for action, _ in _ACTIONS)
+_MASTER = re.compile('|'.join(f'({regex})' for _, regex in _ACTIONS), re.VERBOSE)
+
+
+class TokenArrays:
+    """
+    Tokens en listas paralelas: types[i], values[i], lines[i] y positions[i]
+    describen el token i. errors son los caracteres ilegales (ver
+    lexical_error). Iterar produce LexToken para el parser.
+    """
+
+    __slots__ = ('types', 'values', 'lines', 'positions', 'errors')
+
+    def __init__(self, types, values, lines, positions, errors):
+        self.types = types
+        self.values = values
+        self.lines = lines
+        self.positions = positions
+        self.errors = errors
+
+    def __len__(self):
+        return len(self.types)
+
+    def __iter__(self):
+        for typ, value, line, pos in zip(self.types, self.values, self.lines, self.positions):
+            tok = LexToken()
+            tok.type = typ
+            tok.value = value
+            tok.lineno = line
+            tok.lexpos = pos
+            yield tok
+
+    def __eq__(self, other):
+        if not isinstance(other, TokenArrays):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    def dicts(self):
+        """La misma forma serializable que token_dicts."""
+        return [{'type': typ, 'value': str(value), 'line': line, 'position': pos}
+                for typ, value, line, pos in zip(self.types, self.values, self.lines, self.positions)]
+
+
+def scan(code):
+    """Escanea code con la regex maestra; ver TokenArrays."""
+    types = []
+    values = []
+    lines = []
+    positions = []
+    errors = []
+    add_type = types.append
+    add_value = values.append
+    add_line = lines.append
+    add_position = positions.append
+    actions = _GROUP_ACTION
+    keyword = reserved.get
+    line = 1
+    pos = 0
+    for m in _MASTER.finditer(code):
+        start, end = m.span()
+        if start != pos:
+            # finditer salta lo que no casa: cada carácter es un error
+            # (PLY avanza de a uno y reintenta en el siguiente)
+            for p in range(pos, start):
+                errors.append(lexical_error(code[p], line, p))
+        pos = end
+        action = actions[m.lastindex]
+        if action.__class__ is str:
+            add_type(action)
+            add_value(m.group())
+        elif action == _NAME:
+            text = m.group()
+            add_type(keyword(text, 'ID'))
+            add_value(text)
+        elif action == _SKIP:
+            continue
+        elif action == _NEWLINE:
+            line += end - start
+            continue
+        elif action == _INT:
+            add_type('NUMBER')
+            add_value(int(m.group()))
+        else:
+            add_type('FNUMBER')
+            add_value(float(m.group()))
+        add_line(line)
+        add_position(start)
+    for p in range(pos, len(code)):
+        errors.append(lexical_error(code[p], line, p))
+    return TokenArrays(types, values, lines, positions, errors)
+
+
+def ply_scan(code):
+    """El lexer de PLY, con el resultado en la forma de scan()."""
+    errors = []
+    toks = tokenize(code, errors)
+    return TokenArrays([t.type for t in toks], [t.value for t in toks],
+                       [t.lineno for t in toks], [t.lexpos for t in toks], errors)
+
+
+BACKENDS = {'regex': scan, 'ply': ply_scan}
 
 # ============================
 # Pruebas
@@ -0,0 +1,11 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('AND', 'ASSIGN', 'BOOL', 'COMMA', 'DIVIDE', 'ELSE', 'EQ', 'FALSE', 'FLOAT', 'FNUMBER', 'GE', 'GT', 'ID', 'IF', 'INT', 'LBRACE', 'LE', 'LPAREN', 'LT', 'MINUS', 'NE', 'NOT', 'NUMBER', 'OR', 'PLUS', 'PRINT', 'RBRACE', 'RPAREN', 'SEMICOLON', 'TIMES', 'TRUE', 'WHILE'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_FNUMBER>\\d+\\.\\d+)|(?P<t_NUMBER>\\d+)|(?P<t_ID>[a-zA-Z_][a-zA-Z_0-9]*)|(?P<t_newline>\\n+)|(?P<t_COMMENT>//.*)|(?P<t_OR>\\|\\|)|(?P<t_PLUS>\\+)|(?P<t_TIMES>\\*)|(?P<t_EQ>==)|(?P<t_NE>!=)|(?P<t_LE><=)|(?P<t_GE>>=)|(?P<t_AND>&&)|(?P<t_LPAREN>\\()|(?P<t_RPAREN>\\))|(?P<t_LBRACE>\\{)|(?P<t_RBRACE>\\})|(?P<t_MINUS>-)|(?P<t_DIVIDE>/)|(?P<t_ASSIGN>=)|(?P<t_LT><)|(?P<t_GT>>)|(?P<t_NOT>!)|(?P<t_SEMICOLON>;)|(?P<t_COMMA>,)', [None, ('t_FNUMBER', 'FNUMBER'), ('t_NUMBER', 'NUMBER'), ('t_ID', 'ID'), ('t_newline', 'newline'), ('t_COMMENT', 'COMMENT'), (None, 'OR'), (None, 'PLUS'), (None, 'TIMES'), (None, 'EQ'), (None, 'NE'), (None, 'LE'), (None, 'GE'), (None, 'AND'), (None, 'LPAREN'), (None, 'RPAREN'), (None, 'LBRACE'), (None, 'RBRACE'), (None, 'MINUS'), (None, 'DIVIDE'), (None, 'ASSIGN'), (None, 'LT'), (None, 'GT'), (None, 'NOT'), (None, 'SEMICOLON'), (None, 'COMMA')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
+_signature = '6c327bf50799755df823393ca9290d2dd6ebd86cf29a35379c3e69e4068fbfa5'
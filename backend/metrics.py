@@ -0,0 +1,122 @@
+# metrics.py
+"""
+Métricas agregadas del servidor en formato de texto de Prometheus.
+
+Secciones principales:
+1. Histogram:
+   - Buckets acumulativos, suma y cuenta por combinación de etiquetas.
+   - Con ellos Prometheus calcula p50/p99 (histogram_quantile).
+
+2. Counter:
+   - Contador monótono por combinación de etiquetas.
+
+3. Registry:
+   - Agrupa las métricas y las serializa con render() para /metrics.
+
+Todas las operaciones son seguras entre hilos.
+"""
+import threading
+
+# buckets por defecto: de 10µs a 10s (duraciones en segundos)
+TIME_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2,
+                5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# buckets para tamaños (tokens, nodos, cuádruplos, instrucciones)
+SIZE_BUCKETS = (10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000,
+                500000, 1000000, 10000000)
+
+
+def _labels_text(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+def _number(x):
+    if x == float('inf'):
+        return '+Inf'
+    return repr(float(x)) if isinstance(x, float) else str(x)
+
+
+class Histogram:
+
+    def __init__(self, name, help_, labels=(), buckets=TIME_BUCKETS):
+        self.name = name
+        self.help = help_
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}   # valores de etiquetas -> [conteos por bucket, suma, cuenta]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[k]) for k in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                for bound, c in zip(self.buckets, counts):
+                    lbl = _labels_text(self.labels, key, ('le', _number(bound)))
+                    lines.append(f'{self.name}_bucket{lbl} {c}')
+                lbl = _labels_text(self.labels, key, ('le', '+Inf'))
+                lines.append(f'{self.name}_bucket{lbl} {count}')
+                lbl = _labels_text(self.labels, key)
+                lines.append(f'{self.name}_sum{lbl} {_number(total)}')
+                lines.append(f'{self.name}_count{lbl} {count}')
+        return lines
+
+
+class Counter:
+
+    def __init__(self, name, help_, labels=()):
+        self.name = name
+        self.help = help_
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[k]) for k in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels_text(self.labels, key)} {_number(value)}')
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+
+    def histogram(self, name, help_, labels=(), buckets=TIME_BUCKETS):
+        m = Histogram(name, help_, labels, buckets)
+        self._metrics.append(m)
+        return m
+
+    def counter(self, name, help_, labels=()):
+        m = Counter(name, help_, labels)
+        self._metrics.append(m)
+        return m
+
+    def render(self):
+        lines = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        return '\n'.join(lines) + '\n'
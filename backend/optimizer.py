@@ -1,54 +1,1148 @@
 # optimizer.py
 """
-Optimizador sencillo:
+Optimizador de cuádruplos sobre un grafo de flujo de control (CFG).
 
 Secciones principales:
 1. Función is_number(x):
    - Verifica si un valor es un número (entero o flotante).
 
-2. optimize_code(quadruples):
-   - Entrada: Lista de cuádruplos.
-   - Salida: Diccionario con cuádruplos optimizados y porcentaje de reducción.
-   - Fases:
-     a. Plegado de constantes: Simplifica operaciones con literales.
-     b. Eliminación de asignaciones redundantes: Remueve asignaciones innecesarias como `t = t`.
+2. Grafo de flujo:
+   - build_cfg(quadruples): Parte los cuádruplos en bloques básicos (cortando en
+     'label' y en los saltos, JUMP_OPS) y calcula sucesores y predecesores.
+   - reverse_postorder(cfg): Orden de recorrido para los análisis hacia adelante.
+
+3. Pases (cada uno recibe y devuelve cuádruplos, más la cantidad de cambios):
+   a. constant_propagation: Propagación de constantes global con plegado; un
+      operador con operandos constantes se reemplaza por `assign valor`.
+   b. peephole: Saltos a su destino final, saltos a la instrucción siguiente,
+      código inalcanzable, etiquetas sin uso y jfalse con condición constante.
+   c. dead_store: Eliminación de escrituras muertas según vida (liveness);
+      las variables del programa se consideran vivas al terminar, porque la
+      respuesta de /compile reporta sus valores finales.
+   d. copy_propagation: Propagación de copias `x = y` entre variables y
+      fusión de `t = a op b; x = t` en `x = a op b` cuando t muere ahí.
+   e. redundant_assign: Remueve asignaciones como `t = t`.
+   f. local_value_numbering: Numeración de valores en cada bloque; un cálculo
+      repetido lee el nombre que ya tiene el valor.
+   g. global_cse: Subexpresiones comunes entre bloques (expresiones
+      disponibles).
+   h. loop_invariant_motion: Sube al preencabezado de cada while los cálculos
+      que no cambian dentro del ciclo (find_loops ubica los ciclos).
+   i. strength_reduction: Dentro de los ciclos, `x * 2` -> `x + x` y
+      `v * k` con v variable de inducción -> una suma acumulada.
+
+4. optimize_code(quadruples, passes=None, lines=None):
+   - Entrada: Lista de cuádruplos; opcionalmente los nombres de los pases a
+     correr (por defecto todos los de PASSES) y la línea de código fuente de
+     cada cuádruplo (la de generate_intermediate_code).
+   - Salida: Diccionario con cuádruplos optimizados, porcentaje de reducción y
+     los pases aplicados por ronda ('passes'; cada uno con los cuádruplos
+     antes y después, los que quitó y la cantidad de cambios).
+   - Repite los pases hasta que una ronda completa no cambia nada.
+   - Con lines, la salida trae también 'lines' para los cuádruplos
+     optimizados (ver carry_lines).
+
+La semántica de cada operador (división entera, 0 al dividir entre cero, ...)
+es la de la VM: se comparte con codegen.py (evaluate, literal_value).
 """
+import bisect
+import heapq
+import itertools
+import math
+
+from codegen import (OPCODES, JUMP_OPS, literal_value, constant_key, quad_operands,
+                     evaluate, branch_taken)
+from intermediate import is_temp, TEMP_PREFIX
+
+# rondas máximas de pases (en la práctica se converge en 2 o 3)
+MAX_ROUNDS = 10
+
+_UNKNOWN = object()
+_UNARY = ('assign', 'not')
+
 
 def is_number(x):
     return isinstance(x, int) or isinstance(x, float)
 
-def optimize_code(quadruples):
-    # Primer pase: plegado de constantes
-    folded = []
-    for q in quadruples:
-        op, a1, a2, res = q
-        if op in ('+', '-', '*', '/'):
-            # a1 and a2 could be names (strings) or temporals or literals
-            if is_number(a1) and is_number(a2):
-                # compute
-                try:
-                    if op == '+': val = a1 + a2
-                    elif op == '-': val = a1 - a2
-                    elif op == '*': val = a1 * a2
-                    elif op == '/': val = a1 / a2 if a2 != 0 else 0
-                    folded.append(('assign', val, None, res))
+
+# --------------------------
+# Grafo de flujo
+# --------------------------
+def build_cfg(quads, memo=None):
+    """
+    Bloques básicos de `quads`.
+
+    Retorna {'blocks': [(inicio, fin)], 'succ': [[...]], 'pred': [[...]],
+    'exits': [bool], 'operands': [...]}. exits indica si el bloque puede
+    terminar el programa: cae al final, o salta a una etiqueta inexistente (la
+    VM se detiene). operands[i] es quad_operands(quads[i]), o None si el
+    cuádruplo no se ejecuta (etiquetas); memo ({cuádruplo: operandos}) evita
+    recalcularlos entre pases.
+    """
+    n = len(quads)
+    leaders = {0}
+    for i, q in enumerate(quads):
+        if q[0] == 'label':
+            leaders.add(i)
+        elif q[0] in JUMP_OPS and i + 1 < n:
+            leaders.add(i + 1)
+    starts = sorted(x for x in leaders if x < n)
+    blocks = [(s, starts[k + 1] if k + 1 < len(starts) else n) for k, s in enumerate(starts)]
+
+    block_at = {s: k for k, (s, _) in enumerate(blocks)}
+    label_block = {}
+    for i, q in enumerate(quads):
+        if q[0] == 'label':
+            label_block[q[1]] = block_at[i]   # como en assemble: gana la última
+
+    succ = []
+    exits = []
+    for k, (s, e) in enumerate(blocks):
+        last = quads[e - 1]
+        out = []
+        leaves = False
+        if last[0] in JUMP_OPS:
+            target = label_block.get(last[3])
+            if target is None:
+                leaves = True
+            else:
+                out.append(target)
+        if last[0] != 'goto':
+            # cae al bloque siguiente (o al final del programa)
+            if k + 1 < len(blocks):
+                if k + 1 not in out:
+                    out.insert(0, k + 1)
+            else:
+                leaves = True
+        succ.append(out)
+        exits.append(leaves)
+
+    pred = [[] for _ in blocks]
+    for k, out in enumerate(succ):
+        for t in out:
+            pred[t].append(k)
+    if memo is None:
+        memo = {}
+    operands = []
+    for q in quads:
+        rw = memo.get(q, _UNKNOWN)
+        if rw is _UNKNOWN:
+            rw = memo[q] = quad_operands(q) if q[0] in OPCODES else None
+        operands.append(rw)
+    return {'blocks': blocks, 'succ': succ, 'pred': pred, 'exits': exits,
+            'operands': operands}
+
+
+def reverse_postorder(cfg):
+    """Bloques alcanzables desde el inicio, en orden postorden inverso (sin recursión)."""
+    if not cfg['blocks']:
+        return []
+    succ = cfg['succ']
+    seen = {0}
+    order = []
+    stack = [(0, iter(succ[0]))]
+    while stack:
+        block, children = stack[-1]
+        for nxt in children:
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append((nxt, iter(succ[nxt])))
+                break
+        else:
+            stack.pop()
+            order.append(block)
+    order.reverse()
+    return order
+
+
+def _forward(quads, cfg, entry, transfer, meet):
+    """
+    Análisis hacia adelante con lista de trabajo (en postorden inverso).
+    Retorna el estado de entrada de cada bloque (None si es inalcanzable).
+
+    Los temporales que no se usan fuera de su bloque se descartan del estado
+    al salir de él; así el estado no crece con cada expresión del programa.
+    """
+    blocks, succ, pred = cfg['blocks'], cfg['succ'], cfg['pred']
+    order = reverse_postorder(cfg)
+    rank = {b: i for i, b in enumerate(order)}
+    shared = _shared_temps(cfg)
+    operands = cfg['operands']
+    ins = [None] * len(blocks)
+    outs = [None] * len(blocks)
+    heap = list(range(len(order)))   # rangos en postorden inverso
+    queued = set(order)
+    while heap:
+        b = order[heapq.heappop(heap)]
+        queued.discard(b)
+        if b == 0:
+            state = dict(entry)
+        else:
+            state = None
+            for p in pred[b]:
+                if outs[p] is None:
                     continue
-                except Exception:
-                    pass
-        folded.append(q)
+                state = dict(outs[p]) if state is None else meet(state, outs[p])
+            if state is None:
+                continue
+        if outs[b] is not None and state == ins[b]:
+            continue
+        ins[b] = dict(state)
+        s, e = blocks[b]
+        for i in range(s, e):
+            transfer(quads[i], operands[i], state)
+        for name in [x for x in state if is_temp(x) and x not in shared]:
+            del state[name]
+        if state != outs[b]:
+            outs[b] = state
+            for x in succ[b]:
+                if x not in queued:
+                    queued.add(x)
+                    heapq.heappush(heap, rank[x])
+    return ins
+
+
+def _shared_temps(cfg):
+    """Temporales que aparecen en más de un bloque."""
+    operands = cfg['operands']
+    seen = {}
+    shared = set()
+    for b, (s, e) in enumerate(cfg['blocks']):
+        for i in range(s, e):
+            if operands[i] is None:
+                continue
+            reads, write = operands[i]
+            for x in reads + [write]:
+                if x is not None and is_temp(x):
+                    if seen.setdefault(x, b) != b:
+                        shared.add(x)
+    return shared
+
+
+def _meet_equal(a, b):
+    """Intersección de estados: solo lo que vale lo mismo (y del mismo tipo) en ambos."""
+    return {k: v for k, v in a.items()
+            if k in b and type(b[k]) is type(v) and b[k] == v
+            and (type(v) is not float or repr(v) == repr(b[k]))}   # 0.0 y -0.0
+
+
+def _liveness(cfg, exit_live):
+    """Variables vivas al salir de cada bloque."""
+    blocks, succ, pred, exits = cfg['blocks'], cfg['succ'], cfg['pred'], cfg['exits']
+    operands = cfg['operands']
+    use = []
+    defs = []
+    for s, e in blocks:
+        u, d = set(), set()
+        for i in range(s, e):
+            if operands[i] is None:
+                continue
+            reads, write = operands[i]
+            u.update(x for x in reads if x not in d)
+            if write is not None:
+                d.add(write)
+        use.append(u)
+        defs.append(d)
+
+    live_in = [set() for _ in blocks]
+    live_out = [set() for _ in blocks]
+    pending = list(range(len(blocks)))
+    queued = set(pending)
+    while pending:
+        b = pending.pop()
+        queued.discard(b)
+        out = set(exit_live) if exits[b] else set()
+        for t in succ[b]:
+            out |= live_in[t]
+        live_out[b] = out
+        new_in = use[b] | (out - defs[b])
+        if new_in != live_in[b]:
+            live_in[b] = new_in
+            for p in pred[b]:
+                if p not in queued:
+                    queued.add(p)
+                    pending.append(p)
+    return live_out
+
+
+def _program_variables(quads):
+    names = set()
+    for q in quads:
+        if q[0] not in OPCODES:
+            continue
+        reads, write = quad_operands(q)
+        names.update(x for x in reads if not is_temp(x))
+        if write is not None and not is_temp(write):
+            names.add(write)
+    return names
+
+
+# --------------------------
+# Propagación de constantes
+# --------------------------
+def _constant_of(q, reads, state):
+    """Valor constante que produce q con el estado dado, o _UNKNOWN."""
+    op, a1, a2, _ = q
+    if a1 in reads:
+        a = state.get(a1, _UNKNOWN)
+        if a is _UNKNOWN:
+            return _UNKNOWN
+    else:
+        a = literal_value(a1)
+    if op in _UNARY:
+        b = None
+    elif a2 in reads:
+        b = state.get(a2, _UNKNOWN)
+        if b is _UNKNOWN:
+            return _UNKNOWN
+    else:
+        b = literal_value(a2)
+    try:
+        val = evaluate(op, a, b)
+    except Exception:
+        return _UNKNOWN   # la VM fallaría aquí: no plegar
+    if type(val) is float and not math.isfinite(val):
+        return _UNKNOWN
+    return val
+
+
+def _constant_transfer(q, rw, state):
+    if rw is None or rw[1] is None:
+        return
+    val = _constant_of(q, rw[0], state)
+    if val is _UNKNOWN:
+        state.pop(rw[1], None)
+    else:
+        state[rw[1]] = val
+
+
+def constant_propagation(quads, exit_live=None, memo=None):
+    cfg = build_cfg(quads, memo)
+    ins = _forward(quads, cfg, {}, _constant_transfer, _meet_equal)
+    operands = cfg['operands']
+    out = list(quads)
+    changes = 0
+    for b, (s, e) in enumerate(cfg['blocks']):
+        state = ins[b]
+        if state is None:
+            continue   # inalcanzable
+        for i in range(s, e):
+            q = quads[i]
+            if operands[i] is None:
+                continue
+            op, a1, a2, res = q
+            reads, write = operands[i]
+            val = _constant_of(q, reads, state) if write is not None else _UNKNOWN
+            if val is not _UNKNOWN:
+                new = ('assign', val, None, res)
+            elif reads:
+                new = (op, state.get(a1, a1) if a1 in reads else a1,
+                       state.get(a2, a2) if a2 in reads else a2, res)
+            else:
+                new = q
+            if new is not q and (new != q or any(type(x) is not type(y) for x, y in zip(new, q))):
+                out[i] = new
+                changes += 1
+            if write is not None:
+                if val is _UNKNOWN:
+                    state.pop(write, None)
+                else:
+                    state[write] = val
+    return out, changes
+
+
+# --------------------------
+# Propagación de copias
+# --------------------------
+def _copy_transfer(q, rw, state):
+    if rw is None or rw[1] is None:
+        return
+    write = rw[1]
+    for dst in [d for d, src in state.items() if d == write or src == write]:
+        del state[dst]
+    state.pop(write, None)
+    src = q[1]
+    if q[0] == 'assign' and src in rw[0] and src != write and not is_temp(src):
+        state[write] = src
+
+
+def copy_propagation(quads, exit_live=None, memo=None):
+    if exit_live is None:
+        exit_live = _program_variables(quads)
+    cfg = build_cfg(quads, memo)
+    ins = _forward(quads, cfg, {}, _copy_transfer, _meet_equal)
+    operands = list(cfg['operands'])
+    out = list(quads)
+    changes = 0
+
+    # 1) hacia adelante: leer la variable original en vez de su copia
+    for b, (s, e) in enumerate(cfg['blocks']):
+        state = ins[b]
+        if state is None:
+            continue
+        for i in range(s, e):
+            q = out[i]
+            op, a1, a2, res = q
+            if operands[i] is not None:
+                reads, write = operands[i]
+                if any(x in state for x in reads):
+                    q = (op, state.get(a1, a1) if a1 in reads else a1,
+                         state.get(a2, a2) if a2 in reads else a2, res)
+                    out[i] = q
+                    operands[i] = ([state.get(x, x) for x in reads], write)
+                    changes += 1
+            _copy_transfer(q, operands[i], state)
+
+    # 2) hacia atrás: `t = a op b; x = t` -> `x = a op b` si t muere ahí
+    cfg['operands'] = operands
+    live_out = _liveness(cfg, exit_live)
+    removed = set()
+    for b, (s, e) in enumerate(cfg['blocks']):
+        live = set(live_out[b])
+        for i in range(e - 1, s - 1, -1):
+            q = out[i]
+            if operands[i] is None:
+                continue
+            reads, write = operands[i]
+            if (q[0] == 'assign' and i > s and is_temp(q[1]) and q[1] not in live):
+                prev = out[i - 1]
+                if operands[i - 1] is not None and operands[i - 1][1] == q[1]:
+                    out[i - 1] = (prev[0], prev[1], prev[2], q[3])
+                    operands[i - 1] = (operands[i - 1][0], q[3])
+                    removed.add(i)
+                    changes += 1
+                    continue
+            if write is not None:
+                live.discard(write)
+            live.update(reads)
+    if removed:
+        out = [q for i, q in enumerate(out) if i not in removed]
+    return out, changes
+
+
+# --------------------------
+# Escrituras muertas
+# --------------------------
+def dead_store(quads, exit_live=None, memo=None):
+    if exit_live is None:
+        exit_live = _program_variables(quads)
+    cfg = build_cfg(quads, memo)
+    operands = cfg['operands']
+    live_out = _liveness(cfg, exit_live)
+    dead = set()
+    for b, (s, e) in enumerate(cfg['blocks']):
+        live = set(live_out[b])
+        for i in range(e - 1, s - 1, -1):
+            if operands[i] is None:
+                continue
+            reads, write = operands[i]
+            if write is not None:
+                if write not in live:
+                    dead.add(i)   # ningún operador con resultado tiene efectos
+                    continue
+                live.discard(write)
+            live.update(reads)
+    return [q for i, q in enumerate(quads) if i not in dead], len(dead)
+
+
+# --------------------------
+# Mirilla (peephole) de saltos
+# --------------------------
+def _fold_branches(quads):
+    """Saltos condicionales con operandos literales: goto si se toma, nada si no."""
+    out = []
+    changes = 0
+    for q in quads:
+        op = q[0]
+        if op in JUMP_OPS and op != 'goto' and not quad_operands(q)[0]:
+            changes += 1
+            if branch_taken(op, literal_value(q[1]), literal_value(q[2])):
+                out.append(('goto', None, None, q[3]))
+            continue
+        out.append(q)
+    return out, changes
+
+
+def _label_runs(quads):
+    """
+    {etiqueta: posición}, y para cada posición de etiqueta el primer
+    cuádruplo ejecutable a partir de ella (saltando etiquetas seguidas).
+    """
+    labels = {}
+    landing = {}
+    nxt = len(quads)
+    for i in range(len(quads) - 1, -1, -1):
+        if quads[i][0] == 'label':
+            landing[i] = nxt
+        else:
+            nxt = i
+    for i, q in enumerate(quads):
+        if q[0] == 'label':
+            labels[q[1]] = i   # como en assemble: gana la última
+    return labels, landing
+
+
+def _thread_jumps(quads):
+    """Un salto a una etiqueta seguida de `goto M` pasa a saltar a M."""
+    labels, landing = _label_runs(quads)
+    final = {}   # etiqueta -> destino final (con compresión de caminos)
+
+    def resolve(label):
+        path = []
+        on_path = set()
+        while label not in final:
+            e = landing[labels[label]]
+            nxt = quads[e][3] if e < len(quads) and quads[e][0] == 'goto' else None
+            if nxt is None or nxt not in labels or nxt in on_path or nxt == label:
+                final[label] = label   # fin de la cadena, salida o ciclo de gotos
+                break
+            path.append(label)
+            on_path.add(label)
+            label = nxt
+        for x in path:
+            final[x] = final[label]
+        return final[label]
+
+    out = list(quads)
+    changes = 0
+    for i, q in enumerate(quads):
+        if q[0] not in JUMP_OPS or q[3] not in labels:
+            continue
+        target = resolve(q[3])
+        if target != q[3]:
+            out[i] = (q[0], q[1], q[2], target)
+            changes += 1
+    return out, changes
+
+
+def _remove_unreachable(quads, memo):
+    """Borra los bloques a los que no se llega desde el inicio."""
+    cfg = build_cfg(quads, memo)
+    reachable = set(reverse_postorder(cfg))
+    if len(reachable) == len(cfg['blocks']):
+        return quads, 0
+    out = []
+    for b, (s, e) in enumerate(cfg['blocks']):
+        if b in reachable:
+            out.extend(quads[s:e])
+    return out, len(quads) - len(out)
+
+
+def _remove_jumps_to_next(quads):
+    """Un salto a una etiqueta que está justo debajo (solo etiquetas entre medio) sobra."""
+    labels, landing = _label_runs(quads)
+    out = []
+    changes = 0
+    for i, q in enumerate(quads):
+        if (q[0] in JUMP_OPS and q[3] in labels and i + 1 < len(quads)
+                and quads[i + 1][0] == 'label' and i < labels[q[3]] < landing[i + 1]):
+            # la etiqueta está en la racha de etiquetas que sigue a i; leer
+            # los operandos no tiene efectos
+            changes += 1
+            continue
+        out.append(q)
+    return out, changes
+
+
+def _drop_unused_labels(quads):
+    used = {q[3] for q in quads if q[0] in JUMP_OPS}
+    out = [q for q in quads if q[0] != 'label' or q[1] in used]
+    return out, len(quads) - len(out)
+
+
+def peephole(quads, exit_live=None, memo=None):
+    """
+    Limpieza de saltos, hasta que nada cambie:
+    - jfalse (y los demás saltos condicionales) con condición constante;
+    - saltos encadenados (`goto L; ... label L; goto M` -> `goto M`);
+    - código inalcanzable, p. ej. después de un goto;
+    - saltos a la instrucción siguiente (el `goto L_fin` de un if sin else);
+    - etiquetas a las que nadie salta (así los bloques básicos se unen).
+    """
+    changes = 0
+    while True:
+        before = changes
+        quads, n = _fold_branches(quads)
+        changes += n
+        quads, n = _thread_jumps(quads)
+        changes += n
+        quads, n = _remove_unreachable(quads, memo)
+        changes += n
+        quads, n = _remove_jumps_to_next(quads)
+        changes += n
+        quads, n = _drop_unused_labels(quads)
+        changes += n
+        if changes == before:
+            return quads, changes
+
+
+# --------------------------
+# Subexpresiones comunes
+# --------------------------
+_COMMUTATIVE = ('+', '*', '==', '!=', 'and', 'or')
+
 
-    # Segundo pase: eliminar asignaciones redundantes tipo assign t, None, t
-    optimized = []
-    for q in folded:
-        op, a1, a2, res = q
-        if op == 'assign' and a1 == res:
-            # t = t -> eliminar
+def _operand_key(x, reads):
+    """Un nombre tal cual; un literal por su constant_key (1, 1.0 y true son distintos)."""
+    if x in reads:
+        return x
+    return constant_key(literal_value(x))
+
+
+def _expr_key(q, reads):
+    """Forma canónica de la expresión que calcula q (los conmutativos, ordenados)."""
+    op = q[0]
+    a = _operand_key(q[1], reads)
+    if op in _UNARY:
+        return (op, a, None)
+    b = _operand_key(q[2], reads)
+    if op in _COMMUTATIVE and repr(b) < repr(a):
+        a, b = b, a
+    return (op, a, b)
+
+
+def _reuse(i, h, out, operands, defs, uses, block, drop):
+    """
+    El cuádruplo i calcula un valor que h ya tiene. Si su resultado d es un
+    temporal que solo se lee más abajo en el bloque (y h no cambia antes de
+    esas lecturas) se lo borra y se lee h; si no, pasa a `d = h`.
+    Retorna True si el cuádruplo se borró.
+    """
+    d = operands[i][1]
+    if h == d:
+        drop.add(i)
+        return True
+    reads_d = uses.get(d, ())
+    if (is_temp(d) and len(defs[d]) == 1 and _local_uses(d, i, uses, block)
+            and not (reads_d and _written_in(defs.get(h, ()), i + 1, reads_d[-1]))):
+        for u in reads_d:
+            op, a1, a2, res = out[u]
+            out[u] = (op, h if a1 == d else a1, h if a2 == d else a2, res)
+            operands[u] = ([h if x == d else x for x in operands[u][0]], operands[u][1])
+        drop.add(i)
+        return True
+    out[i] = ('assign', h, None, d)
+    operands[i] = ([h], d)
+    return False
+
+
+def local_value_numbering(quads, exit_live=None, memo=None):
+    """
+    Numeración de valores dentro de cada bloque básico: cada nombre lleva el
+    número del valor que guarda (una copia `x = y` comparte el de y), así que
+    `x = a; t = x + b; u = a + b` reconoce u como el mismo valor que t.
+    """
+    cfg = build_cfg(quads, memo)
+    operands = list(cfg['operands'])
+    block = _block_of(cfg, len(quads))
+    defs, uses = _sites(operands)
+    out = list(quads)
+    drop = set()
+    changes = 0
+    counter = itertools.count()
+    for s, e in cfg['blocks']:
+        vn = {}        # nombre -> número del valor que guarda
+        numbers = {}   # literal o (op, número, número) -> número
+        holders = {}   # número -> nombres que lo guardan ahora
+
+        def number(x, reads):
+            if x in reads:
+                if x not in vn:
+                    vn[x] = next(counter)
+                    holders[vn[x]] = [x]
+                return vn[x]
+            key = _operand_key(x, ())
+            if key not in numbers:
+                numbers[key] = next(counter)
+            return numbers[key]
+
+        for i in range(s, e):
+            rw = operands[i]
+            if rw is None or rw[1] is None:
+                continue
+            q = out[i]
+            reads, d = rw
+            if q[0] == 'assign':
+                val = number(q[1], reads)
+            else:
+                a = number(q[1], reads)
+                b = None if q[0] in _UNARY else number(q[2], reads)
+                if q[0] in _COMMUTATIVE and b < a:
+                    a, b = b, a
+                key = (q[0], a, b)
+                val = numbers.get(key)
+                if val is None:
+                    val = numbers[key] = next(counter)
+                elif holders.get(val):
+                    # el último en recibirlo: suele ser la variable a la que se
+                    # copió el temporal, y así el temporal muere en la copia
+                    h = d if d in holders[val] else holders[val][-1]
+                    changes += 1
+                    if _reuse(i, h, out, operands, defs, uses, block, drop):
+                        continue
+            old = vn.get(d)
+            if old is not None:
+                holders[old].remove(d)
+            vn[d] = val
+            holders.setdefault(val, []).append(d)
+    return [q for i, q in enumerate(out) if i not in drop], changes
+
+
+def _available_transfer(q, rw, state):
+    # estado: nombre -> expresión que guarda
+    if rw is None or rw[1] is None:
+        return
+    d = rw[1]
+    for h in [h for h, expr in state.items() if h == d or d in expr[1:]]:
+        del state[h]
+    if q[0] != 'assign':
+        expr = _expr_key(q, rw[0])
+        if d not in expr[1:]:
+            state[d] = expr
+
+
+def global_cse(quads, exit_live=None, memo=None):
+    """
+    Eliminación de subexpresiones comunes entre bloques: expresiones
+    disponibles (calculadas en todo camino hasta aquí, sin que después cambie
+    un operando ni el nombre que las guarda).
+    """
+    cfg = build_cfg(quads, memo)
+    ins = _forward(quads, cfg, {}, _available_transfer, _meet_equal)
+    operands = list(cfg['operands'])
+    block = _block_of(cfg, len(quads))
+    defs, uses = _sites(operands)
+    out = list(quads)
+    drop = set()
+    changes = 0
+    for b, (s, e) in enumerate(cfg['blocks']):
+        state = ins[b]
+        if state is None:
+            continue
+        holder = {expr: h for h, expr in state.items()}
+        for i in range(s, e):
+            rw = operands[i]
+            if rw is None or rw[1] is None:
+                continue
+            q = out[i]
+            if q[0] != 'assign':
+                h = holder.get(_expr_key(q, rw[0]))
+                if h is not None:
+                    changes += 1
+                    if _reuse(i, h, out, operands, defs, uses, block, drop):
+                        continue
+            # como _available_transfer, manteniendo también el índice inverso
+            d = rw[1]
+            for h in [h for h, expr in state.items() if h == d or d in expr[1:]]:
+                if holder.get(state[h]) == h:
+                    del holder[state[h]]
+                del state[h]
+            if q[0] != 'assign':
+                expr = _expr_key(q, rw[0])
+                if d not in expr[1:]:
+                    state[d] = expr
+                    holder.setdefault(expr, d)
+    return [q for i, q in enumerate(out) if i not in drop], changes
+
+
+# --------------------------
+# Ciclos
+# --------------------------
+def find_loops(quads, cfg=None):
+    """
+    Ciclos naturales con la forma que emite gen_stmt para un while:
+    `label L; <saltos de la condición a Lfin>; <cuerpo>; goto L`.
+
+    Retorna [(cabecera, regreso)] (índices de la etiqueta y del goto), de los
+    ciclos más internos a los más externos. Se descarta un ciclo si se puede
+    entrar a él sin pasar por la cabecera, o saltando directo a ella desde
+    fuera: el código que se sube delante de la etiqueta (el preencabezado) no
+    se ejecutaría en ese camino. También los que se cruzan con otro sin
+    anidarse.
+    """
+    if cfg is None:
+        cfg = build_cfg(quads)
+    labels = {}
+    repeated = set()
+    for i, q in enumerate(quads):
+        if q[0] == 'label':
+            if q[1] in labels:
+                repeated.add(q[1])
+            labels[q[1]] = i
+    loops = []
+    for j, q in enumerate(quads):
+        if q[0] == 'goto' and q[3] not in repeated and labels.get(q[3], j) < j:
+            loops.append((labels[q[3]], j))
+    loops, inner, parent = _nesting(loops, len(quads))
+
+    # aristas que entran a un ciclo: los ciclos que contienen el destino pero
+    # no el origen, subiendo desde el más interno
+    blocks = cfg['blocks']
+    entered = set()
+    for k, preds in enumerate(cfg['pred']):
+        sk = blocks[k][0]
+        for p in preds:
+            sp = blocks[p][0]
+            loop = inner[sk]
+            while loop != -1 and not loops[loop][0] <= sp <= loops[loop][1]:
+                h = loops[loop][0]
+                # solo la caída desde el bloque anterior entra a la cabecera
+                if sk != h or p != k - 1 or quads[blocks[p][1] - 1][3] == quads[h][1]:
+                    entered.add(loop)
+                loop = parent[loop]
+    loops = [loop for k, loop in enumerate(loops) if k not in entered]
+    loops.sort(key=lambda loop: loop[1] - loop[0])
+    return loops
+
+
+def _nesting(loops, n):
+    """
+    Anidamiento de los ciclos (intervalos [cabecera, regreso]).
+
+    Retorna (ciclos, inner, parent): los ciclos que anidan bien, en orden de
+    cabecera; inner[i] es el ciclo más interno que contiene la posición i (o
+    -1) y parent[k] el ciclo que contiene directamente a k (o -1). Un ciclo
+    que se cruza con otro sin contenerlo se descarta.
+    """
+    kept = []
+    parent = []
+    inner = [-1] * n
+    open_ = []
+    pending = sorted(loops, key=lambda loop: (loop[0], -loop[1]))
+    nxt = 0
+    for i in range(n):
+        while open_ and kept[open_[-1]][1] < i:
+            open_.pop()
+        while nxt < len(pending) and pending[nxt][0] == i:
+            h, j = pending[nxt]
+            nxt += 1
+            if open_ and kept[open_[-1]][1] < j:
+                continue   # se cruza con el ciclo abierto
+            parent.append(open_[-1] if open_ else -1)
+            kept.append((h, j))
+            open_.append(len(kept) - 1)
+        inner[i] = open_[-1] if open_ else -1
+    return kept, inner, parent
+
+
+def _sites(operands):
+    """Posiciones (ordenadas) donde se escribe y donde se lee cada nombre."""
+    defs, uses = {}, {}
+    for i, rw in enumerate(operands):
+        if rw is None:
             continue
-        optimized.append(q)
+        for x in rw[0]:
+            uses.setdefault(x, []).append(i)
+        if rw[1] is not None:
+            defs.setdefault(rw[1], []).append(i)
+    return defs, uses
+
+
+def _written_in(sites, h, j):
+    """True si alguna de las posiciones (ordenadas) cae en [h, j]."""
+    k = bisect.bisect_left(sites, h)
+    return k < len(sites) and sites[k] <= j
+
+
+def _block_of(cfg, n):
+    block = [0] * n
+    for b, (s, e) in enumerate(cfg['blocks']):
+        block[s:e] = [b] * (e - s)
+    return block
+
+
+def _local_uses(d, i, uses, block):
+    """True si todas las lecturas de d están después de i y en su mismo bloque."""
+    return all(u > i and block[u] == block[i] for u in uses.get(d, ()))
+
+
+def _fresh_temps(quads):
+    """Generador de temporales que no aparecen en quads."""
+    top = -1
+    for q in quads:
+        for x in q[1:]:
+            if is_temp(x):
+                top = max(top, int(x[len(TEMP_PREFIX):]))
+    return (f"{TEMP_PREFIX}{k}" for k in itertools.count(top + 1))
+
+
+def loop_invariant_motion(quads, exit_live=None, memo=None):
+    """
+    Sube al preencabezado (justo antes de la etiqueta de la cabecera) los
+    cuádruplos cuyos operandos no cambian dentro del ciclo, al del ciclo más
+    externo posible.
+
+    Solo se mueven temporales con una única escritura en todo el programa y
+    leídos después de ella en su mismo bloque: en el preencabezado calculan lo
+    mismo y, si el ciclo no da ninguna vuelta, nadie los lee. Ningún operador
+    con resultado tiene efectos (la división entre cero da 0), así que
+    ejecutarlo una vez de más no cambia la salida.
+    """
+    cfg = build_cfg(quads, memo)
+    loops, inner, parent = _nesting(find_loops(quads, cfg), len(quads))
+    if not loops:
+        return quads, 0
+    operands = cfg['operands']
+    block = _block_of(cfg, len(quads))
+    defs, uses = _sites(operands)
+    target = {}   # índice del cuádruplo -> ciclo a cuyo preencabezado sube
+
+    def invariant(x, loop):
+        h, j = loops[loop]
+        sites = defs.get(x, ())
+        if len(sites) == 1 and sites[0] in target:
+            # ya sube: es invariante si sube a este ciclo o a uno que lo contiene
+            hh, jj = loops[target[sites[0]]]
+            return hh <= h and j <= jj
+        return not _written_in(sites, h, j)
+
+    for i, rw in enumerate(operands):
+        loop = inner[i]
+        if loop == -1 or rw is None or rw[1] is None:
+            continue
+        reads, d = rw
+        if not is_temp(d) or len(defs[d]) != 1 or not _local_uses(d, i, uses, block):
+            continue
+        while loop != -1 and all(invariant(x, loop) for x in reads):
+            target[i] = loop
+            loop = parent[loop]
+    if not target:
+        return quads, 0
+    preheader = {}
+    for i in sorted(target):
+        preheader.setdefault(loops[target[i]][0], []).append(quads[i])
+    out = []
+    for i, q in enumerate(quads):
+        out.extend(preheader.get(i, ()))
+        if i not in target:
+            out.append(q)
+    return out, len(target)
+
+
+def _int_literal(x, reads):
+    """El valor de x si es un literal entero (no bool), si no None."""
+    if x in reads:
+        return None
+    v = literal_value(x)
+    return v if type(v) is int else None
+
+
+def _induction_step(v, q, reads):
+    """Paso de `v = v + c` / `v = v - c` con c entero literal, o None."""
+    if q[3] != v or q[0] not in ('+', '-'):
+        return None
+    if q[1] == v:
+        c = _int_literal(q[2], reads)
+    elif q[0] == '+' and q[2] == v:
+        c = _int_literal(q[1], reads)
+    else:
+        return None
+    if c is None:
+        return None
+    return c if q[0] == '+' else -c
+
+
+def _always_int(v, defs, quads, operands):
+    """True si toda escritura de v deja un entero: un literal entero o v ± entero."""
+    for i in defs.get(v, ()):
+        q, reads = quads[i], operands[i][0]
+        if q[0] == 'assign':
+            if _int_literal(q[1], reads) is None:
+                return False
+        elif _induction_step(v, q, reads) is None:
+            return False
+    return True
+
+
+def strength_reduction(quads, exit_live=None, memo=None):
+    """
+    Reducción de fuerza dentro de los ciclos.
+
+    - `x * 2` pasa a `x + x` (exacto también con flotantes).
+    - Con una variable de inducción v (única escritura en el ciclo
+      `v = v ± c`, y entera en todo el programa) `t = v * k` se reemplaza por
+      un temporal s que vale v * k: se inicializa en el preencabezado y se le
+      suma c * k justo después del paso de v. Solo se aplica cuando t se puede
+      sustituir por s en sus lecturas (mismo bloque, sin el paso de v entre
+      medio); varias multiplicaciones por el mismo k comparten s.
+    """
+    cfg = build_cfg(quads, memo)
+    loops, inner, parent = _nesting(find_loops(quads, cfg), len(quads))
+    if not loops:
+        return quads, 0
+    operands = list(cfg['operands'])
+    block = _block_of(cfg, len(quads))
+    defs, uses = _sites(operands)
+    out = list(quads)
+    fresh = None
+    derived = {}  # (ciclo, v, k) -> s
+    before = {}   # índice -> cuádruplos a insertar antes
+    after = {}    # índice -> cuádruplos a insertar después
+    drop = set()
+    changes = 0
+    for i, q in enumerate(quads):
+        loop = inner[i]
+        if loop == -1 or q[0] != '*' or operands[i] is None:
+            continue
+        q = out[i]   # sus lecturas pueden haber cambiado a un s anterior
+        reads, d = operands[i]
+        k, v = _int_literal(q[2], reads), q[1]
+        if k is None:
+            k, v = _int_literal(q[1], reads), q[2]
+        if k is None or v not in reads:
+            continue
+        if k == 2:
+            out[i] = ('+', v, v, d)
+            operands[i] = ([v, v], d)
+            changes += 1
+            continue
+        if k in (0, 1) or not is_temp(d) or len(defs[d]) != 1:
+            continue
+        # el ciclo de v: el más interno que lo escribe
+        sites = defs.get(v, ())
+        while loop != -1 and not _written_in(sites, *loops[loop]):
+            loop = parent[loop]
+        if loop == -1:
+            continue
+        h, j = loops[loop]
+        steps = sites[bisect.bisect_left(sites, h):bisect.bisect_right(sites, j)]
+        if len(steps) != 1:
+            continue
+        p = steps[0]
+        c = _induction_step(v, out[p], operands[p][0])
+        reads_d = uses.get(d, ())
+        if c is None or not reads_d or not _local_uses(d, i, uses, block):
+            continue
+        if i < p <= reads_d[-1] or not _always_int(v, defs, out, operands):
+            continue
+        s = derived.get((loop, v, k))
+        if s is None:
+            if fresh is None:
+                fresh = _fresh_temps(quads)
+            s = derived[(loop, v, k)] = next(fresh)
+            before.setdefault(h, []).append(('*', v, k, s))
+            after.setdefault(p, []).append(('+', s, c * k, s))
+        for u in reads_d:
+            op, a1, a2, res = out[u]
+            out[u] = (op, s if a1 == d else a1, s if a2 == d else a2, res)
+            operands[u] = ([s if x == d else x for x in operands[u][0]], operands[u][1])
+        drop.add(i)
+        changes += 1
+    if not changes:
+        return quads, 0
+    result = []
+    for i, q in enumerate(out):
+        result.extend(before.get(i, ()))
+        if i not in drop:
+            result.append(q)
+        result.extend(after.get(i, ()))
+    return result, changes
+
+
+# --------------------------
+# Asignaciones redundantes
+# --------------------------
+def redundant_assign(quads, exit_live=None, memo=None):
+    out = [q for q in quads if not (q[0] == 'assign' and q[1] == q[3])]
+    return out, len(quads) - len(out)
+
+
+# dead_store va antes de copy_propagation, y ambos antes de las subexpresiones
+# comunes: así los pases siguientes recorren menos cuádruplos
+PASSES = (
+    ('constant_propagation', constant_propagation),
+    ('peephole', peephole),
+    ('dead_store', dead_store),
+    ('copy_propagation', copy_propagation),
+    ('redundant_assign', redundant_assign),
+    ('local_value_numbering', local_value_numbering),
+    ('global_cse', global_cse),
+    ('loop_invariant_motion', loop_invariant_motion),
+    ('strength_reduction', strength_reduction),
+)
+
+
+def carry_lines(original, lines, optimized):
+    """
+    Línea de código fuente de cada cuádruplo optimizado. Los pases no tocan
+    las tuplas que conservan, así que la mayoría se encuentra por identidad.
+    Una tupla reescrita se busca entre los cuádruplos originales que quedan
+    entre sus vecinos encontrados: primero uno que escriba el mismo nombre
+    (o salte a la misma etiqueta), después uno con el mismo operador; si no
+    hay, hereda la línea del cuádruplo anterior.
+    """
+    index = {id(q): i for i, q in enumerate(original)}
+    found = [index.get(id(q)) for q in optimized]
+    # índice original del siguiente cuádruplo encontrado por identidad
+    following = [len(original)] * (len(optimized) + 1)
+    for k in range(len(optimized) - 1, -1, -1):
+        following[k] = found[k] if found[k] is not None else following[k + 1]
+
+    out = []
+    line = None
+    previous = -1
+    for k, q in enumerate(optimized):
+        i = found[k]
+        if i is None:
+            window = original[previous + 1:following[k + 1]]
+            name = q[1] if q[0] == 'label' else q[3]
+            match = next((j for j, o in enumerate(window)
+                          if name is not None and (o[1] if o[0] == 'label' else o[3]) == name), None)
+            if match is None:
+                match = next((j for j, o in enumerate(window) if o[0] == q[0]), None)
+            if match is not None:
+                i = previous + 1 + match
+        if i is not None:
+            previous = max(previous, i)
+            if lines[i] is not None:
+                line = lines[i]
+        out.append(line)
+    return out
+
+
+def optimize_code(quadruples, passes=None, lines=None):
+    # las variables del programa siguen vivas al final aunque un pase borre
+    # su última lectura: se calculan una vez sobre la entrada
+    exit_live = _program_variables(quadruples)
+    quads = list(quadruples)
+    selected = [(name, fn) for name, fn in PASSES if passes is None or name in passes]
+    passes = []
+    memo = {}   # operandos por cuádruplo, compartidos entre pases
+
+    for rnd in range(1, MAX_ROUNDS + 1):
+        applied = []
+        for name, fn in selected:
+            before = len(quads)
+            quads, changes = fn(quads, exit_live, memo)
+            applied.append({'name': name, 'round': rnd, 'before': before,
+                            'after': len(quads), 'removed': before - len(quads),
+                            'changes': changes})
+        changed = any(p['changes'] for p in applied)
+        if changed or rnd == 1:
+            passes.extend(applied)
+        if not changed:
+            break
 
     # Calcular reducción
     original = len(quadruples)
-    final = len(optimized)
+    final = len(quads)
     reduction = round(100.0 * (original - final) / original, 2) if original > 0 else 0.0
 
-    return {'optimized': optimized, 'reduction': reduction}
+    result = {'optimized': quads, 'reduction': reduction, 'passes': passes}
+    if lines is not None:
+        # quadruples sigue vivo: los id() de sus tuplas no se reutilizan
+        result['lines'] = carry_lines(quadruples, lines, quads)
+    return result
+
+
+# Prueba rápida
+if __name__ == "__main__":
+    from parser import parse
+    from intermediate import generate_intermediate_code
+
+    src = "int x = 2 * 3;\nint y = x + 1;\nwhile (y < 10) {\n  y = y + x;\n}\nprint(y);"
+    quads = generate_intermediate_code(parse(src)['ast'])['quadruples']
+    result = optimize_code(quads)
+    for q in result['optimized']:
+        print(q)
+    print(f"reducción: {result['reduction']}%")
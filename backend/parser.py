@@ -4,7 +4,10 @@ Parser simple con PLY.
 
 Secciones principales:
 1. Representación de nodos:
-   - node(type_, **kwargs): Crea nodos serializables para el AST.
+   - Clases con __slots__ de ast_nodes.py (Program, Decl, BinOp, ...); se
+     serializan a la forma JSON de siempre solo cuando se piden.
+
+   - count_nodes(ast): Cuenta los nodos del AST.
 
 2. Precedencias:
    - Tupla `precedence`: Define la precedencia de operadores como `+`, `*`, `AND`, etc.
@@ -15,17 +18,19 @@ Secciones principales:
    - p_stmt(p): Define las sentencias válidas (declaraciones, asignaciones, etc.).
 """
 
+import copy
+import importlib
+import threading
+
 import ply.yacc as yacc
-from lexer import tokens, build as _build_lexer
+from lexer import tokens, scan, TokenStream
+from ast_nodes import (Node, Program, Decl, Assign, Print, If, While, BinOp, UnOp,
+                       Number, FNumber, Bool, Id, json_default)
 import json
 
 # --------------------------------------
-#   Representación de nodos serializables
+#   Representación de nodos (ver ast_nodes.py)
 # --------------------------------------
-def node(type_, **kwargs):
-    d = {'node': type_}
-    d.update(kwargs)
-    return d
 
 # --------------------------------------
 #   Precedencias
@@ -46,11 +51,13 @@ precedence = (
 
 def p_program(p):
     "program : stmt_list"
-    p[0] = node('program', stmts=p[1])
+    p[0] = Program(p[1])
 
 def p_stmt_list_multi(p):
     "stmt_list : stmt_list stmt"
-    p[0] = p[1] + [p[2]]
+    # agregar in situ: copiar la lista en cada sentencia sería O(N²)
+    p[1].append(p[2])
+    p[0] = p[1]
 
 def p_stmt_list_single(p):
     "stmt_list : stmt"
@@ -66,23 +73,23 @@ def p_stmt(p):
 
 def p_decl_stmt(p):
     "decl_stmt : INT ID ASSIGN expr SEMICOLON"
-    p[0] = node('decl', type='int', id=p[2], expr=p[4])
+    p[0] = Decl('int', p[2], p[4], p.lineno(1))
 
 def p_assign_stmt(p):
     "assign_stmt : ID ASSIGN expr SEMICOLON"
-    p[0] = node('assign', id=p[1], expr=p[3])
+    p[0] = Assign(p[1], p[3], p.lineno(1))
 
 def p_print_stmt(p):
     "print_stmt : PRINT LPAREN expr RPAREN SEMICOLON"
-    p[0] = node('print', expr=p[3])
+    p[0] = Print(p[3], p.lineno(1))
 
 def p_if_stmt(p):
     "if_stmt : IF LPAREN expr RPAREN LBRACE stmt_list RBRACE"
-    p[0] = node('if', cond=p[3], then=p[6], otherwise=[])
+    p[0] = If(p[3], p[6], [], p.lineno(1))
 
 def p_while_stmt(p):
     "while_stmt : WHILE LPAREN expr RPAREN LBRACE stmt_list RBRACE"
-    p[0] = node('while', cond=p[3], body=p[6])
+    p[0] = While(p[3], p[6], p.lineno(1))
 
 def p_expr_binop(p):
     """expr : expr PLUS expr
@@ -98,11 +105,11 @@ def p_expr_binop(p):
             | expr AND expr
             | expr OR expr
     """
-    p[0] = node('binop', op=p[2], left=p[1], right=p[3])
+    p[0] = BinOp(p[2], p[1], p[3])
 
 def p_expr_unop(p):
     "expr : NOT expr"
-    p[0] = node('unop', op=p[1], expr=p[2])
+    p[0] = UnOp(p[1], p[2])
 
 def p_expr_group(p):
     "expr : LPAREN expr RPAREN"
@@ -110,20 +117,20 @@ def p_expr_group(p):
 
 def p_expr_number(p):
     "expr : NUMBER"
-    p[0] = node('number', value=p[1])
+    p[0] = Number(p[1])
 
 def p_expr_fnumber(p):
     "expr : FNUMBER"
-    p[0] = node('fnumber', value=p[1])
+    p[0] = FNumber(p[1])
 
 def p_expr_truefalse(p):
     """expr : TRUE
             | FALSE"""
-    p[0] = node('bool', value=(p.slice[1].type == "TRUE"))
+    p[0] = Bool(p.slice[1].type == "TRUE")
 
 def p_expr_id(p):
     "expr : ID"
-    p[0] = node('id', name=p[1])
+    p[0] = Id(p[1])
 
 def p_error(p):
     if p:
@@ -135,23 +142,75 @@ def p_error(p):
 #   Construcción única del parser
 # --------------------------------------
 
+# Las tablas LALR se generan por adelantado en parsetab.py (python
+# gen_tables.py) y se cargan al importar el módulo. LRParser guarda el estado del
+# análisis (pilas, token actual) en la instancia, así que cada hilo usa su
+# propia copia que comparte las tablas (solo lectura).
+PARSETAB = 'parsetab'
 _parser = None
+_parser_lock = threading.Lock()
+_local = threading.local()
 
 def _build_parser():
     global _parser
     if _parser is None:
-        _build_lexer()     # Asegurar lexer primero
-        _parser = yacc.yacc(debug=False)
+        with _parser_lock:
+            if _parser is None:
+                # PLY compara _lr_signature de parsetab con la gramática y
+                # solo reconstruye si difieren; nunca escribe en producción
+                _parser = yacc.yacc(debug=False, tabmodule=PARSETAB, write_tables=False)
     return _parser
 
+def tables_up_to_date():
+    """True si parsetab.py corresponde a la gramática de este módulo."""
+    try:
+        tab = importlib.import_module(PARSETAB)
+    except ImportError:
+        return False
+    pinfo = yacc.ParserReflect(globals())
+    pinfo.get_all()
+    return (getattr(tab, '_tabversion', None) == yacc.__tabversion__
+            and getattr(tab, '_lr_signature', None) == pinfo.signature())
+
+def write_tables(outputdir):
+    """Regenera parsetab.py (ver gen_tables.py)."""
+    yacc.yacc(debug=False, tabmodule=PARSETAB, outputdir=outputdir, write_tables=True)
+
+def _thread_parser():
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = _local.parser = copy.copy(_build_parser())
+    return parser
+
+# construir (o cargar) el parser al importar: el primer request no paga las tablas
+_build_parser()
+
 # --------------------------------------
 #   API pública
 # --------------------------------------
 
-def parse(source_code):
+def count_nodes(ast):
+    """Cantidad de nodos del AST (recorrido con pila, sin recursión)."""
+    count = 0
+    stack = [ast]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Node):
+            count += 1
+            stack.extend(item.children())
+    return count
+
+def parse(source_code, lexed=None):
+    """
+    Analiza source_code. Si se pasa lexed (tokens de lexer.tokenize o un
+    TokenArrays de lexer.scan), se reutilizan en vez de volver a lexear el
+    código.
+    """
     try:
-        parser = _build_parser()
-        ast = parser.parse(source_code)
+        parser = _thread_parser()
+        if lexed is None:
+            lexed = scan(source_code)
+        ast = parser.parse(lexer=TokenStream(lexed))
         return {'success': True, 'ast': ast}
     except Exception as e:
         return {'success': False, 'error': str(e)}
@@ -169,4 +228,4 @@ if __name__ == "__main__":
     }
     """
     res = parse(src)
-    print(json.dumps(res, indent=2))
+    print(json.dumps(res, indent=2, default=json_default))
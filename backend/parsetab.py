@@ -0,0 +1,62 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'leftORleftANDleftEQNEnonassocGTLTGELEleftPLUSMINUSleftTIMESDIVIDErightNOTAND ASSIGN BOOL COMMA DIVIDE ELSE EQ FALSE FLOAT FNUMBER GE GT ID IF INT LBRACE LE LPAREN LT MINUS NE NOT NUMBER OR PLUS PRINT RBRACE RPAREN SEMICOLON TIMES TRUE WHILEprogram : stmt_liststmt_list : stmt_list stmtstmt_list : stmtstmt : decl_stmt\n            | assign_stmt\n            | print_stmt\n            | if_stmt\n            | while_stmtdecl_stmt : INT ID ASSIGN expr SEMICOLONassign_stmt : ID ASSIGN expr SEMICOLONprint_stmt : PRINT LPAREN expr RPAREN SEMICOLONif_stmt : IF LPAREN expr RPAREN LBRACE stmt_list RBRACEwhile_stmt : WHILE LPAREN expr RPAREN LBRACE stmt_list RBRACEexpr : expr PLUS expr\n            | expr MINUS expr\n            | expr TIMES expr\n            | expr DIVIDE expr\n            | expr GT expr\n            | expr LT expr\n            | expr GE expr\n            | expr LE expr\n            | expr EQ expr\n            | expr NE expr\n            | expr AND expr\n            | expr OR expr\n    expr : NOT exprexpr : LPAREN expr RPARENexpr : NUMBERexpr : FNUMBERexpr : TRUE\n            | FALSEexpr : ID'
+    
+_lr_action_items = {'INT':([0,2,3,4,5,6,7,8,14,33,51,65,66,67,68,69,70,71,],[9,9,-3,-4,-5,-6,-7,-8,-2,-10,-9,-11,9,9,9,9,-12,-13,]),'ID':([0,2,3,4,5,6,7,8,9,14,16,17,18,19,20,23,24,33,34,35,36,37,38,39,40,41,42,43,44,45,51,65,66,67,68,69,70,71,],[10,10,-3,-4,-5,-6,-7,-8,15,-2,21,21,21,21,21,21,21,-10,21,21,21,21,21,21,21,21,21,21,21,21,-9,-11,10,10,10,10,-12,-13,]),'PRINT':([0,2,3,4,5,6,7,8,14,33,51,65,66,67,68,69,70,71,],[11,11,-3,-4,-5,-6,-7,-8,-2,-10,-9,-11,11,11,11,11,-12,-13,]),'IF':([0,2,3,4,5,6,7,8,14,33,51,65,66,67,68,69,70,71,],[12,12,-3,-4,-5,-6,-7,-8,-2,-10,-9,-11,12,12,12,12,-12,-13,]),'WHILE':([0,2,3,4,5,6,7,8,14,33,51,65,66,67,68,69,70,71,],[13,13,-3,-4,-5,-6,-7,-8,-2,-10,-9,-11,13,13,13,13,-12,-13,]),'$end':([1,2,3,4,5,6,7,8,14,33,51,65,70,71,],[0,-1,-3,-4,-5,-6,-7,-8,-2,-10,-9,-11,-12,-13,]),'RBRACE':([3,4,5,6,7,8,14,33,51,65,68,69,70,71,],[-3,-4,-5,-6,-7,-8,-2,-10,-9,-11,70,71,-12,-13,]),'ASSIGN':([10,15,],[16,20,]),'LPAREN':([11,12,13,16,17,18,19,20,23,24,34,35,36,37,38,39,40,41,42,43,44,45,],[17,18,19,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,]),'NOT':([16,17,18,19,20,23,24,34,35,36,37,38,39,40,41,42,43,44,45,],[23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,]),'NUMBER':([16,17,18,19,20,23,24,34,35,36,37,38,39,40,41,42,43,44,45,],[25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,]),'FNUMBER':([16,17,18,19,20,23,24,34,35,36,37,38,39,40,41,42,43,44,45,],[26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,]),'TRUE':([16,17,18,19,20,23,24,34,35,36,37,38,39,40,41,42,43,44,45,],[27,27,27,27,27,27,27,27,27,27,27,27,27,27,27,27,27,27,27,]),'FALSE':([16,17,18,19,20,23,24,34,35,36,37,38,39,40,41,42,43,44,45,],[28,28,28,28,28,28,28,28,28,28,28,28,28,28,28,28,28,28,28,]),'SEMICOLON':([21,22,25,26,27,28,32,46,48,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,33,-28,-29,-30,-31,51,-26,65,-14,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-27,]),'PLUS':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,34,-28,-29,-30,-31,34,34,34,34,-26,34,-14,-15,-16,-17,34,34,34,34,34,34,34,34,-27,]),'MINUS':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,35,-28,-29,-30,-31,35,35,35,35,-26,35,-14,-15,-16,-17,35,35,35,35,35,35,35,35,-27,]),'TIMES':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,36,-28,-29,-30,-31,36,36,36,36,-26,36,36,36,-16,-17,36,36,36,36,36,36,36,36,-27,]),'DIVIDE':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,37,-28,-29,-30,-31,37,37,37,37,-26,37,37,37,-16,-17,37,37,37,37,37,37,37,37,-27,]),'GT':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,38,-28,-29,-30,-31,38,38,38,38,-26,38,-14,-15,-16,-17,None,None,None,None,38,38,38,38,-27,]),'LT':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,39,-28,-29,-30,-31,39,39,39,39,-26,39,-14,-15,-16,-17,None,None,None,None,39,39,39,39,-27,]),'GE':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,40,-28,-29,-30,-31,40,40,40,40,-26,40,-14,-15,-16,-17,None,None,None,None,40,40,40,40,-27,]),'LE':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,41,-28,-29,-30,-31,41,41,41,41,-26,41,-14,-15,-16,-17,None,None,None,None,41,41,41,41,-27,]),'EQ':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,42,-28,-29,-30,-31,42,42,42,42,-26,42,-14,-15,-16,-17,-18,-19,-20,-21,-22,-23,42,42,-27,]),'NE':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,43,-28,-29,-30,-31,43,43,43,43,-26,43,-14,-15,-16,-17,-18,-19,-20,-21,-22,-23,43,43,-27,]),'AND':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,44,-28,-29,-30,-31,44,44,44,44,-26,44,-14,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,44,-27,]),'OR':([21,22,25,26,27,28,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,45,-28,-29,-30,-31,45,45,45,45,-26,45,-14,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-27,]),'RPAREN':([21,25,26,27,28,29,30,31,46,47,52,53,54,55,56,57,58,59,60,61,62,63,64,],[-32,-28,-29,-30,-31,48,49,50,-26,64,-14,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-27,]),'LBRACE':([49,50,],[66,67,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'program':([0,],[1,]),'stmt_list':([0,66,67,],[2,68,69,]),'stmt':([0,2,66,67,68,69,],[3,14,3,3,14,14,]),'decl_stmt':([0,2,66,67,68,69,],[4,4,4,4,4,4,]),'assign_stmt':([0,2,66,67,68,69,],[5,5,5,5,5,5,]),'print_stmt':([0,2,66,67,68,69,],[6,6,6,6,6,6,]),'if_stmt':([0,2,66,67,68,69,],[7,7,7,7,7,7,]),'while_stmt':([0,2,66,67,68,69,],[8,8,8,8,8,8,]),'expr':([16,17,18,19,20,23,24,34,35,36,37,38,39,40,41,42,43,44,45,],[22,29,30,31,32,46,47,52,53,54,55,56,57,58,59,60,61,62,63,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> program","S'",1,None,None,None),
+  ('program -> stmt_list','program',1,'p_program','parser.py',52),
+  ('stmt_list -> stmt_list stmt','stmt_list',2,'p_stmt_list_multi','parser.py',56),
+  ('stmt_list -> stmt','stmt_list',1,'p_stmt_list_single','parser.py',60),
+  ('stmt -> decl_stmt','stmt',1,'p_stmt','parser.py',64),
+  ('stmt -> assign_stmt','stmt',1,'p_stmt','parser.py',65),
+  ('stmt -> print_stmt','stmt',1,'p_stmt','parser.py',66),
+  ('stmt -> if_stmt','stmt',1,'p_stmt','parser.py',67),
+  ('stmt -> while_stmt','stmt',1,'p_stmt','parser.py',68),
+  ('decl_stmt -> INT ID ASSIGN expr SEMICOLON','decl_stmt',5,'p_decl_stmt','parser.py',72),
+  ('assign_stmt -> ID ASSIGN expr SEMICOLON','assign_stmt',4,'p_assign_stmt','parser.py',76),
+  ('print_stmt -> PRINT LPAREN expr RPAREN SEMICOLON','print_stmt',5,'p_print_stmt','parser.py',80),
+  ('if_stmt -> IF LPAREN expr RPAREN LBRACE stmt_list RBRACE','if_stmt',7,'p_if_stmt','parser.py',84),
+  ('while_stmt -> WHILE LPAREN expr RPAREN LBRACE stmt_list RBRACE','while_stmt',7,'p_while_stmt','parser.py',88),
+  ('expr -> expr PLUS expr','expr',3,'p_expr_binop','parser.py',92),
+  ('expr -> expr MINUS expr','expr',3,'p_expr_binop','parser.py',93),
+  ('expr -> expr TIMES expr','expr',3,'p_expr_binop','parser.py',94),
+  ('expr -> expr DIVIDE expr','expr',3,'p_expr_binop','parser.py',95),
+  ('expr -> expr GT expr','expr',3,'p_expr_binop','parser.py',96),
+  ('expr -> expr LT expr','expr',3,'p_expr_binop','parser.py',97),
+  ('expr -> expr GE expr','expr',3,'p_expr_binop','parser.py',98),
+  ('expr -> expr LE expr','expr',3,'p_expr_binop','parser.py',99),
+  ('expr -> expr EQ expr','expr',3,'p_expr_binop','parser.py',100),
+  ('expr -> expr NE expr','expr',3,'p_expr_binop','parser.py',101),
+  ('expr -> expr AND expr','expr',3,'p_expr_binop','parser.py',102),
+  ('expr -> expr OR expr','expr',3,'p_expr_binop','parser.py',103),
+  ('expr -> NOT expr','expr',2,'p_expr_unop','parser.py',108),
+  ('expr -> LPAREN expr RPAREN','expr',3,'p_expr_group','parser.py',112),
+  ('expr -> NUMBER','expr',1,'p_expr_number','parser.py',116),
+  ('expr -> FNUMBER','expr',1,'p_expr_fnumber','parser.py',120),
+  ('expr -> TRUE','expr',1,'p_expr_truefalse','parser.py',124),
+  ('expr -> FALSE','expr',1,'p_expr_truefalse','parser.py',125),
+  ('expr -> ID','expr',1,'p_expr_id','parser.py',129),
+]
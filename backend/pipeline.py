@@ -0,0 +1,141 @@
+# pipeline.py
+"""
+Pipeline del compilador (sin Flask).
+
+Secciones principales:
+1. compile_source(source_code, lexer_backend, upto):
+   - Corre léxico → sintáctico → semántico → intermedio → optimización → codegen,
+     o solo hasta la fase upto (ver COMPILE_PHASES) si no se necesitan las demás.
+   - lexer_backend elige el escáner (ver lexer.BACKENDS); ambos dan los
+     mismos tokens, así que el resultado no depende de cuál se use.
+   - Salida: (result, stats). result tiene la misma forma que la respuesta de
+     /compile sin ejecución ni métricas; stats trae datos de la corrida que no
+     van en result: tiempo de lexeo y 'phase_times_ns' (perf_counter_ns por fase).
+   - Se detiene en la primera fase con error y lo reporta en 'phase_error'.
+   - La línea de código fuente de cada sentencia pasa del AST a los
+     cuádruplos y de ahí al 'debug' del programa (ver profiler.py).
+
+2. run_program(result, max_steps, timeout, tier, max_output):
+   - Ejecuta el programa generado por compile_source en la VM ('vm') o con
+     el JIT ('jit'); EXECUTION_TIERS mapea cada nivel a su función.
+   - STREAM_TIERS tiene las variantes que entregan la salida por partes
+     mientras el programa corre (ver codegen.stream).
+
+El resultado de compile_source depende solo del código fuente, por eso puede
+guardarse en la caché de compilación (ver cache.py).
+"""
+import time
+
+from lexer import BACKENDS as LEXER_BACKENDS
+from parser import parse as parser_parse, count_nodes
+from semantic import analyze_semantics
+from intermediate import generate_intermediate_code
+from optimizer import optimize_code
+from codegen import generate_code, execute_code, stream_code
+from jit import execute_jit, stream_jit
+
+EXECUTION_TIERS = {'vm': execute_code, 'jit': execute_jit}
+STREAM_TIERS = {'vm': stream_code, 'jit': stream_jit}
+
+# fases de compile_source, en orden; 'execution' (run_program) va después
+COMPILE_PHASES = ('lexical', 'syntax', 'semantic', 'intermediate', 'optimization', 'codegen')
+PHASES = COMPILE_PHASES + ('execution',)
+
+
+def compile_source(source_code, lexer_backend='regex', upto='codegen'):
+    last = COMPILE_PHASES.index(upto)
+    result = {'success': True, 'phases': {}}
+    times = {}
+    stats = {'phase_times_ns': times}
+    clock = time.perf_counter_ns
+
+    # ---- FASE 1: LÉXICO ----
+    # Un solo pase: el parser reutiliza estos mismos tokens
+    start = clock()
+    lexed = LEXER_BACKENDS[lexer_backend](source_code)
+    stats['lexing_time'] = (clock() - start) / 1e6
+    tokens = lexed.dicts()
+    times['lexical'] = clock() - start
+    result['phases']['lexical'] = {
+        'success': True,
+        'tokens': tokens,
+        'count': len(tokens),
+        'errors': lexed.errors
+    }
+    if last == 0:
+        return result, stats
+
+    # ---- FASE 2: SINTÁCTICO ----
+    start = clock()
+    parse_result = parser_parse(source_code, lexed=lexed)
+    times['syntax'] = clock() - start
+    if not parse_result['success']:
+        result['success'] = False
+        result['error'] = parse_result['error']
+        result['phase_error'] = 'syntax'
+        return result, stats
+
+    result['phases']['syntax'] = {
+        'success': True,
+        'ast': parse_result['ast'],
+        'node_count': count_nodes(parse_result['ast'])
+    }
+    if last == 1:
+        return result, stats
+
+    # ---- FASE 3: SEMÁNTICO ----
+    start = clock()
+    semantic_result = analyze_semantics(parse_result['ast'])
+    times['semantic'] = clock() - start
+    if not semantic_result['success']:
+        result['success'] = False
+        result['error'] = '; '.join(semantic_result['errors'])
+        result['phase_error'] = 'semantic'
+        result['phases']['semantic'] = semantic_result
+        return result, stats
+
+    result['phases']['semantic'] = semantic_result
+    if last == 2:
+        return result, stats
+
+    # ---- FASE 4: INTERMEDIO ----
+    start = clock()
+    intermediate_result = generate_intermediate_code(parse_result['ast'])
+    times['intermediate'] = clock() - start
+    if not intermediate_result['success']:
+        result['success'] = False
+        result['error'] = intermediate_result.get('error')
+        result['phase_error'] = 'intermediate'
+        return result, stats
+
+    result['phases']['intermediate'] = intermediate_result
+    if last == 3:
+        return result, stats
+
+    # ---- FASE 5: OPTIMIZACIÓN ----
+    start = clock()
+    optimization_result = optimize_code(intermediate_result['quadruples'],
+                                        lines=intermediate_result['lines'])
+    times['optimization'] = clock() - start
+    result['phases']['optimization'] = optimization_result
+    if last == 4:
+        return result, stats
+
+    # ---- FASE 6: CODEGEN ----
+    start = clock()
+    codegen_result = generate_code(optimization_result['optimized'], optimization_result['lines'])
+    times['codegen'] = clock() - start
+    if not codegen_result['success']:
+        result['success'] = False
+        result['error'] = codegen_result.get('error')
+        result['phase_error'] = 'codegen'
+        return result, stats
+
+    result['phases']['codegen'] = codegen_result
+    return result, stats
+
+
+def run_program(result, max_steps=None, timeout=None, tier='vm', max_output=None):
+    """Fase 7: ejecuta el código generado por compile_source."""
+    return EXECUTION_TIERS[tier](result['phases']['codegen']['code'], max_steps=max_steps, timeout=timeout,
+                                 max_output=max_output)
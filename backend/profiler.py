@@ -0,0 +1,220 @@
+# profiler.py
+"""
+Perfilado de la ejecución en la VM: dónde se van los pasos de un programa.
+
+Secciones principales:
+1. Profile:
+   - Colector que execute_code(..., profile=...) llama en cada salto tomado
+     con el tramo lineal recién ejecutado (inicio, instrucciones, destino).
+   - Solo guarda un contador y un tiempo por tramo distinto: un ciclo que da
+     un millón de vueltas ocupa una entrada, no un millón.
+
+2. Profile.report(program):
+   - A partir de los tramos calcula lo que se ejecutó cada instrucción (un
+     arreglo de diferencias) y lo reparte con program['debug'] (ver
+     codegen.assemble) entre cuádruplos, líneas de código fuente, bloques
+     básicos y ciclos, y cuenta cuántas veces se completó cada
+     superinstrucción (ver codegen.fuse).
+   - Los ciclos son los saltos hacia atrás; sus vueltas son las veces que se
+     tomó alguno de ellos.
+   - 'collapsed' es el mismo perfil como pilas colapsadas ("marco;marco N"),
+     el formato de entrada de flamegraph.pl y speedscope: un marco por ciclo
+     que contiene a la instrucción y la línea como hoja; N son instrucciones
+     ejecutadas, así el perfil es reproducible.
+
+3. profile_execution(code, max_steps=None, timeout=None, max_output=None):
+   - Como codegen.execute_code, más 'profile' con el reporte.
+
+Sin colector la VM no cambia: el costo de tener el perfilador es una
+comparación con None en cada punto de control (cada CHECK_INTERVAL pasos).
+"""
+import time
+
+from codegen import assemble, base_opcode, execute_code, JUMP_OPS, OPNAMES, SUPERINSTRUCTIONS
+
+
+class Profile:
+    """Tramos ejecutados: (inicio, instrucciones, destino) -> [veces, ns]."""
+
+    __slots__ = ('segments', 'clock', 'last')
+
+    def __init__(self, clock=time.perf_counter_ns):
+        self.segments = {}
+        self.clock = clock
+        self.last = None
+
+    def begin(self):
+        self.last = self.clock()
+
+    def record(self, start, length, target):
+        # destino None: el tramo terminó al caer del final del programa
+        now = self.clock()
+        key = (start, length, target)
+        segment = self.segments.get(key)
+        if segment is None:
+            self.segments[key] = [1, now - self.last]
+        else:
+            segment[0] += 1
+            segment[1] += now - self.last
+        self.last = now
+
+    def report(self, program):
+        """Perfil compacto del programa (ver la docstring del módulo)."""
+        flat = program['instructions']
+        n = len(flat) // 4
+        debug = program.get('debug') or {}
+        quad_of = debug.get('quads') or list(range(n))
+        line_of = debug.get('lines') or [None] * n
+        names = {}
+        for label, pc in sorted(debug.get('labels', {}).items()):
+            names.setdefault(pc, label)
+
+        # veces y tiempo de cada instrucción; el tiempo de un tramo se reparte
+        # por igual entre sus instrucciones
+        count_diff = [0] * (n + 1)
+        time_diff = [0.0] * (n + 1)
+        taken = {}
+        total_ns = 0
+        for (start, length, target), (times, ns) in self.segments.items():
+            count_diff[start] += times
+            count_diff[start + length] -= times
+            time_diff[start] += ns / length
+            time_diff[start + length] -= ns / length
+            total_ns += ns
+            if target is not None:
+                jump = (start + length - 1, target)
+                taken[jump] = taken.get(jump, 0) + times
+        counts = []
+        costs = []
+        running = 0
+        rate = 0.0
+        for i in range(n):
+            running += count_diff[i]
+            rate += time_diff[i]
+            counts.append(running)
+            costs.append(rate)
+
+        by_line = {}
+        for i in range(n):
+            if counts[i]:
+                entry = by_line.setdefault(line_of[i], [0, 0, 0.0])
+                entry[0] = max(entry[0], counts[i])
+                entry[1] += counts[i]
+                entry[2] += costs[i]
+
+        # bloques básicos: empiezan al inicio, en un destino o tras un salto
+        jumps = [i for i in range(n) if OPNAMES[base_opcode(flat[4 * i])] in JUMP_OPS]
+        leaders = {0} | {i + 1 for i in jumps} | {flat[4 * i + 3] for i in jumps}
+        leaders = sorted(pc for pc in leaders if pc < n)
+        blocks = []
+        for start, end in zip(leaders, leaders[1:] + [n]):
+            if counts[start]:
+                blocks.append({
+                    'start': start,
+                    'end': end - 1,
+                    'label': names.get(start),
+                    'line': line_of[start],
+                    'count': counts[start],
+                    'time_ns': round(sum(costs[start:end])),
+                })
+
+        # ciclos: saltos hacia atrás, agrupados por destino
+        loops = {}
+        for i in jumps:
+            target = flat[4 * i + 3]
+            if target <= i:
+                loop = loops.setdefault(target, {
+                    'label': names.get(target),
+                    'line': line_of[target],
+                    'start': target,
+                    'end': i,
+                    'iterations': 0,
+                })
+                loop['end'] = max(loop['end'], i)
+                loop['iterations'] += taken.get((i, target), 0)
+        loops = [loops[pc] for pc in sorted(loops)]
+
+        # superinstrucciones: una instrucción corre despachada o dentro de la
+        # superinstrucción anterior; la superinstrucción se completa cuando su
+        # primera instrucción no salta
+        fired = {}
+        inline = 0
+        for i in range(n):
+            op = flat[4 * i]
+            dispatched = counts[i] - inline
+            inline = 0
+            if op in SUPERINSTRUCTIONS:
+                name, first, _ = SUPERINSTRUCTIONS[op]
+                inline = dispatched
+                if OPNAMES[first] in JUMP_OPS:
+                    inline -= taken.get((i, flat[4 * i + 3]), 0)
+                if inline:
+                    fired[name] = fired.get(name, 0) + inline
+
+        return {
+            'instructions': sum(counts),
+            'time_ns': total_ns,
+            'quads': [[quad_of[i], counts[i]] for i in range(n) if counts[i]],
+            'lines': [{'line': line, 'count': c, 'instructions': total, 'time_ns': round(ns)}
+                      for line, (c, total, ns) in sorted(by_line.items(),
+                                                        key=lambda kv: (kv[0] is None, kv[0] or 0))],
+            'blocks': blocks,
+            'loops': loops,
+            'superinstructions': fired,
+            'collapsed': collapsed_stacks(counts, line_of, loops),
+        }
+
+
+def _line_frame(line):
+    return 'sin línea' if line is None else f'línea {line}'
+
+
+def collapsed_stacks(counts, line_of, loops):
+    """Pilas colapsadas: programa;while L0 (línea 3);línea 4 N."""
+    frames = [(loop['start'], loop['end'],
+               f"while {loop['label'] or loop['start']} ({_line_frame(loop['line'])})")
+              for loop in loops]
+    stacks = {}
+    for i, c in enumerate(counts):
+        if not c:
+            continue
+        path = ['programa']
+        path.extend(name for start, end, name in frames if start <= i <= end)
+        path.append(_line_frame(line_of[i]))
+        stack = ';'.join(path)
+        stacks[stack] = stacks.get(stack, 0) + c
+    return ''.join(f'{stack} {c}\n' for stack, c in sorted(stacks.items()))
+
+
+def profile_execution(code, max_steps=None, timeout=None, max_output=None):
+    """Ejecuta en la VM con un Profile y agrega su reporte como 'profile'."""
+    program = assemble(code) if isinstance(code, list) else code
+    profile = Profile()
+    result = execute_code(program, max_steps, timeout, profile=profile, max_output=max_output)
+    if result['success']:
+        result['profile'] = profile.report(program)
+    return result
+
+
+# Prueba rápida
+if __name__ == "__main__":
+    from pipeline import compile_source
+
+    source = """int i = 0;
+int s = 0;
+while (i < 4) {
+  int j = 0;
+  while (j < i) {
+    s = s + j;
+    j = j + 1;
+  }
+  i = i + 1;
+}
+print(s);"""
+    compiled, _ = compile_source(source)
+    result = profile_execution(compiled['phases']['codegen']['code'])
+    report = result['profile']
+    print(result['output'], result['steps_executed'], report['instructions'])
+    for loop in report['loops']:
+        print(loop)
+    print(report['collapsed'])
@@ -9,11 +9,17 @@ Secciones principales:
    - Propósito: Verificar tipos y construir la tabla de símbolos.
 
 2. Función visit(node):
-   - Recorre el AST y realiza verificaciones semánticas.
+   - Recorre el AST y realiza verificaciones semánticas; despacha por
+     node.kind (ver ast_nodes.py).
 
 3. eval_constant(expr):
    - Evalúa expresiones constantes para optimización.
+
+Ambos recorridos usan una pila explícita en vez de recursión.
 """
+from ast_nodes import (Node, PROGRAM, DECL, ASSIGN, PRINT, IF, WHILE, BINOP, UNOP,
+                       NUMBER, FNUMBER, BOOL, ID, from_dict)
+
 
 def analyze_semantics(ast):
     errors = []
@@ -22,122 +28,134 @@ def analyze_semantics(ast):
     # -----------------------------
     # Función principal de visita
     # -----------------------------
-    def visit(node):
-        if not isinstance(node, dict):
-            return
-
-        ntype = node.get('node')
-
-        # ---- PROGRAM ----
-        if ntype == 'program':
-            for s in node.get('stmts', []):
-                visit(s)
-
-        # ---- DECLARACIÓN ----
-        elif ntype == 'decl':
-            name = node.get('id')
-            if name in symbols:
-                errors.append(f"Variable '{name}' ya declarada")
-            else:
-                expr = node.get('expr')
-                val = eval_constant(expr)
-                symbols[name] = {
-                    'type': node.get('type', 'int'),
-                    'value': val
-                }
-            visit(node.get('expr'))
-
-        # ---- ASIGNACIÓN ----
-        elif ntype == 'assign':
-            name = node.get('id')
-            if name not in symbols:
-                errors.append(f"Variable '{name}' no declarada")
-                symbols[name] = {'type': 'int', 'value': None}
-
-            visit(node.get('expr'))
-            symbols[name]['value'] = None  # valor dinámico
-
-        # ---- PRINT ----
-        elif ntype == 'print':
-            visit(node.get('expr'))
-
-        # ---- IF ----
-        elif ntype == 'if':
-            visit(node.get('cond'))
-            for s in node.get('then', []):
-                visit(s)
-            for s in node.get('otherwise', []):
-                visit(s)
-
-        # ---- WHILE ----
-        elif ntype == 'while':
-            visit(node.get('cond'))
-            for s in node.get('body', []):
-                visit(s)
-
-        # ---- OPERADORES ----
-        elif ntype == 'binop':
-            visit(node.get('left'))
-            visit(node.get('right'))
-
-        elif ntype == 'unop':
-            visit(node.get('expr'))
-
-        # ---- IDENTIFICADOR ----
-        elif ntype == 'id':
-            name = node.get('name')
-            if name and name not in symbols:
-                errors.append(f"Variable '{name}' no declarada")
-
-        # Literales (number, fnumber, bool) → sin análisis
-        return
+    def visit(root):
+        # pila explícita: árboles muy profundos no llegan al límite de recursión.
+        # Los hijos se apilan en orden inverso para visitarlos en orden.
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, Node):
+                continue
+
+            kind = node.kind
+
+            # ---- PROGRAM ----
+            if kind == PROGRAM:
+                stack.extend(reversed(node.stmts))
+
+            # ---- DECLARACIÓN ----
+            elif kind == DECL:
+                name = node.id
+                if name in symbols:
+                    errors.append(f"Variable '{name}' ya declarada")
+                else:
+                    val = eval_constant(node.expr)
+                    symbols[name] = {
+                        'type': node.type or 'int',
+                        'value': val
+                    }
+                stack.append(node.expr)
+
+            # ---- ASIGNACIÓN ----
+            elif kind == ASSIGN:
+                name = node.id
+                if name not in symbols:
+                    errors.append(f"Variable '{name}' no declarada")
+                    symbols[name] = {'type': 'int', 'value': None}
+
+                symbols[name]['value'] = None  # valor dinámico
+                stack.append(node.expr)
+
+            # ---- PRINT ----
+            elif kind == PRINT:
+                stack.append(node.expr)
+
+            # ---- IF ----
+            elif kind == IF:
+                stack.extend(reversed(node.otherwise))
+                stack.extend(reversed(node.then))
+                stack.append(node.cond)
+
+            # ---- WHILE ----
+            elif kind == WHILE:
+                stack.extend(reversed(node.body))
+                stack.append(node.cond)
+
+            # ---- OPERADORES ----
+            elif kind == BINOP:
+                stack.append(node.right)
+                stack.append(node.left)
+
+            elif kind == UNOP:
+                stack.append(node.expr)
+
+            # ---- IDENTIFICADOR ----
+            elif kind == ID:
+                name = node.name
+                if name and name not in symbols:
+                    errors.append(f"Variable '{name}' no declarada")
+
+            # Literales (number, fnumber, bool) → sin análisis
 
     # ---------------------------------------
     # Evaluación parcial de expresiones
     # ---------------------------------------
     def eval_constant(expr):
-        if not isinstance(expr, dict):
-            return None
-
-        t = expr.get('node')
-
-        if t == 'number':
-            return expr.get('value')
+        # postorden con pila: (nodo, hijos ya evaluados); los valores quedan en
+        # `values`. None significa "no es constante".
+        values = []
+        stack = [(expr, False)]
+        while stack:
+            node, ready = stack.pop()
+            if not isinstance(node, Node):
+                values.append(None)
+                continue
+
+            kind = node.kind
+
+            if kind in (NUMBER, FNUMBER, BOOL):
+                values.append(node.value)
+
+            # Expresiones binarias
+            elif kind == BINOP:
+                if not ready:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                    continue
+                r = values.pop()
+                l = values.pop()
+                values.append(fold(node.op, l, r))
 
-        if t == 'fnumber':
-            return expr.get('value')
-
-        if t == 'bool':
-            return expr.get('value')
-
-        # Expresiones binarias
-        if t == 'binop':
-            l = eval_constant(expr.get('left'))
-            r = eval_constant(expr.get('right'))
-            op = expr.get('op')
+            else:
+                values.append(None)
 
-            if l is None or r is None:
-                return None
+        return values[0]
 
-            try:
-                if op == '+': return l + r
-                if op == '-': return l - r
-                if op == '*': return l * r
-                if op == '/': return l / r
-                if op == '>': return l > r
-                if op == '<': return l < r
-                if op == '>=': return l >= r
-                if op == '<=': return l <= r
-                if op == '==': return l == r
-                if op == '!=': return l != r
-            except Exception:
-                return None
+    def fold(op, l, r):
+        if l is None or r is None:
+            return None
 
+        try:
+            if op == '+': return l + r
+            if op == '-': return l - r
+            if op == '*': return l * r
+            if op == '/': return l / r
+            if op == '>': return l > r
+            if op == '<': return l < r
+            if op == '>=': return l >= r
+            if op == '<=': return l <= r
+            if op == '==': return l == r
+            if op == '!=': return l != r
+        except Exception:
+            return None
         return None
 
     # ---------------------------------------
     # EJECUTAR ANÁLISIS
     # ---------------------------------------
+    if isinstance(ast, dict):
+        ast = from_dict(ast)   # AST en forma JSON
     try:
         visit(ast)
     except Exception as e:
@@ -150,16 +168,11 @@ def analyze_semantics(ast):
 
 # Permite prueba independiente
 if __name__ == "__main__":
-    test = {
-        'node': 'program',
-        'stmts': [
-            {'node': 'decl', 'type': 'int', 'id': 'x',
-             'expr': {'node': 'number', 'value': 5}},
-            {'node': 'assign', 'id': 'x',
-             'expr': {'node': 'binop', 'op': '+',
-                      'left': {'node': 'id', 'name': 'x'},
-                      'right': {'node': 'number', 'value': 3}}},
-        ]
-    }
+    from ast_nodes import Program, Decl, Assign, BinOp, Number, Id
+
+    test = Program([
+        Decl('int', 'x', Number(5)),
+        Assign('x', BinOp('+', Id('x'), Number(3))),
+    ])
 
     print(analyze_semantics(test))
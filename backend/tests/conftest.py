@@ -0,0 +1,11 @@
+# conftest.py
+"""
+Los módulos del compilador se importan por nombre desde backend/ (como en app.py).
+
+Uso (desde backend/):
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,21 @@
+# test_app.py
+"""
+Pruebas de app.compile_program con sus valores por defecto.
+
+Secciones principales:
+1. Caché de ejecución: un acierto con el tope de salida por defecto (None).
+"""
+import app as server
+
+PROGRAM = 'int x = 1;\nprint(x);'
+
+
+def test_execution_cache_hit_without_output_limit():
+    server.compilation_cache.clear()
+    server.execution_cache.clear()
+    first, status = server.compile_program(PROGRAM, 1000, None)
+    assert status == 200 and not first['metrics']['cache']['execution_hit']
+    second, status = server.compile_program(PROGRAM, 1000, None)
+    assert status == 200, second.get('error')
+    assert second['metrics']['cache']['execution_hit']
+    assert second['phases']['execution']['output'] == first['phases']['execution']['output']
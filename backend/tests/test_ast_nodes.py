@@ -0,0 +1,40 @@
+# test_ast_nodes.py
+"""
+Pruebas de ast_nodes.from_dict (AST en forma JSON → nodos).
+
+Secciones principales:
+1. Ida y vuelta: from_dict de la forma JSON de un AST da el mismo AST.
+2. ASTs de diccionarios muy profundos en las fases semántica e intermedia,
+   sin chocar con el límite de recursión.
+"""
+import json
+import sys
+
+import pytest
+
+from ast_nodes import dumps, from_dict
+from benchmark import random_program
+from intermediate import generate_intermediate_code
+from parser import parse as parser_parse
+from semantic import analyze_semantics
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_from_dict_round_trip(seed):
+    ast = parser_parse(random_program(seed))['ast']
+    assert dumps(from_dict(json.loads(dumps(ast)))) == dumps(ast)
+
+
+def test_deep_dict_ast():
+    depth = sys.getrecursionlimit() * 5
+    expr = {'node': 'number', 'value': 1}
+    for _ in range(depth):
+        expr = {'node': 'binop', 'op': '+', 'left': expr, 'right': {'node': 'number', 'value': 1}}
+    ast = {'node': 'program', 'stmts': [
+        {'node': 'decl', 'type': 'int', 'id': 'x', 'expr': expr, 'line': 1},
+        {'node': 'print', 'expr': {'node': 'id', 'name': 'x'}, 'line': 2},
+    ]}
+    assert analyze_semantics(ast)['success']
+    intermediate = generate_intermediate_code(ast)
+    assert intermediate['success']
+    assert len(intermediate['quadruples']) > depth
@@ -0,0 +1,26 @@
+# test_codegen.py
+"""
+Pruebas del ensamblado a bytecode (codegen.assemble).
+
+Secciones principales:
+1. Nombres de variable que float() aceptaría (inf, nan, ...) siguen siendo
+   variables, en la VM y en el JIT.
+"""
+import pytest
+
+from codegen import execute_code
+from jit import execute_jit
+from pipeline import compile_source
+
+FLOAT_NAMES = ('nan', 'inf', 'Infinity', 'NaN')
+
+
+@pytest.mark.parametrize('name', FLOAT_NAMES)
+@pytest.mark.parametrize('execute', (execute_code, execute_jit))
+def test_float_words_are_variables(name, execute):
+    src = f'int {name} = 1;\n{name} = {name} + 1;\nprint({name});'
+    compiled = compile_source(src)[0]
+    assert compiled['success'], compiled.get('error')
+    result = execute(compiled['phases']['codegen']['code'])
+    assert result['output'] == '2\n'
+    assert result['variables'] == {name: 2}
@@ -0,0 +1,49 @@
+# test_concurrency.py
+"""
+Prueba de estrés del pipeline con muchos hilos: cada compilación debe dar lo
+mismo que en una corrida serial. Los tiempos están en
+benchmark.bench_concurrency.
+
+Secciones principales:
+1. compile_source + ejecución (benchmark.full_run) en un ThreadPoolExecutor.
+2. app.compile_program en hilos, compartiendo las cachés.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import app as server
+from benchmark import concurrency_programs, full_run, random_program
+
+THREADS = 16
+ROUNDS = 5
+PROGRAMS = concurrency_programs() + [random_program(seed) for seed in range(20)]
+
+
+def _in_threads(fn, jobs):
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        return list(pool.map(fn, jobs))
+
+
+def test_threaded_compiles_match_serial_run():
+    expected = [full_run(src) for src in PROGRAMS]
+    got = _in_threads(full_run, PROGRAMS * ROUNDS)
+    for i, result in enumerate(got):
+        assert result == expected[i % len(PROGRAMS)], PROGRAMS[i % len(PROGRAMS)]
+
+
+def test_threaded_requests_match_serial_run():
+    dumps = server.app.json.dumps
+
+    def phases(src):
+        body, status = server.compile_program(src, 200_000, None, 10_000)
+        assert status == 200
+        return json.loads(dumps(body.get('phases', {})))
+
+    server.compilation_cache.clear()
+    server.execution_cache.clear()
+    expected = [phases(src) for src in PROGRAMS]
+    server.compilation_cache.clear()
+    server.execution_cache.clear()
+    got = _in_threads(phases, PROGRAMS * ROUNDS)
+    for i, result in enumerate(got):
+        assert result == expected[i % len(PROGRAMS)], PROGRAMS[i % len(PROGRAMS)]
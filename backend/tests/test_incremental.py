@@ -0,0 +1,55 @@
+# test_incremental.py
+"""
+Un Document editado tecla a tecla debe quedar igual que analizar su texto
+completo desde cero. Los tiempos están en benchmark.bench_incremental.
+
+Secciones principales:
+1. Ediciones al azar: tokens, errores y AST vs scan() y parse() del texto,
+   y un cliente que solo aplica los cambios que devuelve apply().
+"""
+import random
+
+import pytest
+
+from benchmark import random_program, lexer_noise, LEXER_ALPHABET
+from incremental import Document
+from lexer import scan
+from parser import parse as parser_parse
+from ast_nodes import dumps as ast_dumps
+
+INCREMENTAL_PIECES = LEXER_ALPHABET + ('{', '}', ';', 'x = 1;', 'while (x < 3) {', '// ', '\n')
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_incremental_matches_full_analysis(seed):
+    """
+    Ediciones al azar a un Document y a un cliente que solo recibe los
+    cambios; después de cada una se compara con scan() y parse() del texto.
+    """
+    r = random.Random(seed)
+    text = random_program(seed) if seed % 3 else lexer_noise(r, 50)
+    doc = Document(text)
+    client = doc.snapshot()['tokens']
+    for _ in range(15):
+        offset = r.randint(0, len(text))
+        deleted = r.randint(0, min(5, len(text) - offset))
+        inserted = ''.join(r.choice(INCREMENTAL_PIECES) for _ in range(r.randint(0, 3)))
+        change = doc.apply(offset, deleted, inserted)
+        text = text[:offset] + inserted + text[offset + deleted:]
+        # el cliente empalma los tokens nuevos y corre los que siguen
+        t = change['tokens']
+        tail = [dict(d, position=d['position'] + change['shift'], line=d['line'] + change['line_shift'])
+                for d in client[t['start'] + t['removed']:]]
+        client = client[:t['start']] + t['inserted'] + tail
+
+        full = scan(text)
+        snap = doc.snapshot()
+        syntax = [e for e in snap['errors'] if 'char' not in e]
+        parsed = parser_parse(text)
+        assert doc.text() == text
+        assert snap['tokens'] == full.dicts() and client == snap['tokens']
+        assert [e for e in snap['errors'] if 'char' in e] == full.errors
+        if parsed['success']:
+            assert not syntax and ast_dumps(snap['ast']) == ast_dumps(parsed['ast'])
+        else:
+            assert syntax and syntax[0]['message'] == parsed['error']
@@ -0,0 +1,32 @@
+# test_jit.py
+"""
+El JIT (jit.execute_jit) debe dar el mismo resultado que la VM con cualquier
+límite de pasos. Los tiempos están en benchmark.bench_jit.
+
+Secciones principales:
+1. Divisiones (enteras, por cero, con float y bool) y programas aleatorios,
+   con y sin límite de pasos.
+"""
+import pytest
+
+from benchmark import random_program, compile_quads, same_execution
+from codegen import execute_code, generate_code, CHECK_INTERVAL
+from jit import execute_jit
+
+LIMITS = (None, 1, 50, CHECK_INTERVAL)
+
+DIVISION_PROGRAMS = (
+    "int a = 7; int b = 2; print(a / b); print((0 - a) / b); print(a / (0 - b));",
+    "int a = 7; print(a / 0); print(0 / 0); print(a / 2.0); print(7.5 / 2); print(a / 0.0);",
+    "int i = 0 - 20; int s = 0;\nwhile (i < 20) {\n  s = s + 100 / (i - 3) + i / 7;\n"
+    "  print(s / (i + 20));\n  i = i + 1;\n}\nprint(s);",
+    "int x = true / 1; int y = 5 / true; print(x); print(y); print(false / true);",
+)
+
+
+@pytest.mark.parametrize('src', DIVISION_PROGRAMS + tuple(random_program(seed) for seed in range(40)))
+def test_jit_matches_vm(src):
+    program = generate_code(compile_quads(src))['code']
+    for limit in LIMITS:
+        assert same_execution(execute_code(program, max_steps=limit),
+                              execute_jit(program, max_steps=limit)), limit
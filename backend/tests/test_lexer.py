@@ -0,0 +1,21 @@
+# test_lexer.py
+"""
+El escáner de regex (lexer.scan) debe dar exactamente los mismos tokens y
+errores que el de PLY (lexer.ply_scan). Los tiempos están en
+benchmark.bench_lexer.
+
+Secciones principales:
+1. Programas aleatorios y ruido léxico (benchmark.lexer_noise).
+"""
+import random
+
+import pytest
+
+from benchmark import random_program, lexer_noise
+from lexer import scan, ply_scan
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_regex_scanner_matches_ply(seed):
+    for src in (random_program(seed), lexer_noise(random.Random(seed), 200)):
+        assert scan(src) == ply_scan(src), src
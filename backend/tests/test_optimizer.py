@@ -0,0 +1,39 @@
+# test_optimizer.py
+"""
+Pruebas diferenciales del optimizador con programas aleatorios (ver
+benchmark.random_program): el código optimizado debe dar la misma salida y
+las mismas variables que el de la fase intermedia. Los tiempos están en
+benchmark.bench_optimizer.
+
+Secciones principales:
+1. Todos los pases (optimizer.PASSES) vs los cuádruplos sin optimizar.
+2. Condiciones en cortocircuito (gen_cond) vs if/while con la condición
+   evaluada entera a un temporal.
+"""
+import pytest
+
+from benchmark import random_program, unoptimized_quads, value_condition_quads, same_value
+from codegen import execute_code, generate_code
+from optimizer import optimize_code
+
+SEEDS = range(40)
+
+
+def _same_run(before, after):
+    return before['output'] == after['output'] and same_value(before['variables'], after['variables'])
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_optimizer_preserves_results(seed):
+    quads = unoptimized_quads(random_program(seed))
+    before = execute_code(generate_code(quads)['code'])
+    after = execute_code(generate_code(optimize_code(quads)['optimized'])['code'])
+    assert _same_run(before, after)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_short_circuit_matches_value_conditions(seed):
+    src = random_program(seed)
+    old = execute_code(generate_code(value_condition_quads(src))['code'])
+    new = execute_code(generate_code(optimize_code(unoptimized_quads(src))['optimized'])['code'])
+    assert _same_run(old, new)
@@ -0,0 +1,60 @@
+# test_profiler.py
+"""
+Pruebas del perfilador (profiler.profile_execution). Los tiempos están en
+benchmark.bench_profiler.
+
+Secciones principales:
+1. Conteos exactos de un par de ciclos anidados.
+2. Programas aleatorios: el perfilado no cambia la ejecución y sus conteos
+   suman los pasos ejecutados.
+"""
+import pytest
+
+from benchmark import random_program, same_execution
+from codegen import execute_code
+from pipeline import compile_source
+from profiler import profile_execution
+
+
+def compiled_program(src):
+    compiled = compile_source(src)[0]
+    assert compiled['success'], compiled.get('error')
+    return compiled['phases']['codegen']['code']
+
+
+PROFILED_LOOPS = """int n = {n};
+int i = 0;
+int s = 0;
+while (i < n) {{
+  int j = 0;
+  while (j < i) {{
+    s = s + j;
+    j = j + 1;
+  }}
+  i = i + 1;
+}}
+print(s);"""
+
+
+def test_profiler_counts_nested_loops():
+    # la línea 4 se evalúa n + 1 veces, el cuerpo interno corre n(n-1)/2 veces
+    n = 50
+    result = profile_execution(compiled_program(PROFILED_LOOPS.format(n=n)))
+    profile = result['profile']
+    loops = {loop['line']: loop['iterations'] for loop in profile['loops']}
+    lines = {entry['line']: entry['count'] for entry in profile['lines']}
+    assert profile['instructions'] == result['steps_executed']
+    assert loops == {4: n, 6: n * (n - 1) // 2}
+    assert lines[4] == n + 1 and lines[5] == n and lines[7] == n * (n - 1) // 2
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_profiler_does_not_change_execution(seed):
+    program = compiled_program(random_program(seed))
+    assert None not in program['debug']['lines']
+    for limit in (None, 50):
+        plain = execute_code(program, max_steps=limit)
+        profiled = profile_execution(program, max_steps=limit)
+        assert same_execution(plain, profiled)
+        assert profiled['profile']['instructions'] == plain['steps_executed']
+        assert sum(c for _, c in profiled['profile']['quads']) == plain['steps_executed']
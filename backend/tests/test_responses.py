@@ -0,0 +1,50 @@
+# test_responses.py
+"""
+Una respuesta parcial o en columnas de /compile debe traer exactamente las
+mismas fases que la respuesta completa. Los tiempos están en
+benchmark.bench_responses.
+
+Secciones principales:
+1. Programas aleatorios con un subconjunto al azar de encoding.SECTIONS, en
+   encoding 'columnar', vs la respuesta completa en filas.
+"""
+import json
+import random
+
+import pytest
+
+import app as server
+from benchmark import random_program
+from encoding import SECTIONS, TOKEN_COLUMNS, QUAD_COLUMNS
+
+
+def _rows(columns, names):
+    """Inverso de encoding.columnar_*: columnas de vuelta a filas."""
+    return list(zip(*(columns[name] for name in names)))
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_partial_response_matches_full(seed):
+    src = random_program(seed)
+    include = random.Random(seed).sample(SECTIONS, random.Random(seed).randint(1, len(SECTIONS)))
+    dumps = server.app.json.dumps
+
+    def compile_cold(**options):
+        # sin caché: una respuesta parcial corre solo sus fases
+        server.compilation_cache.clear()
+        server.execution_cache.clear()
+        body, status = server.compile_program(src, 200_000, None, 10_000, **options)
+        assert status == 200
+        return json.loads(dumps(body))
+
+    full = compile_cold()
+    body = compile_cold(include=include, encoding='columnar')
+    phases = body.get('phases', {})
+    if 'lexical' in phases:
+        phases['lexical']['tokens'] = [dict(zip(TOKEN_COLUMNS, t))
+                                       for t in _rows(phases['lexical']['tokens'], TOKEN_COLUMNS)]
+    for name, key in (('intermediate', 'quadruples'), ('optimization', 'optimized')):
+        if name in phases:
+            phases[name][key] = [list(q) for q in _rows(phases[name][key], QUAD_COLUMNS)]
+    assert phases == {name: phase for name, phase in full['phases'].items() if name in include}
+    assert ('metrics' in body) == ('metrics' in include)
@@ -0,0 +1,33 @@
+# test_streaming.py
+"""
+La salida transmitida por partes (pipeline.STREAM_TIERS) debe ser la misma
+que la de una ejecución completa. Los tiempos están en
+benchmark.bench_streaming.
+
+Secciones principales:
+1. Programas aleatorios con varios topes de salida, en la VM y en el JIT.
+"""
+import pytest
+
+from benchmark import random_program, same_execution, _drain
+from codegen import execute_code
+from jit import execute_jit
+from pipeline import compile_source, STREAM_TIERS
+
+
+def compiled_program(src):
+    compiled = compile_source(src)[0]
+    assert compiled['success'], compiled.get('error')
+    return compiled['phases']['codegen']['code']
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_streamed_output_matches_execute_code(seed):
+    program = compiled_program(random_program(seed))
+    for max_output in (None, 0, 7, 1000):
+        expected = execute_code(program, 200_000, None, max_output)
+        assert same_execution(expected, execute_jit(program, 200_000, None, max_output))
+        for stream in STREAM_TIERS.values():
+            parts, result = _drain(stream(program, 200_000, None, max_output))
+            assert all(parts)
+            assert same_execution(expected, dict(result, output=''.join(parts))), max_output
@@ -0,0 +1,42 @@
+# test_superinstructions.py
+"""
+Pruebas de las superinstrucciones de codegen.assemble. Los tiempos están en
+benchmark.bench_superinstructions.
+
+Secciones principales:
+1. print_add se usa una vez por vuelta en el ejemplo Ciclo While.
+2. Programas aleatorios: con y sin superinstrucciones dan lo mismo en la VM
+   y en el JIT, con y sin límite de pasos.
+"""
+import pytest
+
+from benchmark import random_program, compile_quads, same_execution, example
+from codegen import assemble, execute_code, CHECK_INTERVAL
+from jit import execute_jit
+from pipeline import compile_source
+from profiler import profile_execution
+
+LIMITS = (None, 1, 50, CHECK_INTERVAL)
+
+
+def compiled_program(src):
+    compiled = compile_source(src)[0]
+    assert compiled['success'], compiled.get('error')
+    return compiled['phases']['codegen']['code']
+
+
+def test_superinstruction_fires_once_per_iteration():
+    # en Ciclo While el cuerpo (print(i); i = i + 1;) es un print_add por vuelta
+    profile = profile_execution(compiled_program(example('Ciclo While')))['profile']
+    assert profile['superinstructions'] == {'print_add': profile['loops'][0]['iterations']}
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_superinstructions_preserve_results(seed):
+    quads = compile_quads(random_program(seed))
+    fused = assemble(quads)
+    plain = assemble(quads, superinstructions=False)
+    for limit in LIMITS:
+        expected = execute_code(plain, max_steps=limit)
+        assert same_execution(expected, execute_code(fused, max_steps=limit)), limit
+        assert same_execution(expected, execute_jit(fused, max_steps=limit)), limit
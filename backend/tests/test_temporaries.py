@@ -0,0 +1,27 @@
+# test_temporaries.py
+"""
+Los temporales de la fase intermedia (intermediate.TEMP_PREFIX) no chocan
+con las variables del usuario, aunque estas se llamen t0, t1, ...
+
+Secciones principales:
+1. Programas aleatorios con a..e renombradas a t0..t4 vs el original.
+"""
+import re
+
+import pytest
+
+from benchmark import random_program, unoptimized_quads
+from codegen import execute_code, generate_code
+from pipeline import compile_source
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_variables_named_like_temporaries(seed):
+    src = re.sub(r'\b([a-e])\b', lambda m: f"t{ord(m.group(1)) - ord('a')}", random_program(seed))
+    reference = execute_code(generate_code(unoptimized_quads(random_program(seed)))['code'])
+    compiled = compile_source(src)[0]
+    assert compiled['success'], compiled.get('error')
+    result = execute_code(compiled['phases']['codegen']['code'])
+    assert result['output'] == reference['output']
+    assert [result['variables'][f't{i}'] for i in range(5)] == \
+        [reference['variables'][v] for v in 'abcde']
@@ -0,0 +1,164 @@
+# workers.py
+"""
+Pool de procesos para compilar y ejecutar fuera del proceso de Flask.
+
+El pipeline es Python puro y usa CPU, así que con el GIL un proceso atiende
+una compilación a la vez. CompilerPool reparte los trabajos entre procesos
+precalentados.
+
+Secciones principales:
+1. warm_up():
+   - Inicializador de cada proceso: importa todas las fases, construye las
+     tablas de PLY y compila un programa pequeño.
+
+2. CompilerPool(size, job_timeout, max_jobs_per_worker):
+   - run(fn, *args): Ejecuta fn en un proceso libre del pool y espera el
+     resultado. Cada proceso corre un solo trabajo a la vez y se habla con
+     él por su propio Pipe.
+   - Si un trabajo excede job_timeout se termina solo el proceso que lo
+     corría, y si un proceso muere se reemplaza solo ese; el trabajo falla
+     con WorkerError y los demás trabajos en curso siguen sin enterarse.
+   - max_jobs_per_worker recicla cada proceso después de N trabajos.
+"""
+import multiprocessing
+import queue
+import threading
+
+
+class WorkerError(Exception):
+    """El trabajo no pudo completarse en el pool (timeout o proceso caído)."""
+
+
+def warm_up():
+    import pipeline
+    from parser import _build_parser
+    _build_parser()
+    pipeline.compile_source('int x = 1;\nprint(x);')
+
+
+def _ping():
+    return True
+
+
+def _serve(conn):
+    """Bucle de un proceso del pool: recibe (fn, args) y responde (ok, valor)."""
+    warm_up()
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        fn, args = job
+        try:
+            reply = (True, fn(*args))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # el resultado o la excepción no se pudo serializar
+            conn.send((False, RuntimeError(f'{type(e).__name__}: {e}')))
+
+
+class _Worker:
+    """Un proceso del pool y el extremo del Pipe con el que se le habla."""
+
+    __slots__ = ('process', 'conn', 'jobs')
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.jobs = 0
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class CompilerPool:
+
+    def __init__(self, size, job_timeout=None, max_jobs_per_worker=None):
+        self.size = size
+        self.job_timeout = job_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker or None
+        self.restarts = 0
+        self._context = multiprocessing.get_context()
+        self._lock = threading.Lock()
+        self._workers = set()
+        # lugares libres: un proceso ocioso, o None si todavía no se levanta
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(None)
+
+    def _start(self):
+        worker = _Worker(self._context)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _stop(self, worker, restart=False):
+        worker.stop()
+        with self._lock:
+            self._workers.discard(worker)
+            if restart:
+                self.restarts += 1
+
+    def prestart(self):
+        """Levanta todos los procesos ya, en vez de con la primera petición."""
+        slots = [self._idle.get() for _ in range(self.size)]
+        try:
+            for i, worker in enumerate(slots):
+                if worker is None:
+                    slots[i] = worker = self._start()
+                worker.conn.send((_ping, ()))
+            for worker in slots:
+                worker.conn.recv()
+        finally:
+            for worker in slots:
+                self._idle.put(worker)
+
+    def run(self, fn, *args):
+        worker = self._idle.get()
+        try:
+            if worker is None:
+                worker = self._start()
+            try:
+                worker.conn.send((fn, args))
+            except OSError:
+                # el proceso ocioso murió (no en este trabajo): uno nuevo
+                self._stop(worker, restart=True)
+                worker = self._start()
+                worker.conn.send((fn, args))
+            if not worker.conn.poll(self.job_timeout):
+                # colgado: se termina solo este proceso
+                self._stop(worker, restart=True)
+                worker = None
+                raise WorkerError('El trabajo excedió el tiempo límite del proceso')
+            try:
+                ok, value = worker.conn.recv()
+            except (EOFError, OSError):
+                self._stop(worker, restart=True)
+                worker = None
+                raise WorkerError('El proceso de compilación terminó inesperadamente')
+            worker.jobs += 1
+            if self.max_jobs_per_worker and worker.jobs >= self.max_jobs_per_worker:
+                self._stop(worker)
+                worker = None
+            if not ok:
+                raise value
+            return value
+        finally:
+            self._idle.put(worker)
+
+    def shutdown(self):
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()